@@ -1 +1,5 @@
-# Internal Feedback Tool API package
\ No newline at end of file
+# Internal Feedback Tool API package
+from dotenv import load_dotenv
+
+# Pick up settings from a local .env before any module reads the environment
+load_dotenv()
\ No newline at end of file
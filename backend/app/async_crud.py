@@ -0,0 +1,60 @@
+"""Awaitable versions of the crud functions.
+
+Each function takes either a sync ``Session`` or an ``AsyncSession``. With an
+AsyncSession the crud function runs through ``AsyncSession.run_sync``, so the
+query logic lives in one place (``app.crud``) and DB I/O never blocks the
+event loop; with a sync Session it is called directly. Routers await these so
+the same code serves both ``DATABASE_ASYNC`` modes.
+"""
+import functools
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import crud
+
+def _awaitable(fn):
+    @functools.wraps(fn)
+    async def wrapper(db, *args, **kwargs):
+        if isinstance(db, AsyncSession):
+            return await db.run_sync(fn, *args, **kwargs)
+        return fn(db, *args, **kwargs)
+    return wrapper
+
+# User operations
+get_user = _awaitable(crud.get_user)
+get_user_by_email = _awaitable(crud.get_user_by_email)
+create_user = _awaitable(crud.create_user)
+update_password_hash = _awaitable(crud.update_password_hash)
+set_manager = _awaitable(crud.set_manager)
+is_in_org = _awaitable(crud.is_in_org)
+get_org_members = _awaitable(crud.get_org_members)
+get_org_stats = _awaitable(crud.get_org_stats)
+get_team_members = _awaitable(crud.get_team_members)
+get_team_members_with_stats = _awaitable(crud.get_team_members_with_stats)
+get_managers = _awaitable(crud.get_managers)
+
+# Refresh token operations
+create_refresh_token = _awaitable(crud.create_refresh_token)
+rotate_refresh_token = _awaitable(crud.rotate_refresh_token)
+revoke_refresh_token = _awaitable(crud.revoke_refresh_token)
+get_revoked_access_tokens = _awaitable(crud.get_revoked_access_tokens)
+delete_expired_refresh_tokens = _awaitable(crud.delete_expired_refresh_tokens)
+
+# Feedback operations
+create_feedback = _awaitable(crud.create_feedback)
+create_feedback_bulk = _awaitable(crud.create_feedback_bulk)
+get_feedback = _awaitable(crud.get_feedback)
+get_feedback_for_employee = _awaitable(crud.get_feedback_for_employee)
+get_feedback_by_manager = _awaitable(crud.get_feedback_by_manager)
+get_feedback_page = _awaitable(crud.get_feedback_page)
+get_feedback_page_rows = _awaitable(crud.get_feedback_page_rows)
+search_feedback = _awaitable(crud.search_feedback)
+get_tag_counts = _awaitable(crud.get_tag_counts)
+update_feedback = _awaitable(crud.update_feedback)
+acknowledge_feedback = _awaitable(crud.acknowledge_feedback)
+acknowledge_feedback_bulk = _awaitable(crud.acknowledge_feedback_bulk)
+add_employee_comment = _awaitable(crud.add_employee_comment)
+
+# Dashboard operations
+get_feedback_stats = _awaitable(crud.get_feedback_stats)
+get_feedback_trends = _awaitable(crud.get_feedback_trends)
+get_bootstrap = _awaitable(crud.get_bootstrap)
+get_cache_version = _awaitable(crud.get_cache_version)
\ No newline at end of file
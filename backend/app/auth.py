@@ -1,21 +1,69 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Callable, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app import models
+from app import models, async_crud
+from app.principals import Principal, principal_cache
+from app.tokens import (
+    REFRESH_TOKEN_EXPIRE_DAYS, hash_token, new_refresh_token, new_token_id, remember_revoked, revoked_tokens,
+)
+from app.instrumentation import phase
 
 # Security configuration
 SECRET_KEY = "your-secret-key-here"  # In production, use environment variable
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing configuration. Hashes below BCRYPT_ROUNDS are upgraded on
+# the next successful login. Hashing runs on a dedicated pool so it never
+# blocks the event loop; once PASSWORD_HASH_WORKERS are busy and
+# PASSWORD_HASH_QUEUE_SIZE more are waiting, further requests get a 503.
+# PASSWORD_HASH_WORKERS=0 hashes inline on the event loop.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_QUEUE_SIZE = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", "32"))
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
+_password_executor = (
+    ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+    if PASSWORD_HASH_WORKERS > 0 else None
+)
+_password_slots = threading.BoundedSemaphore(max(PASSWORD_HASH_WORKERS, 1) + PASSWORD_HASH_QUEUE_SIZE)
+
+async def _run_password_task(fn, *args):
+    """Run a bcrypt call on the password pool, or fail fast with 503 when it is saturated"""
+    if _password_executor is None:
+        with phase("auth"):
+            return fn(*args)
+    if not _password_slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication service is busy, please retry",
+            headers={"Retry-After": "1"},
+        )
+    future = _password_executor.submit(fn, *args)
+    # Free the slot when the work finishes, even if the request is cancelled first
+    future.add_done_callback(lambda _: _password_slots.release())
+    # Includes any wait for a free worker, which the request pays for too
+    with phase("auth"):
+        return await asyncio.wrap_future(future)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
     return pwd_context.verify(plain_password, hashed_password)
@@ -24,58 +72,163 @@ def get_password_hash(password: str) -> str:
     """Hash a password"""
     return pwd_context.hash(password)
 
-def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
-    """Create a JWT access token"""
+async def verify_password_async(plain_password: str, hashed_password: str):
+    """Verify a password off the event loop
+
+    Returns ``(valid, new_hash)`` where ``new_hash`` is set when the stored
+    hash uses outdated settings and should be replaced.
+    """
+    return await _run_password_task(pwd_context.verify_and_update, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password off the event loop"""
+    return await _run_password_task(pwd_context.hash, password)
+
+def create_access_token(
+    data: dict,
+    expires_delta: Optional[timedelta] = None,
+    jti: Optional[str] = None,
+    issued_at: Optional[datetime] = None,
+):
+    """Create a JWT access token with ``iat``, ``exp`` and a ``jti`` for revocation"""
     to_encode = data.copy()
+    issued_at = issued_at or datetime.utcnow().replace(microsecond=0)
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = issued_at + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+        expire = issued_at + timedelta(minutes=15)
+    to_encode.update({"iat": issued_at, "exp": expire, "jti": jti or new_token_id()})
+    with phase("auth"):
+        encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def authenticate_user(db: Session, email: str, password: str):
-    """Authenticate a user by email and password"""
-    user = db.query(models.User).filter(models.User.email == email).first()
+async def authenticate_user(db: Session, email: str, password: str):
+    """Authenticate a user by email and password, upgrading outdated hashes"""
+    user = await async_crud.get_user_by_email(db, email)
     if not user:
         return False
-    if not verify_password(password, user.password_hash):
+    valid, new_hash = await verify_password_async(password, user.password_hash)
+    if not valid:
         return False
+    if new_hash:
+        user = await async_crud.update_password_hash(db, user, new_hash)
     return user
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    """Get the current user from JWT token"""
+def _new_token_pair(now: datetime):
+    """A refresh token and its row's fields; the access token is signed once its owner is known"""
+    refresh_token = new_refresh_token()
+    fields = {
+        "token_hash": hash_token(refresh_token),
+        "access_jti": new_token_id(),
+        "access_expires_at": now + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
+        "expires_at": now + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+    }
+    return refresh_token, fields
+
+def _token_response(email: str, refresh_token: str, fields: dict, now: datetime) -> dict:
+    access_token = create_access_token(
+        {"sub": email}, timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES), jti=fields["access_jti"], issued_at=now
+    )
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "refresh_token": refresh_token,
+        "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    }
+
+async def issue_tokens(db: Session, user: models.User) -> dict:
+    """Start a new refresh token family for a user who just logged in"""
+    now = datetime.utcnow().replace(microsecond=0)
+    refresh_token, fields = _new_token_pair(now)
+    await async_crud.create_refresh_token(db, user.id, new_token_id(), now, **fields)
+    return _token_response(user.email, refresh_token, fields, now)
+
+async def refresh_tokens(db: Session, refresh_token: str) -> Optional[dict]:
+    """Rotate a refresh token into a new token pair; None if it is unknown, expired or reused
+
+    Reuse revokes the token's family and the access tokens issued from it.
+    No password hashing is involved.
+    """
+    now = datetime.utcnow().replace(microsecond=0)
+    successor, fields = _new_token_pair(now)
+    email, revoked = await async_crud.rotate_refresh_token(db, hash_token(refresh_token), now, **fields)
+    remember_revoked(revoked)
+    if email is None:
+        return None
+    return _token_response(email, successor, fields, now)
+
+async def revoke_tokens(db: Session, refresh_token: str) -> None:
+    """Revoke a refresh token's family and its access tokens, e.g. on logout"""
+    now = datetime.utcnow().replace(microsecond=0)
+    remember_revoked(await async_crud.revoke_refresh_token(db, hash_token(refresh_token), now))
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Principal:
+    """Get the current user from JWT token
+
+    Returns an immutable Principal snapshot. Tokens seen recently are served
+    from the principal cache without decoding or touching the users table;
+    revoking a token drops its user's cached entries.
+    """
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        with phase("auth"):
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
+    # In memory, so checking for revocation costs no query
+    if revoked_tokens.is_revoked(payload.get("jti"), payload.get("exp")):
+        raise credentials_exception
     
-    user = db.query(models.User).filter(models.User.email == email).first()
+    user = await async_crud.get_user_by_email(db, email)
     if user is None:
         raise credentials_exception
-    return user
+    principal = Principal.from_user(user)
+    expires_in = payload["exp"] - time.time() if "exp" in payload else None
+    principal_cache.put(token, principal, expires_in)
+    # Revoked while the user was being loaded: the invalidation may have run before the put
+    if revoked_tokens.is_revoked(payload.get("jti"), payload.get("exp")):
+        principal_cache.invalidate_user(principal.id)
+        raise credentials_exception
+    return principal
+
+def token_validity(token: str) -> Callable[[], bool]:
+    """A check for connections that outlive their request: False once ``token`` expires or is revoked
+
+    Only for tokens ``get_current_user`` has already accepted, since the
+    claims aren't verified again.
+    """
+    claims = jwt.get_unverified_claims(token)
+    jti, expires_at = claims.get("jti"), claims.get("exp")
+
+    def still_valid() -> bool:
+        if expires_at is not None and time.time() >= expires_at:
+            return False
+        return not revoked_tokens.is_revoked(jti, expires_at)
+    return still_valid
 
-async def require_manager(current_user: models.User = Depends(get_current_user)):
+async def require_manager(current_user: Principal = Depends(get_current_user)) -> Principal:
     """Require the current user to be a manager"""
-    if current_user.role.value != "manager":
+    if current_user.role != models.UserRole.MANAGER:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Manager access required"
         )
     return current_user
 
-async def require_employee(current_user: models.User = Depends(get_current_user)):
+async def require_employee(current_user: Principal = Depends(get_current_user)) -> Principal:
     """Require the current user to be an employee"""
-    if current_user.role.value != "employee":
+    if current_user.role != models.UserRole.EMPLOYEE:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Employee access required"
@@ -0,0 +1,116 @@
+"""Conditional GETs for per-user reads.
+
+Routes opt in by taking ``Depends(conditional_get)`` after their auth guard.
+The dependency reads the caller's cache version (a primary-key lookup on
+``cache_versions``, which ``crud`` bumps on every write that changes what the
+user can read) and derives a weak ETag from it and the request. A matching
+``If-None-Match`` is answered with a 304 before the route loads or serializes
+anything; otherwise the ETag and Cache-Control headers are added to the
+route's response.
+"""
+import hashlib
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from fastapi import Depends, Request, Response
+from sqlalchemy.orm import Session
+
+from app import async_crud
+from app.auth import get_current_user
+from app.database import get_db
+from app.principals import Principal
+
+# Part of every ETag; change it to invalidate all of them, e.g. when a
+# response shape changes in a deploy
+ETAG_SALT = os.getenv("ETAG_SALT", "1")
+
+# Browsers may keep these responses but must revalidate them before reuse
+CACHE_CONTROL = "private, no-cache"
+
+class NotModified(Exception):
+    """Raised by ``conditional_get``; turned into a bodiless 304 by the app's handler"""
+
+    def __init__(self, etag: str):
+        self.etag = etag
+
+def cache_headers(etag: str) -> Dict[str, str]:
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": "Authorization"}
+
+def not_modified_response(request: Request, exc: NotModified) -> Response:
+    return Response(status_code=304, headers=cache_headers(exc.etag))
+
+def make_etag(version: int, principal: Principal, request: Request) -> str:
+    """Weak ETag for ``request`` as seen by ``principal`` at cache ``version``"""
+    # Default trend ranges are relative to today, so tags also roll over at UTC midnight
+    today = datetime.now(timezone.utc).date().isoformat()
+    key = "\n".join([
+        ETAG_SALT, str(principal.id), principal.role.value, request.url.path,
+        repr(sorted(request.query_params.multi_items())), today,
+    ])
+    digest = hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+    return f'W/"{version}-{digest}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison against an If-None-Match header, as GET requires"""
+    if not if_none_match:
+        return False
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or (candidate[2:] if candidate.startswith("W/") else candidate) == opaque:
+            return True
+    return False
+
+class ConditionalStats:
+    """Per-route counters for conditional GETs, for judging the 304 hit rate"""
+
+    def __init__(self):
+        self._routes: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, route: str, conditional: bool, not_modified: bool) -> None:
+        with self._lock:
+            counters = self._routes.setdefault(route, {"requests": 0, "conditional": 0, "not_modified": 0})
+            counters["requests"] += 1
+            counters["conditional"] += conditional
+            counters["not_modified"] += not_modified
+
+    def clear(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            routes = {route: dict(counters) for route, counters in self._routes.items()}
+        totals = {"requests": 0, "conditional": 0, "not_modified": 0}
+        for counters in routes.values():
+            for field in totals:
+                totals[field] += counters[field]
+        for counters in [totals, *routes.values()]:
+            # Share of all requests, and of requests that sent If-None-Match, answered with a 304
+            counters["hit_rate"] = round(counters["not_modified"] / counters["requests"], 4) if counters["requests"] else 0.0
+            counters["conditional_hit_rate"] = (
+                round(counters["not_modified"] / counters["conditional"], 4) if counters["conditional"] else 0.0
+            )
+        return {**totals, "routes": routes}
+
+conditional_stats = ConditionalStats()
+
+async def conditional_get(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+) -> None:
+    """Answer a fresh If-None-Match with a 304, or tag the route's response with an ETag"""
+    version = await async_crud.get_cache_version(db, current_user.id)
+    etag = make_etag(version, current_user, request)
+    if_none_match = request.headers.get("if-none-match")
+    matched = etag_matches(if_none_match, etag)
+    route = request.scope.get("route")
+    conditional_stats.record(getattr(route, "path", request.url.path), if_none_match is not None, matched)
+    if matched:
+        raise NotModified(etag)
+    response.headers.update(cache_headers(etag))
\ No newline at end of file
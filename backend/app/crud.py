@@ -1,48 +1,521 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session
-from passlib.context import CryptContext
-from app import models, schemas
-from datetime import datetime
-from sqlalchemy import and_, desc
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from sqlalchemy.orm import Session, aliased, joinedload, selectinload
+from sqlalchemy.dialects import postgresql, sqlite
+from app import events, models, org, read_models, schemas, search
+from app.utils import encode_cursor, decode_cursor, encode_depth_cursor, decode_depth_cursor
+from datetime import date, datetime, timedelta, timezone
+from sqlalchemy import and_, or_, desc, func, insert, select, update
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-def get_password_hash(password: str) -> str:
-    """Hash a password"""
-    return pwd_context.hash(password)
+# Eager-loading strategies matching what the response schemas serialize.
+# UserResponse embeds its manager one level deep; FeedbackResponse embeds the
+# employee and manager as UserResponse. Both are many-to-one, so joinedload
+# resolves the whole user graph in the same statement. Tags are many-to-many,
+# so they come from one extra IN query per batch rather than widening the join.
+USER_LOAD_OPTIONS = (
+    joinedload(models.User.manager),
+)
+FEEDBACK_LOAD_OPTIONS = (
+    joinedload(models.Feedback.employee).joinedload(models.User.manager),
+    joinedload(models.Feedback.manager).joinedload(models.User.manager),
+    selectinload(models.Feedback.tags),
+)
 
 # User CRUD operations
 def get_user(db: Session, user_id: int) -> Optional[models.User]:
     """Get user by ID"""
-    return db.query(models.User).filter(models.User.id == user_id).first()
+    return db.query(models.User).options(*USER_LOAD_OPTIONS).filter(models.User.id == user_id).first()
 
 def get_user_by_email(db: Session, email: str) -> Optional[models.User]:
     """Get user by email"""
     return db.query(models.User).filter(models.User.email == email).first()
 
-def create_user(db: Session, user: schemas.UserCreate) -> models.User:
-    """Create a new user"""
-    hashed_password = get_password_hash(user.password)
+def create_user(db: Session, user: schemas.UserCreate, password_hash: str) -> models.User:
+    """Create a new user with an already hashed password"""
     db_user = models.User(
         name=user.name,
         email=user.email,
-        password_hash=hashed_password,
+        password_hash=password_hash,
         role=models.UserRole(user.role),
         manager_id=user.manager_id
     )
     db.add(db_user)
+    db.flush()
+    org.add_user(db, db_user.id, db_user.manager_id)
+    _bump_cache_versions(db, _with_ancestors(db, [db_user.id]))
+    # Seed zeroed counters so later feedback writes are plain UPDATEs
+    for side in models.UserRole:
+        db.add(models.FeedbackStats(user_id=db_user.id, role_side=side, **empty_feedback_stats()))
+    user_id = db_user.id
+    db.commit()
+    return get_user(db, user_id)
+
+def update_password_hash(db: Session, user: models.User, password_hash: str) -> models.User:
+    """Replace a user's password hash, e.g. after upgrading its bcrypt cost"""
+    user.password_hash = password_hash
     db.commit()
-    db.refresh(db_user)
-    return db_user
+    return user
+
+def set_manager(db: Session, user_id: int, manager_id: Optional[int]) -> Optional[models.User]:
+    """Move a user, and everyone under them, to a new manager
+
+    Raises ValueError if the new manager reports to the user, which would
+    create a cycle.
+    """
+    db_user = db.get(models.User, user_id)
+    if db_user is None:
+        return None
+    if manager_id is not None and (manager_id == user_id or org.is_ancestor(db, user_id, manager_id)):
+        raise ValueError("A user can't report to someone in their own org")
+    if db_user.manager_id != manager_id:
+        viewers = _user_viewers(db, user_id)
+        org.move_subtree(db, user_id, manager_id)
+        db_user.manager_id = manager_id
+        db.flush()
+        _bump_cache_versions(db, viewers | _with_ancestors(db, [user_id]))
+        db.commit()
+    return get_user(db, user_id)
+
+def is_in_org(db: Session, manager_id: int, user_id: int) -> bool:
+    """Whether ``user_id`` reports to ``manager_id``, directly or through others"""
+    return org.is_ancestor(db, manager_id, user_id)
+
+def get_org_members(
+    db: Session,
+    manager_id: int,
+    max_depth: Optional[int] = None,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Tuple[models.User, int]], Optional[str]]:
+    """One page of everyone under a manager with their depth, nearest levels first
+
+    Keyset-paginated on (depth, id) over the closure table's primary key.
+    Raises ValueError for a malformed cursor.
+    """
+    closure = models.UserClosure
+    query = (
+        db.query(models.User, closure.depth)
+        .join(closure, closure.descendant_id == models.User.id)
+        .filter(closure.ancestor_id == manager_id, closure.depth >= 1)
+    )
+    if max_depth is not None:
+        query = query.filter(closure.depth <= max_depth)
+    if cursor:
+        cursor_depth, cursor_id = decode_depth_cursor(cursor)
+        query = query.filter(or_(
+            closure.depth > cursor_depth,
+            and_(closure.depth == cursor_depth, models.User.id > cursor_id),
+        ))
+    rows = query.order_by(closure.depth, models.User.id).limit(limit + 1).all()
+    items = [(user, depth) for user, depth in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_depth_cursor(items[-1][1], items[-1][0].id)
+    return items, next_cursor
+
+def _org_counter_columns():
+    return [func.coalesce(func.sum(getattr(models.FeedbackStats, field)), 0).label(field) for field in STAT_FIELDS]
+
+def get_org_stats(db: Session, manager_id: int, max_depth: Optional[int] = None) -> dict:
+    """Feedback received across a manager's org, rolled up from the counters
+
+    Returns org-wide totals plus one rollup per direct report covering that
+    report's own sub-org, each from a single grouped query over the closure.
+    """
+    closure = models.UserClosure
+    received = and_(
+        models.FeedbackStats.user_id == closure.descendant_id,
+        models.FeedbackStats.role_side == models.UserRole.EMPLOYEE,
+    )
+    totals_query = (
+        db.query(func.count(closure.descendant_id).label("org_size"), func.max(closure.depth).label("depth"), *_org_counter_columns())
+        .outerjoin(models.FeedbackStats, received)
+        .filter(closure.ancestor_id == manager_id, closure.depth >= 1)
+    )
+    if max_depth is not None:
+        totals_query = totals_query.filter(closure.depth <= max_depth)
+    totals = totals_query.one()._asdict()
+    totals["depth"] = totals["depth"] or 0
+
+    # Each direct report's sub-org: manager -> report (depth 1) -> anyone under the report
+    direct = aliased(closure)
+    per_report = (
+        db.query(direct.descendant_id, func.count(closure.descendant_id).label("org_size"), *_org_counter_columns())
+        .join(closure, closure.ancestor_id == direct.descendant_id)
+        .outerjoin(models.FeedbackStats, received)
+        .filter(direct.ancestor_id == manager_id, direct.depth == 1)
+        .group_by(direct.descendant_id)
+    )
+    if max_depth is not None:
+        per_report = per_report.filter(closure.depth < max_depth)
+    rollups = {row[0]: row._asdict() for row in per_report}
+    reports = (
+        db.query(models.User)
+        .options(*USER_LOAD_OPTIONS)
+        .filter(models.User.id.in_(rollups))
+        .order_by(models.User.name, models.User.id)
+        .all()
+    ) if rollups else []
+    totals["direct_reports"] = [{"user": user, **rollups[user.id]} for user in reports]
+    return totals
 
 def get_team_members(db: Session, manager_id: int) -> List[models.User]:
     """Get all team members for a specific manager"""
-    return db.query(models.User).filter(models.User.manager_id == manager_id).all()
+    return db.query(models.User).options(*USER_LOAD_OPTIONS).filter(models.User.manager_id == manager_id).all()
+
+def get_team_members_with_stats(db: Session, manager_id: int) -> List[Tuple[models.User, dict]]:
+    """Get team members with counts of the feedback they've received, in one query"""
+    stats = models.FeedbackStats
+    last_feedback_at = (
+        select(func.max(models.Feedback.created_at))
+        .where(models.Feedback.employee_id == models.User.id)
+        .correlate(models.User)
+        .scalar_subquery()
+    )
+    rows = (
+        db.query(
+            models.User,
+            *[func.coalesce(getattr(stats, field), 0).label(field) for field in STAT_FIELDS],
+            last_feedback_at.label("last_feedback_at"),
+        )
+        .options(*USER_LOAD_OPTIONS)
+        .outerjoin(stats, and_(stats.user_id == models.User.id, stats.role_side == models.UserRole.EMPLOYEE))
+        .filter(models.User.manager_id == manager_id)
+        .order_by(models.User.name, models.User.id)
+        .all()
+    )
+    return [(row[0], {field: getattr(row, field) for field in (*STAT_FIELDS, "last_feedback_at")}) for row in rows]
 
 def get_managers(db: Session) -> List[models.User]:
     """Get all users with manager role"""
-    return db.query(models.User).filter(models.User.role == models.UserRole.MANAGER).all()
+    return db.query(models.User).options(*USER_LOAD_OPTIONS).filter(models.User.role == models.UserRole.MANAGER).all()
+
+# Refresh token operations. ``fields`` carries token_hash, access_jti,
+# access_expires_at and expires_at for the row being issued.
+def create_refresh_token(db: Session, user_id: int, family_id: str, now: datetime, **fields) -> None:
+    """Store the first refresh token of a new family"""
+    db.add(models.RefreshToken(user_id=user_id, family_id=family_id, created_at=now, **fields))
+    db.commit()
+
+def _revoke_refresh_family(db: Session, family_id: str, now: datetime) -> List[Tuple[str, datetime, int]]:
+    """Revoke every token in a family; returns (access_jti, access_expires_at, user_id) of the newly revoked"""
+    tokens = models.RefreshToken
+    revoked = db.execute(
+        select(tokens.access_jti, tokens.access_expires_at, tokens.user_id)
+        .where(tokens.family_id == family_id, tokens.revoked_at.is_(None))
+    ).all()
+    db.execute(update(tokens).where(tokens.family_id == family_id, tokens.revoked_at.is_(None)).values(revoked_at=now))
+    db.commit()
+    return [tuple(row) for row in revoked]
+
+def rotate_refresh_token(
+    db: Session, presented_hash: str, now: datetime, **fields
+) -> Tuple[Optional[str], List[Tuple[str, datetime, int]]]:
+    """Exchange an unexpired refresh token, by hash, for a new one in its family
+
+    Returns ``(owner's email, [])``. A token that was already used or revoked
+    revokes its whole family and returns ``(None, revoked)`` as for
+    ``_revoke_refresh_family``; an unknown or expired one returns ``(None, [])``.
+    """
+    tokens = models.RefreshToken
+    token = (
+        db.query(tokens).options(joinedload(tokens.user))
+        .filter(tokens.token_hash == presented_hash, tokens.expires_at > now)
+        .first()
+    )
+    if token is None:
+        return None, []
+    claimed = 0
+    if token.used_at is None and token.revoked_at is None:
+        # A conditional UPDATE, so two concurrent uses can't both succeed
+        claimed = db.execute(
+            update(tokens)
+            .where(tokens.id == token.id, tokens.used_at.is_(None), tokens.revoked_at.is_(None))
+            .values(used_at=now)
+        ).rowcount
+    if not claimed:
+        return None, _revoke_refresh_family(db, token.family_id, now)
+    email = token.user.email
+    db.add(models.RefreshToken(user_id=token.user_id, family_id=token.family_id, created_at=now, **fields))
+    db.commit()
+    return email, []
+
+def revoke_refresh_token(db: Session, token_hash: str, now: datetime) -> List[Tuple[str, datetime, int]]:
+    """Revoke the family of a refresh token, e.g. on logout; unknown tokens revoke nothing"""
+    family_id = db.execute(
+        select(models.RefreshToken.family_id).where(models.RefreshToken.token_hash == token_hash)
+    ).scalar()
+    return [] if family_id is None else _revoke_refresh_family(db, family_id, now)
+
+def get_revoked_access_tokens(db: Session, since: datetime, now: datetime) -> List[Tuple[str, datetime, int]]:
+    """(access_jti, access_expires_at, user_id) revoked after ``since`` whose access token hasn't expired"""
+    tokens = models.RefreshToken
+    return [
+        tuple(row) for row in db.execute(
+            select(tokens.access_jti, tokens.access_expires_at, tokens.user_id)
+            .where(tokens.revoked_at > since, tokens.access_expires_at > now)
+        )
+    ]
+
+def delete_expired_refresh_tokens(db: Session, now: datetime) -> int:
+    """Delete refresh tokens past their expiry; returns how many"""
+    deleted = db.execute(models.RefreshToken.__table__.delete().where(models.RefreshToken.expires_at <= now)).rowcount
+    db.commit()
+    return deleted
+
+# Feedback counter helpers
+STAT_FIELDS = (
+    "total_feedback",
+    "positive_feedback",
+    "neutral_feedback",
+    "negative_feedback",
+    "unacknowledged_feedback",
+)
+
+def empty_feedback_stats() -> dict:
+    return {field: 0 for field in STAT_FIELDS}
+
+def _to_sentiment(value) -> models.FeedbackSentiment:
+    """Accept a sentiment enum, its value ("positive") or its name ("POSITIVE")"""
+    if isinstance(value, models.FeedbackSentiment):
+        return value
+    return models.FeedbackSentiment(value.lower())
+
+def _owner_filter(user_id: int, role_side: models.UserRole):
+    if role_side == models.UserRole.MANAGER:
+        return models.Feedback.manager_id == user_id
+    return models.Feedback.employee_id == user_id
+
+def count_feedback(db: Session, user_id: int, role_side: models.UserRole) -> dict:
+    """Count a user's feedback with one grouped aggregate over the feedback table"""
+    counts = (
+        db.query(models.Feedback.sentiment, models.Feedback.acknowledged, func.count(models.Feedback.id))
+        .filter(_owner_filter(user_id, role_side))
+        .group_by(models.Feedback.sentiment, models.Feedback.acknowledged)
+        .all()
+    )
+    stats = empty_feedback_stats()
+    for sentiment, acknowledged, count in counts:
+        stats["total_feedback"] += count
+        stats[f"{sentiment.value}_feedback"] += count
+        if not acknowledged:
+            stats["unacknowledged_feedback"] += count
+    return stats
+
+def _bump_feedback_stats(db: Session, feedback: models.Feedback, **deltas) -> None:
+    """Apply counter deltas for both sides of a feedback item in the current transaction
+
+    Call this after the feedback change itself has been made on ``feedback``.
+    """
+    db.flush()
+    for user_id, side in (
+        (feedback.manager_id, models.UserRole.MANAGER),
+        (feedback.employee_id, models.UserRole.EMPLOYEE),
+    ):
+        _apply_stats_deltas(db, user_id, side, deltas)
+
+def _apply_stats_deltas(db: Session, user_id: int, side: models.UserRole, deltas: dict) -> None:
+    """Add ``deltas`` to one counters row; the feedback change must already be flushed"""
+    updated = (
+        db.query(models.FeedbackStats)
+        .filter(models.FeedbackStats.user_id == user_id, models.FeedbackStats.role_side == side)
+        .update(
+            {getattr(models.FeedbackStats, field): getattr(models.FeedbackStats, field) + delta
+             for field, delta in deltas.items()},
+            synchronize_session=False,
+        )
+    )
+    if not updated:
+        # No counters yet (e.g. a database that predates the table): derive
+        # them from the feedback table, which already includes this change
+        db.add(models.FeedbackStats(user_id=user_id, role_side=side, **count_feedback(db, user_id, side)))
+
+# Trend rollup helpers
+ROLLUP_GRANULARITIES = ("day", "week")
+ROLLUP_KEY_COLUMNS = ("granularity", "manager_id", "bucket", "employee_id", "sentiment")
+RollupKey = Tuple[str, int, date, int, models.FeedbackSentiment]
+
+# Keeps a trends response, and the dates it fills in, small
+MAX_TREND_BUCKETS = 366
+
+def rollup_bucket(moment, granularity: str) -> date:
+    """The UTC day, or the Monday starting the UTC week, that a datetime or date falls in"""
+    if isinstance(moment, datetime):
+        if moment.tzinfo is not None:
+            moment = moment.astimezone(timezone.utc)
+        moment = moment.date()
+    if granularity == "week":
+        return moment - timedelta(days=moment.weekday())
+    return moment
+
+def add_rollup_deltas(
+    deltas: Dict[RollupKey, int],
+    manager_id: int,
+    employee_id: int,
+    sentiment: models.FeedbackSentiment,
+    created_at: datetime,
+    delta: int = 1,
+) -> None:
+    """Accumulate one feedback item's contribution to every granularity in ``deltas``"""
+    for granularity in ROLLUP_GRANULARITIES:
+        key = (granularity, manager_id, rollup_bucket(created_at, granularity), employee_id, sentiment)
+        deltas[key] = deltas.get(key, 0) + delta
+
+def apply_rollup_deltas(db: Session, deltas: Dict[RollupKey, int]) -> None:
+    """Add ``deltas`` to the rollup rows in the current transaction, creating missing rows"""
+    rows = [
+        {**dict(zip(ROLLUP_KEY_COLUMNS, key)), "feedback_count": delta}
+        for key, delta in deltas.items() if delta
+    ]
+    if not rows:
+        return
+    rollups = models.FeedbackRollup.__table__
+    upsert = _ON_CONFLICT_INSERTS.get(db.get_bind().dialect.name)
+    if upsert is not None:
+        statement = upsert(rollups)
+        db.execute(
+            statement.on_conflict_do_update(
+                index_elements=list(ROLLUP_KEY_COLUMNS),
+                set_={"feedback_count": rollups.c.feedback_count + statement.excluded.feedback_count},
+            ),
+            rows,
+        )
+        return
+    for row in rows:
+        updated = db.execute(
+            update(rollups)
+            .where(*(rollups.c[column] == row[column] for column in ROLLUP_KEY_COLUMNS))
+            .values(feedback_count=rollups.c.feedback_count + row["feedback_count"])
+        ).rowcount
+        if not updated:
+            db.execute(insert(rollups).values(**row))
+
+# HTTP cache version helpers
+def get_cache_version(db: Session, user_id: int) -> int:
+    """The user's cache version; 0 until something they can read has changed"""
+    version = db.execute(
+        select(models.CacheVersion.version).where(models.CacheVersion.user_id == user_id)
+    ).scalar()
+    return version or 0
+
+def _with_ancestors(db: Session, user_ids: Iterable[int]) -> Set[int]:
+    """The given users plus everyone above them in the org"""
+    user_ids = set(user_ids)
+    closure = models.UserClosure
+    return user_ids | set(db.scalars(
+        select(closure.ancestor_id).where(closure.descendant_id.in_(user_ids)).distinct()
+    ))
+
+def _bump_cache_versions(db: Session, user_ids: Iterable[int]) -> None:
+    """Increment the cache versions of ``user_ids`` in the current transaction"""
+    # Sorted so concurrent writers lock rows in the same order
+    user_ids = sorted(set(user_ids))
+    if not user_ids:
+        return
+    versions = models.CacheVersion.__table__
+    upsert = _ON_CONFLICT_INSERTS.get(db.get_bind().dialect.name)
+    if upsert is not None:
+        statement = upsert(versions).values([{"user_id": user_id, "version": 1} for user_id in user_ids])
+        db.execute(statement.on_conflict_do_update(
+            index_elements=["user_id"], set_={"version": versions.c.version + 1}
+        ))
+        return
+    existing = set(db.scalars(select(versions.c.user_id).where(versions.c.user_id.in_(user_ids))))
+    db.execute(update(versions).where(versions.c.user_id.in_(existing)).values(version=versions.c.version + 1))
+    missing = [user_id for user_id in user_ids if user_id not in existing]
+    if missing:
+        db.execute(insert(versions), [{"user_id": user_id, "version": 1} for user_id in missing])
+
+def _chains_of(db: Session, user_ids: Iterable[int]) -> Dict[int, Set[int]]:
+    """Each user mapped to themselves plus everyone above them in the org"""
+    chains = {user_id: {user_id} for user_id in user_ids}
+    closure = models.UserClosure
+    for descendant_id, ancestor_id in db.execute(
+        select(closure.descendant_id, closure.ancestor_id).where(closure.descendant_id.in_(chains))
+    ):
+        chains[descendant_id].add(ancestor_id)
+    return chains
+
+def _bump_feedback_versions(db: Session, employee_ids: Iterable[int], manager_ids: Iterable[int]) -> Dict[int, Set[int]]:
+    """Invalidate reads of feedback between these people: theirs and everyone above the employees
+
+    Returns each employee's chain (them and everyone above them), which
+    together with the author is also who hears about the change.
+    """
+    chains = _chains_of(db, employee_ids)
+    _bump_cache_versions(db, set().union(*chains.values()) | set(manager_ids))
+    return chains
+
+def _queue_feedback_event(db: Session, event_type: str, chains: Dict[int, Set[int]], feedback_id: int, employee_id: int, manager_id: int) -> None:
+    """Push a feedback change to the employee, their chain and the author once it commits"""
+    events.queue_event(
+        db, event_type, chains[employee_id] | {manager_id},
+        {"feedback_id": feedback_id, "employee_id": employee_id, "manager_id": manager_id},
+    )
+
+def _user_viewers(db: Session, user_id: int) -> Set[int]:
+    """Everyone whose reads embed ``user_id`` or, through ``manager``, their direct reports"""
+    people = {user_id} | set(db.scalars(select(models.User.id).where(models.User.manager_id == user_id)))
+    feedback = models.Feedback
+    counterparts = set(db.scalars(
+        select(feedback.manager_id).where(feedback.employee_id.in_(people))
+        .union(select(feedback.employee_id).where(feedback.manager_id.in_(people)))
+    ))
+    return _with_ancestors(db, people) | counterparts
+
+# Tag helpers
+def normalize_tags(tags: Optional[List[str]]) -> List[str]:
+    """Strip tag names and drop blanks and duplicates, keeping their order"""
+    names = (tag.strip() for tag in tags or [])
+    return list(dict.fromkeys(name for name in names if name))
+
+# Dialect inserts that support ON CONFLICT
+_ON_CONFLICT_INSERTS = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
+
+def get_or_create_tags(db: Session, tags: Optional[List[str]]) -> List[models.Tag]:
+    """Resolve tag names to Tag rows, creating any that don't exist yet"""
+    names = normalize_tags(tags)
+    if not names:
+        return []
+    found = {tag.name: tag for tag in db.query(models.Tag).filter(models.Tag.name.in_(names))}
+    missing = [name for name in names if name not in found]
+    if missing:
+        insert_ignoring_conflicts = _ON_CONFLICT_INSERTS.get(db.get_bind().dialect.name)
+        if insert_ignoring_conflicts is not None:
+            # A concurrent writer may create the same tag; let its row win
+            db.execute(
+                insert_ignoring_conflicts(models.Tag)
+                .values([{"name": name} for name in missing])
+                .on_conflict_do_nothing(index_elements=["name"])
+            )
+        else:
+            db.add_all(models.Tag(name=name) for name in missing)
+            db.flush()
+        found.update((tag.name, tag) for tag in db.query(models.Tag).filter(models.Tag.name.in_(missing)))
+    return [found[name] for name in names]
+
+def get_tag_counts(
+    db: Session,
+    employee_id: Optional[int] = None,
+    manager_id: Optional[int] = None,
+    limit: int = 100,
+) -> List[Tuple[str, int]]:
+    """Tag names with the number of visible feedback items using them, most used first"""
+    usage = func.count(models.feedback_tags.c.feedback_id)
+    query = (
+        db.query(models.Tag.name, usage)
+        .join(models.feedback_tags, models.feedback_tags.c.tag_id == models.Tag.id)
+    )
+    if employee_id is not None or manager_id is not None:
+        query = query.join(models.Feedback, models.Feedback.id == models.feedback_tags.c.feedback_id)
+        if employee_id is not None:
+            query = query.filter(models.Feedback.employee_id == employee_id)
+        if manager_id is not None:
+            query = query.filter(models.Feedback.manager_id == manager_id)
+    rows = query.group_by(models.Tag.id, models.Tag.name).order_by(desc(usage), models.Tag.name).limit(limit).all()
+    return [(name, count) for name, count in rows]
 
 # Feedback CRUD operations
 def create_feedback(db: Session, feedback: schemas.FeedbackCreate, manager_id: int) -> models.Feedback:
@@ -52,26 +525,336 @@ def create_feedback(db: Session, feedback: schemas.FeedbackCreate, manager_id: i
         manager_id=manager_id,
         strengths=feedback.strengths,
         areas_to_improve=feedback.areas_to_improve,
-        sentiment=feedback.sentiment,
-        tags=",".join(feedback.tags) if feedback.tags and isinstance(feedback.tags, list) else "",
+        sentiment=_to_sentiment(feedback.sentiment),
+        acknowledged=False,
+        tags=get_or_create_tags(db, feedback.tags),
         is_anonymous=feedback.is_anonymous
     )
     db.add(db_feedback)
+    db.flush()
+    search.index_feedback(db, db_feedback)
+    _bump_feedback_stats(
+        db, db_feedback,
+        total_feedback=1,
+        unacknowledged_feedback=1,
+        **{f"{db_feedback.sentiment.value}_feedback": 1}
+    )
+    rollup_deltas: Dict[RollupKey, int] = {}
+    add_rollup_deltas(rollup_deltas, manager_id, db_feedback.employee_id, db_feedback.sentiment, db_feedback.created_at)
+    apply_rollup_deltas(db, rollup_deltas)
+    chains = _bump_feedback_versions(db, [db_feedback.employee_id], [manager_id])
+    feedback_id = db_feedback.id
+    _queue_feedback_event(db, "feedback.created", chains, feedback_id, db_feedback.employee_id, manager_id)
+    db.commit()
+    # Reload with the response's user graph in one statement instead of refresh + lazy loads
+    return get_feedback(db, feedback_id)
+
+NOT_ON_TEAM = "You can only create feedback for your team members"
+
+def create_feedback_bulk(
+    db: Session, items: List[schemas.FeedbackCreate], manager_id: int
+) -> List[Tuple[Optional[models.Feedback], Optional[str]]]:
+    """Create many feedback items in one transaction
+
+    Team membership is checked for every item with one IN query and the valid
+    items are inserted with a single executemany. Returns a (feedback, error)
+    pair per item in input order; an invalid item is reported, not fatal.
+    """
+    team = {
+        user_id for (user_id,) in
+        db.query(models.User.id)
+        .filter(models.User.id.in_({item.employee_id for item in items}), models.User.manager_id == manager_id)
+    }
+    errors: List[Optional[str]] = [None] * len(items)
+    rows, accepted = [], []
+    for position, item in enumerate(items):
+        if item.employee_id not in team:
+            errors[position] = NOT_ON_TEAM
+            continue
+        try:
+            sentiment = _to_sentiment(item.sentiment)
+        except ValueError:
+            errors[position] = f"Invalid sentiment: {item.sentiment}"
+            continue
+        rows.append({
+            "employee_id": item.employee_id,
+            "manager_id": manager_id,
+            "strengths": item.strengths,
+            "areas_to_improve": item.areas_to_improve,
+            "sentiment": sentiment,
+            "acknowledged": False,
+            "is_anonymous": item.is_anonymous,
+        })
+        accepted.append(position)
+    if not rows:
+        return [(None, error) for error in errors]
+
+    tag_ids = {
+        tag.name: tag.id
+        for tag in get_or_create_tags(db, [name for position in accepted for name in items[position].tags or []])
+    }
+    # RETURNING order isn't guaranteed, and asking SQLAlchemy to sort it makes
+    # SQLite fall back to one INSERT per row. The ids are allocated in insert
+    # order though, so sorting them lines them back up with ``rows``.
+    inserted = sorted(db.execute(
+        insert(models.Feedback).returning(models.Feedback.id, models.Feedback.created_at), rows
+    ).all())
+    feedback_ids = [feedback_id for feedback_id, _ in inserted]
+    links = [
+        {"feedback_id": feedback_id, "tag_id": tag_ids[name]}
+        for feedback_id, position in zip(feedback_ids, accepted)
+        for name in normalize_tags(items[position].tags)
+    ]
+    if links:
+        db.execute(models.feedback_tags.insert(), links)
+
+    search.index_feedback_many(
+        db,
+        db.query(models.Feedback).options(selectinload(models.Feedback.tags))
+        .filter(models.Feedback.id.in_(feedback_ids)).all(),
+    )
+    deltas: Dict[Tuple[int, models.UserRole], dict] = {}
+    for row in rows:
+        for key in ((manager_id, models.UserRole.MANAGER), (row["employee_id"], models.UserRole.EMPLOYEE)):
+            counters = deltas.setdefault(key, empty_feedback_stats())
+            counters["total_feedback"] += 1
+            counters["unacknowledged_feedback"] += 1
+            counters[f"{row['sentiment'].value}_feedback"] += 1
+    for (user_id, side), counters in deltas.items():
+        _apply_stats_deltas(db, user_id, side, {field: delta for field, delta in counters.items() if delta})
+    rollup_deltas: Dict[RollupKey, int] = {}
+    for row, (_, created_at) in zip(rows, inserted):
+        add_rollup_deltas(rollup_deltas, manager_id, row["employee_id"], row["sentiment"], created_at)
+    apply_rollup_deltas(db, rollup_deltas)
+    chains = _bump_feedback_versions(db, {row["employee_id"] for row in rows}, [manager_id])
+    for feedback_id, row in zip(feedback_ids, rows):
+        _queue_feedback_event(db, "feedback.created", chains, feedback_id, row["employee_id"], manager_id)
     db.commit()
-    db.refresh(db_feedback)
-    return db_feedback
+
+    created = {
+        feedback.id: feedback
+        for feedback in db.query(models.Feedback)
+        .options(*FEEDBACK_LOAD_OPTIONS)
+        .filter(models.Feedback.id.in_(feedback_ids))
+    }
+    results: List[Tuple[Optional[models.Feedback], Optional[str]]] = [(None, error) for error in errors]
+    for feedback_id, position in zip(feedback_ids, accepted):
+        results[position] = (created[feedback_id], None)
+    return results
 
 def get_feedback(db: Session, feedback_id: int) -> Optional[models.Feedback]:
     """Get feedback by ID"""
-    return db.query(models.Feedback).filter(models.Feedback.id == feedback_id).first()
+    return db.query(models.Feedback).options(*FEEDBACK_LOAD_OPTIONS).filter(models.Feedback.id == feedback_id).first()
 
 def get_feedback_for_employee(db: Session, employee_id: int) -> List[models.Feedback]:
     """Get all feedback for a specific employee"""
-    return db.query(models.Feedback).filter(models.Feedback.employee_id == employee_id).order_by(desc(models.Feedback.created_at)).all()
+    return db.query(models.Feedback).options(*FEEDBACK_LOAD_OPTIONS).filter(models.Feedback.employee_id == employee_id).order_by(desc(models.Feedback.created_at)).all()
 
 def get_feedback_by_manager(db: Session, manager_id: int) -> List[models.Feedback]:
     """Get all feedback created by a specific manager"""
-    return db.query(models.Feedback).filter(models.Feedback.manager_id == manager_id).order_by(desc(models.Feedback.created_at)).all()
+    return db.query(models.Feedback).options(*FEEDBACK_LOAD_OPTIONS).filter(models.Feedback.manager_id == manager_id).order_by(desc(models.Feedback.created_at)).all()
+
+def _naive_utc(value: datetime) -> datetime:
+    """Timestamps are stored as naive UTC; convert aware datetimes before comparing"""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def _filter_feedback(
+    query,
+    employee_id: Optional[int] = None,
+    manager_id: Optional[int] = None,
+    org_manager_id: Optional[int] = None,
+    max_depth: Optional[int] = None,
+    sentiment: Optional[str] = None,
+    acknowledged: Optional[bool] = None,
+    tag: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+):
+    """Apply the list endpoints' owner and filter parameters to a Query or select()
+
+    ``org_manager_id`` limits the results to feedback received by anyone in
+    that manager's org, up to ``max_depth`` levels down if given.
+    """
+    if employee_id is not None:
+        query = query.filter(models.Feedback.employee_id == employee_id)
+    if manager_id is not None:
+        query = query.filter(models.Feedback.manager_id == manager_id)
+    if org_manager_id is not None:
+        closure = models.UserClosure
+        query = query.join(closure, closure.descendant_id == models.Feedback.employee_id).filter(
+            closure.ancestor_id == org_manager_id, closure.depth >= 1
+        )
+        if max_depth is not None:
+            query = query.filter(closure.depth <= max_depth)
+    if sentiment is not None:
+        query = query.filter(models.Feedback.sentiment == _to_sentiment(sentiment))
+    if acknowledged is not None:
+        query = query.filter(models.Feedback.acknowledged == acknowledged)
+    if tag:
+        # Start from the tag's (tag_id, feedback_id) index so the cost follows
+        # the matching rows rather than the whole feedback table
+        query = (
+            query.join(models.feedback_tags, models.feedback_tags.c.feedback_id == models.Feedback.id)
+            .join(models.Tag, models.Tag.id == models.feedback_tags.c.tag_id)
+            .filter(models.Tag.name == tag.strip())
+        )
+    if created_from is not None:
+        query = query.filter(models.Feedback.created_at >= _naive_utc(created_from))
+    if created_to is not None:
+        query = query.filter(models.Feedback.created_at < _naive_utc(created_to))
+    return query
+
+def _keyset_page(query, limit: int, cursor: Optional[str]):
+    """Restrict a feedback Query or select() to the page after ``cursor``, newest first
+
+    Fetches one extra row so the caller can tell whether another page exists.
+    """
+    if cursor:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        query = query.filter(
+            models.Feedback.created_at <= cursor_created_at,
+            or_(
+                models.Feedback.created_at < cursor_created_at,
+                models.Feedback.id < cursor_id,
+            ),
+        )
+    return query.order_by(desc(models.Feedback.created_at), desc(models.Feedback.id)).limit(limit + 1)
+
+def _split_page(rows: list, limit: int) -> Tuple[list, Optional[str]]:
+    """Drop the look-ahead row from a ``_keyset_page`` result and encode the next cursor"""
+    items = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_cursor(items[-1].created_at, items[-1].id)
+    return items, next_cursor
+
+def get_feedback_page(
+    db: Session,
+    employee_id: Optional[int] = None,
+    manager_id: Optional[int] = None,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    sentiment: Optional[str] = None,
+    acknowledged: Optional[bool] = None,
+    tag: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+) -> Tuple[List[models.Feedback], Optional[str]]:
+    """Get one page of feedback, newest first, and the cursor for the next page
+
+    Pages are keyset-paginated on (created_at, id) so every page is a range
+    scan of the (employee_id|manager_id, created_at, id) index. Raises
+    ValueError for a malformed cursor or sentiment.
+    """
+    query = _filter_feedback(
+        db.query(models.Feedback).options(*FEEDBACK_LOAD_OPTIONS),
+        employee_id=employee_id, manager_id=manager_id, sentiment=sentiment,
+        acknowledged=acknowledged, tag=tag, created_from=created_from, created_to=created_to,
+    )
+    return _split_page(_keyset_page(query, limit, cursor).all(), limit)
+
+def get_feedback_page_rows(db: Session, limit: int = 50, cursor: Optional[str] = None, **filters) -> Tuple[List[dict], Optional[str]]:
+    """``get_feedback_page`` for read-only lists: plain dicts shaped like FeedbackResponse
+
+    Skips the ORM identity map and response validation; see ``read_models``.
+    """
+    query = _keyset_page(_filter_feedback(read_models.FEEDBACK_READ_SELECT, **filters), limit, cursor)
+    rows, next_cursor = _split_page(db.execute(query).all(), limit)
+    tags = _tag_names_by_feedback(db, [row.id for row in rows])
+    return read_models.feedback_from_rows(rows, tags), next_cursor
+
+def search_feedback(
+    db: Session,
+    query: str,
+    employee_id: Optional[int] = None,
+    manager_id: Optional[int] = None,
+    org_manager_id: Optional[int] = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> Tuple[List[Tuple[models.Feedback, float, str]], Optional[int]]:
+    """Full-text search over feedback, best match first
+
+    ``org_manager_id`` searches everything that manager may open, the same
+    rule as ``GET /feedback/{id}``. Returns ``(feedback, rank, snippet)``
+    hits and the offset of the next page, if any.
+    """
+    # Fetch one extra hit to learn whether another page exists
+    hits = search.search(
+        db, query, manager_id=manager_id, employee_id=employee_id, org_manager_id=org_manager_id,
+        limit=limit + 1, offset=offset,
+    )
+    next_offset = offset + limit if len(hits) > limit else None
+    hits = hits[:limit]
+    if not hits:
+        return [], None
+    feedback_by_id = {
+        feedback.id: feedback
+        for feedback in db.query(models.Feedback)
+        .options(*FEEDBACK_LOAD_OPTIONS)
+        .filter(models.Feedback.id.in_([feedback_id for feedback_id, _, _ in hits]))
+    }
+    return [(feedback_by_id[feedback_id], rank, snippet) for feedback_id, rank, snippet in hits], next_offset
+
+def feedback_export_query(**filters):
+    """Flat export rows, oldest first, with employee/manager names joined in
+
+    Takes the same owner and filter arguments as ``get_feedback_page`` and
+    raises ValueError for a bad sentiment, before anything is streamed.
+    """
+    employee = aliased(models.User)
+    manager = aliased(models.User)
+    query = (
+        select(
+            models.Feedback.id,
+            models.Feedback.created_at,
+            models.Feedback.updated_at,
+            models.Feedback.employee_id,
+            employee.name.label("employee_name"),
+            employee.email.label("employee_email"),
+            models.Feedback.manager_id,
+            manager.name.label("manager_name"),
+            models.Feedback.sentiment,
+            models.Feedback.strengths,
+            models.Feedback.areas_to_improve,
+            models.Feedback.acknowledged,
+            models.Feedback.acknowledged_at,
+            models.Feedback.employee_comment,
+            models.Feedback.is_anonymous,
+        )
+        .join(employee, employee.id == models.Feedback.employee_id)
+        .join(manager, manager.id == models.Feedback.manager_id)
+    )
+    return _filter_feedback(query, **filters).order_by(models.Feedback.created_at, models.Feedback.id)
+
+def _tag_names_by_feedback(db: Session, feedback_ids: List[int]) -> Dict[int, List[str]]:
+    """Tag names for a batch of feedback ids, sorted by name, from one IN query"""
+    tags: Dict[int, List[str]] = {}
+    if not feedback_ids:
+        return tags
+    for feedback_id, name in db.execute(
+        select(models.feedback_tags.c.feedback_id, models.Tag.name)
+        .join(models.Tag, models.Tag.id == models.feedback_tags.c.tag_id)
+        .where(models.feedback_tags.c.feedback_id.in_(feedback_ids))
+        .order_by(models.Tag.name)
+    ):
+        tags.setdefault(feedback_id, []).append(name)
+    return tags
+
+def iter_feedback_export(db: Session, query, batch_size: int = 1000) -> Iterator[List[dict]]:
+    """Run an export query through a server-side cursor, yielding batches of row dicts
+
+    Only one batch is held in memory at a time; each batch gets its tags from
+    one extra IN query.
+    """
+    result = db.execute(query.execution_options(yield_per=batch_size))
+    for partition in result.partitions():
+        rows = [row._asdict() for row in partition]
+        tags = _tag_names_by_feedback(db, [row["id"] for row in rows])
+        for row in rows:
+            row["tags"] = tags.get(row["id"], [])
+        yield rows
 
 def update_feedback(db: Session, feedback_id: int, feedback_update: schemas.FeedbackUpdate) -> Optional[models.Feedback]:
     """Update existing feedback"""
@@ -80,16 +863,39 @@ def update_feedback(db: Session, feedback_id: int, feedback_update: schemas.Feed
         return None
     
     update_data = feedback_update.dict(exclude_unset=True)
-    if 'tags' in update_data and update_data['tags'] is not None:
-        update_data['tags'] = ",".join(update_data['tags']) if isinstance(update_data['tags'], list) else ""
+    # A null tags field leaves the tags alone; [] clears them
+    if update_data.get('tags') is not None:
+        update_data['tags'] = get_or_create_tags(db, update_data['tags'])
+    else:
+        update_data.pop('tags', None)
+    if update_data.get('sentiment') is not None:
+        update_data['sentiment'] = _to_sentiment(update_data['sentiment'])
+    old_sentiment = db_feedback.sentiment
     
     for field, value in update_data.items():
         setattr(db_feedback, field, value)
     
+    if update_data.keys() & {'strengths', 'areas_to_improve', 'tags'}:
+        search.index_feedback(db, db_feedback)
+    
+    if db_feedback.sentiment != old_sentiment:
+        _bump_feedback_stats(
+            db, db_feedback,
+            **{f"{old_sentiment.value}_feedback": -1,
+               f"{db_feedback.sentiment.value}_feedback": 1}
+        )
+        rollup_deltas: Dict[RollupKey, int] = {}
+        for sentiment, delta in ((old_sentiment, -1), (db_feedback.sentiment, 1)):
+            add_rollup_deltas(
+                rollup_deltas, db_feedback.manager_id, db_feedback.employee_id, sentiment, db_feedback.created_at, delta
+            )
+        apply_rollup_deltas(db, rollup_deltas)
+    
     db_feedback.updated_at = datetime.utcnow()
+    chains = _bump_feedback_versions(db, [db_feedback.employee_id], [db_feedback.manager_id])
+    _queue_feedback_event(db, "feedback.updated", chains, feedback_id, db_feedback.employee_id, db_feedback.manager_id)
     db.commit()
-    db.refresh(db_feedback)
-    return db_feedback
+    return get_feedback(db, feedback_id)
 
 def acknowledge_feedback(db: Session, feedback_id: int) -> Optional[models.Feedback]:
     """Mark feedback as acknowledged"""
@@ -97,11 +903,55 @@ def acknowledge_feedback(db: Session, feedback_id: int) -> Optional[models.Feedb
     if not db_feedback:
         return None
     
+    was_acknowledged = db_feedback.acknowledged
     db_feedback.acknowledged = True
     db_feedback.acknowledged_at = datetime.now()
+    if not was_acknowledged:
+        _bump_feedback_stats(db, db_feedback, unacknowledged_feedback=-1)
+    chains = _bump_feedback_versions(db, [db_feedback.employee_id], [db_feedback.manager_id])
+    _queue_feedback_event(db, "feedback.acknowledged", chains, feedback_id, db_feedback.employee_id, db_feedback.manager_id)
     db.commit()
-    db.refresh(db_feedback)
-    return db_feedback
+    return get_feedback(db, feedback_id)
+
+def acknowledge_feedback_bulk(
+    db: Session,
+    employee_id: int,
+    feedback_ids: Optional[List[int]] = None,
+    before: Optional[datetime] = None,
+) -> List[int]:
+    """Acknowledge an employee's unacknowledged feedback in one UPDATE
+
+    Targets the given ids, or everything created before ``before``. Ids that
+    don't exist, belong to someone else or are already acknowledged are
+    skipped. Returns the ids that were acknowledged.
+    """
+    conditions = [models.Feedback.employee_id == employee_id, models.Feedback.acknowledged.isnot(True)]
+    if feedback_ids is not None:
+        conditions.append(models.Feedback.id.in_(feedback_ids))
+    if before is not None:
+        conditions.append(models.Feedback.created_at < _naive_utc(before))
+    acknowledged = db.execute(
+        update(models.Feedback)
+        .where(*conditions)
+        .values(acknowledged=True, acknowledged_at=datetime.now())
+        .returning(models.Feedback.id, models.Feedback.manager_id)
+        .execution_options(synchronize_session=False)
+    ).all()
+    if not acknowledged:
+        db.rollback()
+        return []
+
+    per_manager: Dict[int, int] = {}
+    for _, manager_id in acknowledged:
+        per_manager[manager_id] = per_manager.get(manager_id, 0) + 1
+    _apply_stats_deltas(db, employee_id, models.UserRole.EMPLOYEE, {"unacknowledged_feedback": -len(acknowledged)})
+    for manager_id, count in per_manager.items():
+        _apply_stats_deltas(db, manager_id, models.UserRole.MANAGER, {"unacknowledged_feedback": -count})
+    chains = _bump_feedback_versions(db, [employee_id], per_manager)
+    for feedback_id, manager_id in sorted(acknowledged):
+        _queue_feedback_event(db, "feedback.acknowledged", chains, feedback_id, employee_id, manager_id)
+    db.commit()
+    return sorted(feedback_id for feedback_id, _ in acknowledged)
 
 def add_employee_comment(db: Session, feedback_id: int, comment: str) -> Optional[models.Feedback]:
     """Add employee comment to feedback"""
@@ -110,27 +960,118 @@ def add_employee_comment(db: Session, feedback_id: int, comment: str) -> Optiona
         return None
     
     db_feedback.employee_comment = comment
+    search.index_feedback(db, db_feedback)
+    chains = _bump_feedback_versions(db, [db_feedback.employee_id], [db_feedback.manager_id])
+    _queue_feedback_event(db, "feedback.commented", chains, feedback_id, db_feedback.employee_id, db_feedback.manager_id)
     db.commit()
-    db.refresh(db_feedback)
-    return db_feedback
+    return get_feedback(db, feedback_id)
 
 # Dashboard helper functions
 def get_feedback_stats(db: Session, user_id: int, is_manager: bool = False) -> dict:
-    """Get feedback statistics for dashboard"""
-    if is_manager:
-        # Manager sees stats for feedback they've given
-        feedback_query = db.query(models.Feedback).filter(models.Feedback.manager_id == user_id)
+    """Get feedback statistics for dashboard
+
+    Counts are read from the user's feedback_stats row (falling back to a
+    grouped aggregate if it has not been backfilled yet) and the recent items
+    come from a separate LIMIT query.
+    """
+    # Managers see stats for feedback they've given, employees for feedback they've received
+    role_side = models.UserRole.MANAGER if is_manager else models.UserRole.EMPLOYEE
+
+    counters = db.get(models.FeedbackStats, (user_id, role_side))
+    if counters is not None:
+        stats = {field: getattr(counters, field) for field in STAT_FIELDS}
     else:
-        # Employee sees stats for feedback they've received
-        feedback_query = db.query(models.Feedback).filter(models.Feedback.employee_id == user_id)
-    
-    all_feedback = feedback_query.all()
-    
-    return {
-        "total_feedback": len(all_feedback),
-        "positive_feedback": len([f for f in all_feedback if f.sentiment == models.FeedbackSentiment.POSITIVE]),
-        "neutral_feedback": len([f for f in all_feedback if f.sentiment == models.FeedbackSentiment.NEUTRAL]),
-        "negative_feedback": len([f for f in all_feedback if f.sentiment == models.FeedbackSentiment.NEGATIVE]),
-        "recent_feedback": feedback_query.order_by(desc(models.Feedback.created_at)).limit(5).all(),
-        "unacknowledged_feedback": len([f for f in all_feedback if not f.acknowledged]) if not is_manager else 0
-    }
\ No newline at end of file
+        stats = count_feedback(db, user_id, role_side)
+
+    stats["recent_feedback"] = (
+        db.query(models.Feedback)
+        .options(*FEEDBACK_LOAD_OPTIONS)
+        .filter(_owner_filter(user_id, role_side))
+        .order_by(desc(models.Feedback.created_at))
+        .limit(5)
+        .all()
+    )
+    return stats
+
+def get_feedback_trends(
+    db: Session,
+    granularity: str,
+    start: date,
+    end: date,
+    manager_id: Optional[int] = None,
+    employee_id: Optional[int] = None,
+    org_manager_id: Optional[int] = None,
+) -> List[dict]:
+    """Feedback counts by sentiment for every bucket from ``start`` to ``end`` inclusive
+
+    Reads the rollups, so the cost depends on the number of buckets (and
+    people) in range, not on the number of feedback rows. ``org_manager_id``
+    limits the counts to feedback received by anyone in that manager's org.
+    Buckets without feedback are included with zero counts. Raises ValueError
+    for an unknown granularity or a range spanning too many buckets.
+    """
+    if granularity not in ROLLUP_GRANULARITIES:
+        raise ValueError(f"granularity must be one of: {', '.join(ROLLUP_GRANULARITIES)}")
+    first, last = rollup_bucket(start, granularity), rollup_bucket(end, granularity)
+    if last < first:
+        raise ValueError("from must not be after to")
+    step = timedelta(days=7 if granularity == "week" else 1)
+    if (last - first) // step + 1 > MAX_TREND_BUCKETS:
+        raise ValueError(f"A trend can span at most {MAX_TREND_BUCKETS} buckets")
+
+    rollup = models.FeedbackRollup
+    query = (
+        db.query(rollup.bucket, rollup.sentiment, func.sum(rollup.feedback_count))
+        .filter(rollup.granularity == granularity, rollup.bucket >= first, rollup.bucket <= last)
+    )
+    if manager_id is not None:
+        query = query.filter(rollup.manager_id == manager_id)
+    if employee_id is not None:
+        query = query.filter(rollup.employee_id == employee_id)
+    if org_manager_id is not None:
+        closure = models.UserClosure
+        query = query.join(closure, closure.descendant_id == rollup.employee_id).filter(
+            closure.ancestor_id == org_manager_id, closure.depth >= 1
+        )
+    counts = {}
+    for bucket, sentiment, count in query.group_by(rollup.bucket, rollup.sentiment):
+        counts[(bucket, sentiment)] = count
+
+    buckets = []
+    bucket = first
+    while bucket <= last:
+        entry = {"bucket": bucket, "total_feedback": 0}
+        for sentiment in models.FeedbackSentiment:
+            entry[f"{sentiment.value}_feedback"] = counts.get((bucket, sentiment), 0)
+            entry["total_feedback"] += entry[f"{sentiment.value}_feedback"]
+        buckets.append(entry)
+        bucket += step
+    return buckets
+
+# Sections of GET /bootstrap, in response order
+BOOTSTRAP_SECTIONS = ("profile", "dashboard", "team", "feedback")
+
+def get_bootstrap(db: Session, user_id: int, is_manager: bool, include: Set[str], feedback_limit: int = 50) -> dict:
+    """The reads behind the app's first screen, back to back on one session
+
+    Returns the ``include``d sections: the user, their dashboard stats, their
+    team with feedback counts (managers only) and the first page of their
+    feedback as rows. The manager dashboard reuses the team query.
+    """
+    sections = {}
+    if "profile" in include:
+        sections["profile"] = get_user(db, user_id)
+    team = get_team_members_with_stats(db, user_id) if is_manager and include & {"dashboard", "team"} else []
+    if "dashboard" in include:
+        dashboard = get_feedback_stats(db, user_id, is_manager=is_manager)
+        if is_manager:
+            dashboard.update(team_size=len(team), team_members=[user for user, _ in team])
+        sections["dashboard"] = dashboard
+    if "team" in include and is_manager:
+        sections["team"] = team
+    if "feedback" in include:
+        owner = {"manager_id": user_id} if is_manager else {"employee_id": user_id}
+        items, next_cursor = get_feedback_page_rows(db, limit=feedback_limit, **owner)
+        sections["feedback"] = {"items": items, "next_cursor": next_cursor}
+    return sections
+
@@ -1,27 +1,130 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 import os
 
-# SQLite database URL
-SQLALCHEMY_DATABASE_URL = "sqlite:///./feedback_tool.db"
+# Database URL (SQLite by default)
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./feedback_tool.db")
+
+# Connection pool settings, applied to both engines. Use the /health/db pool
+# stats under real traffic to size these.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+# Per-connection SQLite tuning: WAL lets readers proceed while a writer
+# commits, and busy_timeout makes writers wait for each other instead of
+# failing with "database is locked"
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE_KIB = int(os.getenv("SQLITE_CACHE_SIZE_KIB", str(64 * 1024)))
+
+# Serve requests from an AsyncEngine/AsyncSession instead of the blocking
+# engine. Both engines point at the same database, so the modes can be A/B
+# tested against the same data.
+DATABASE_ASYNC = os.getenv("DATABASE_ASYNC", "false").lower() in ("1", "true", "yes")
+
+# Async drivers for each sync backend
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+def to_async_url(url: str) -> str:
+    """Swap a sync database URL's driver for its async counterpart"""
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+def _engine_options(url: str, is_async: bool = False) -> dict:
+    """Pool and driver options for a database URL"""
+    parsed = make_url(url)
+    options = {"pool_pre_ping": DB_POOL_PRE_PING}
+    if parsed.get_backend_name() == "sqlite":
+        options["connect_args"] = {"check_same_thread": False}  # Needed for SQLite
+        if parsed.database in (None, "", ":memory:"):
+            # In-memory databases live in a single connection; there is no pool to size
+            return options
+        if is_async:
+            # aiosqlite defaults to NullPool, opening a connection per checkout
+            options["poolclass"] = AsyncAdaptedQueuePool
+    options.update(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
+    return options
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KIB}")
+    cursor.close()
+
+def _configure_engine(sync_engine) -> None:
+    if sync_engine.dialect.name == "sqlite":
+        event.listen(sync_engine, "connect", _apply_sqlite_pragmas)
 
 # Create engine
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, 
-    connect_args={"check_same_thread": False}  # Needed for SQLite
-)
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **_engine_options(SQLALCHEMY_DATABASE_URL))
+_configure_engine(engine)
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine and sessions, only created when the async mode is enabled.
+# Objects must stay usable after commit because lazy loads can't run outside
+# the session's greenlet, so nothing is expired on commit.
+async_engine = None
+AsyncSessionLocal = None
+if DATABASE_ASYNC:
+    async_engine = create_async_engine(
+        to_async_url(SQLALCHEMY_DATABASE_URL), **_engine_options(SQLALCHEMY_DATABASE_URL, is_async=True)
+    )
+    _configure_engine(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 # Create Base class
 Base = declarative_base()
 
 # Dependency to get DB session
-def get_db():
+def get_sync_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Routes depend on get_db and go through app.async_crud, which accepts either
+# kind of session
+get_db = get_async_db if DATABASE_ASYNC else get_sync_db
+
+def pool_stats() -> dict:
+    """Connection pool usage for each engine serving requests"""
+    engines = {"sync": engine}
+    if async_engine is not None:
+        engines["async"] = async_engine.sync_engine
+    stats = {}
+    for name, bound in engines.items():
+        pool = bound.pool
+        entry = {"pool": type(pool).__name__, "status": pool.status()}
+        # Only queue-style pools track these counters
+        for counter in ("size", "checkedin", "checkedout", "overflow"):
+            if hasattr(pool, counter):
+                entry[counter] = getattr(pool, counter)()
+        stats[name] = entry
+    return stats
\ No newline at end of file
@@ -0,0 +1,257 @@
+"""Server-sent events for feedback changes.
+
+``crud`` queues events on the session with ``queue_event`` while it writes;
+they are published only once that transaction commits, so subscribers never
+hear about changes that were rolled back. Publishing goes through an
+``EventBackend``: the default ``LocalEventBackend`` delivers in-process,
+which is enough for a single worker. With several workers, point
+``EVENTS_BACKEND`` at a backend that fans events out over a shared channel
+(Redis pub/sub, Postgres LISTEN/NOTIFY, ...) and calls every worker's
+``deliver`` callback.
+
+Each worker's ``EventBroker`` keeps its subscribers and the last
+``EVENTS_REPLAY_SIZE`` events. Every connection gets a bounded queue. A
+client that falls ``EVENTS_QUEUE_SIZE`` events behind is disconnected rather
+than buffered without limit; it reconnects with ``Last-Event-ID`` and the
+missed events are replayed from the buffer. A client too far behind for the
+buffer, or one returning after a restart, gets a ``reset`` event instead and
+should refetch what it shows.
+"""
+import asyncio
+import importlib
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+import orjson
+from sqlalchemy import event as sa_event
+from sqlalchemy.orm import Session
+
+# "local", or "package.module:ClassName" for a multi-worker EventBackend
+EVENTS_BACKEND = os.getenv("EVENTS_BACKEND", "local")
+# Undelivered events per connection before a slow client is dropped
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", "256"))
+# Recent events kept per worker for Last-Event-ID resume
+EVENTS_REPLAY_SIZE = int(os.getenv("EVENTS_REPLAY_SIZE", "2048"))
+# Idle seconds between keep-alive comments, so proxies don't close the stream
+EVENTS_HEARTBEAT_SECONDS = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+# Reconnect delay suggested to clients, in milliseconds
+EVENTS_RETRY_MS = int(os.getenv("EVENTS_RETRY_MS", "3000"))
+
+EVENT_TYPES = ("feedback.created", "feedback.updated", "feedback.acknowledged", "feedback.commented")
+
+HEARTBEAT = b": ping\n\n"
+
+@dataclass(frozen=True)
+class Event:
+    id: str  # unique per backend; opaque to the broker
+    type: str
+    user_ids: FrozenSet[int]  # who receives it
+    data: dict
+
+    def encode(self) -> bytes:
+        """The event as one SSE frame"""
+        return b"id: %s\nevent: %s\ndata: %s\n\n" % (self.id.encode(), self.type.encode(), orjson.dumps(self.data))
+
+def reset_frame(last_id: Optional[str]) -> bytes:
+    """Tell a client it missed events; ``last_id`` is where it should resume from next time"""
+    return b"id: %s\nevent: reset\ndata: {}\n\n" % (last_id or "").encode()
+
+class EventBackend:
+    """Transport between publishers and every worker's broker
+
+    ``publish`` may be called from any thread. It must eventually call the
+    ``deliver`` callback given to ``start`` with an ``Event``, once in every
+    worker and possibly from another thread. Ids must be unique across workers.
+    """
+
+    def start(self, deliver: Callable[[Event], None]) -> None:
+        raise NotImplementedError
+
+    def publish(self, type: str, user_ids: FrozenSet[int], data: dict) -> None:
+        raise NotImplementedError
+
+class LocalEventBackend(EventBackend):
+    """In-process delivery for a single worker, or a stand-in for tests and benches"""
+
+    def __init__(self):
+        # A fresh prefix per process, so ids from before a restart never match
+        self._prefix = format(time.time_ns(), "x")
+        self._sequence = itertools.count(1)
+        self._deliver: Optional[Callable[[Event], None]] = None
+
+    def start(self, deliver: Callable[[Event], None]) -> None:
+        self._deliver = deliver
+
+    def publish(self, type: str, user_ids: FrozenSet[int], data: dict) -> None:
+        if self._deliver is not None:
+            self._deliver(Event(f"{self._prefix}-{next(self._sequence)}", type, user_ids, data))
+
+def load_backend(spec: str) -> EventBackend:
+    if spec == "local":
+        return LocalEventBackend()
+    module_name, _, class_name = spec.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+@dataclass(eq=False)
+class Subscriber:
+    user_id: int
+    loop: asyncio.AbstractEventLoop
+    queue: asyncio.Queue
+    overflowed: bool = False
+
+class EventBroker:
+    """Per-worker fan-out of backend events to connected clients"""
+
+    def __init__(self, backend: EventBackend, queue_size: int, replay_size: int):
+        self.backend = backend
+        self.queue_size = queue_size
+        self._replay: "deque[Event]" = deque(maxlen=replay_size)
+        self._subscribers: Dict[int, Set[Subscriber]] = {}
+        self._lock = threading.Lock()
+        self.published = 0
+        self.delivered = 0
+        self.replayed = 0
+        self.resets = 0
+        self.dropped = 0
+        backend.start(self._deliver)
+
+    def publish(self, type: str, user_ids: Iterable[int], data: dict) -> None:
+        self.backend.publish(type, frozenset(user_ids), data)
+
+    def _deliver(self, event: Event) -> None:
+        with self._lock:
+            self.published += 1
+            self._replay.append(event)
+            targets = [
+                subscriber
+                for user_id in event.user_ids
+                for subscriber in self._subscribers.get(user_id, ())
+            ]
+            for subscriber in targets:
+                try:
+                    subscriber.loop.call_soon_threadsafe(self._offer, subscriber, event)
+                except RuntimeError:
+                    # The subscriber's loop is gone; nobody is reading its queue
+                    self._remove(subscriber)
+
+    def _offer(self, subscriber: Subscriber, event: Event) -> None:
+        """Queue an event for one connection, on its loop; drops clients that fall too far behind"""
+        if subscriber.overflowed:
+            return
+        try:
+            subscriber.queue.put_nowait(event)
+            self.delivered += 1
+        except asyncio.QueueFull:
+            subscriber.overflowed = True
+            with self._lock:
+                self.dropped += 1
+                self._remove(subscriber)
+
+    def _remove(self, subscriber: Subscriber) -> None:
+        subscribers = self._subscribers.get(subscriber.user_id)
+        if subscribers is not None:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._subscribers[subscriber.user_id]
+
+    def subscribe(self, user_id: int, last_event_id: Optional[str] = None) -> Tuple[Subscriber, List[bytes]]:
+        """Register a connection; returns it and the frames to send before its live events
+
+        With ``last_event_id`` those are the user's events after it, or a
+        ``reset`` if it is no longer in the replay buffer. Registration and
+        the replay snapshot happen under one lock, so no event is missed or
+        sent twice.
+        """
+        subscriber = Subscriber(user_id, asyncio.get_running_loop(), asyncio.Queue(maxsize=self.queue_size))
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscriber)
+            if last_event_id is None:
+                return subscriber, []
+            replay = list(self._replay)
+            position = next((i for i, event in enumerate(replay) if event.id == last_event_id), None)
+            if position is None:
+                self.resets += 1
+                return subscriber, [reset_frame(replay[-1].id if replay else None)]
+            frames = [event.encode() for event in replay[position + 1:] if user_id in event.user_ids]
+            self.replayed += len(frames)
+            return subscriber, frames
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        with self._lock:
+            self._remove(subscriber)
+
+    async def stream(
+        self,
+        user_id: int,
+        last_event_id: Optional[str] = None,
+        still_valid: Optional[Callable[[], bool]] = None,
+    ) -> AsyncIterator[bytes]:
+        """SSE frames for one connection: replay, then live events with heartbeats while idle
+
+        ``still_valid`` is checked before each heartbeat or event; once it
+        returns False the stream ends, e.g. when the credentials it was opened
+        with expire or are revoked, and the client has to reconnect.
+        """
+        subscriber, frames = self.subscribe(user_id, last_event_id)
+        getter = None
+        try:
+            yield b"retry: %d\n\n" % EVENTS_RETRY_MS
+            for frame in frames:
+                yield frame
+            while True:
+                # Keep one pending get() across heartbeats so no event is lost to a timeout
+                if getter is None:
+                    getter = asyncio.ensure_future(subscriber.queue.get())
+                done, _ = await asyncio.wait({getter}, timeout=EVENTS_HEARTBEAT_SECONDS)
+                if still_valid is not None and not still_valid():
+                    return
+                if not done:
+                    yield HEARTBEAT
+                    continue
+                event, getter = getter.result(), None
+                yield event.encode()
+                if subscriber.overflowed and subscriber.queue.empty():
+                    # Dropped for falling behind; the client resumes from here with Last-Event-ID
+                    return
+        finally:
+            if getter is not None:
+                getter.cancel()
+            self.unsubscribe(subscriber)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "subscribers": sum(len(subscribers) for subscribers in self._subscribers.values()),
+                "users": len(self._subscribers),
+                "published": self.published,
+                "delivered": self.delivered,
+                "replayed": self.replayed,
+                "resets": self.resets,
+                "dropped": self.dropped,
+                "replay_buffered": len(self._replay),
+            }
+
+broker = EventBroker(load_backend(EVENTS_BACKEND), EVENTS_QUEUE_SIZE, EVENTS_REPLAY_SIZE)
+
+# Events queued by crud wait in session.info until their transaction ends
+_PENDING = "pending_events"
+
+def queue_event(db: Session, type: str, user_ids: Iterable[int], data: dict) -> None:
+    """Publish an event to ``user_ids`` once the session's transaction commits"""
+    db.info.setdefault(_PENDING, []).append((type, frozenset(user_ids), data))
+
+@sa_event.listens_for(Session, "after_commit")
+def _publish_pending(session: Session) -> None:
+    for type, user_ids, data in session.info.pop(_PENDING, ()):
+        broker.publish(type, user_ids, data)
+
+@sa_event.listens_for(Session, "after_transaction_end")
+def _discard_pending(session: Session, transaction) -> None:
+    # Anything still pending when the outermost transaction ends was rolled back
+    if transaction.parent is None:
+        session.info.pop(_PENDING, None)
\ No newline at end of file
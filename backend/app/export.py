@@ -0,0 +1,92 @@
+"""Streaming feedback exports.
+
+``stream_export`` turns a ``crud.feedback_export_query`` into an iterator of
+CSV or NDJSON text chunks, one chunk per database batch, for a
+``StreamingResponse``. It opens its own session on the sync engine and holds
+a single batch at a time, so memory stays flat however many rows are
+exported. Starlette runs the iterator in its threadpool, which keeps the
+blocking cursor reads off the event loop in both database modes.
+"""
+import csv
+import enum
+import io
+import json
+from datetime import datetime
+from typing import Iterator
+
+from app import crud
+from app.database import SessionLocal
+
+EXPORT_COLUMNS = (
+    "id",
+    "created_at",
+    "updated_at",
+    "employee_id",
+    "employee_name",
+    "employee_email",
+    "manager_id",
+    "manager_name",
+    "sentiment",
+    "strengths",
+    "areas_to_improve",
+    "tags",
+    "acknowledged",
+    "acknowledged_at",
+    "employee_comment",
+    "is_anonymous",
+)
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+def _plain(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+# Spreadsheet apps evaluate cells starting with these as formulas
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+def _csv_cell(value):
+    if value is None:
+        return ""
+    value = _plain(value)
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+def _csv_batches(batches) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for rows in batches:
+        for row in rows:
+            row["tags"] = ",".join(row["tags"])
+            writer.writerow([_csv_cell(row[column]) for column in EXPORT_COLUMNS])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Header only, for an empty export
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def _ndjson_batches(batches) -> Iterator[str]:
+    for rows in batches:
+        yield "".join(json.dumps({column: _plain(row[column]) for column in EXPORT_COLUMNS}) + "\n" for row in rows)
+
+FORMATTERS = {
+    "csv": _csv_batches,
+    "ndjson": _ndjson_batches,
+}
+
+def stream_export(query, export_format: str, batch_size: int = 1000) -> Iterator[str]:
+    """Yield the rows of ``query`` as ``export_format`` text, one chunk per batch"""
+    db = SessionLocal()
+    try:
+        yield from FORMATTERS[export_format](crud.iter_feedback_export(db, query, batch_size=batch_size))
+    finally:
+        db.close()
\ No newline at end of file
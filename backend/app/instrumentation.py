@@ -0,0 +1,228 @@
+"""Per-request timing and SQL instrumentation.
+
+``InstrumentationMiddleware`` opens a ``RequestTimings`` for every HTTP
+request and keeps it in a context variable while the request runs, which
+reaches crud code in both database modes. It records:
+
+* ``db``        - statements and their time, from cursor events on the engines
+* ``auth``      - bcrypt and JWT work, wrapped in ``phase("auth")`` in ``auth.py``
+* ``serialize`` - from the endpoint returning (``TimedRoute`` notes when) to
+  the response starting: response-model validation, encoding and rendering
+* ``total``     - the whole request
+
+Each response carries them in a ``Server-Timing`` header. ``/metrics`` exposes
+them as Prometheus histograms labelled by method and route template.
+Requests slower than ``SLOW_REQUEST_MS`` are logged with their slowest SQL
+statements. Parameters are never logged.
+
+``METRICS_ENABLED=false`` leaves out the middleware, the engine listeners and
+``/metrics`` altogether; ``bench/instrumentation.py`` measures the overhead.
+"""
+import asyncio
+import functools
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+from fastapi import Response
+from fastapi.routing import APIRoute
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess
+from sqlalchemy import event
+
+from app.middleware import current_request_id
+
+# Master switch for everything in this module
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+# The Server-Timing header shows clients where time went; turn it off to keep that internal
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING", "true").lower() in ("1", "true", "yes")
+# Requests at least this slow are logged with their SQL; 0 turns the log off
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "500"))
+# How many of a slow request's statements to log, slowest first
+SLOW_REQUEST_STATEMENTS = int(os.getenv("SLOW_REQUEST_STATEMENTS", "5"))
+
+logger = logging.getLogger(__name__)
+
+LABELS = ("method", "route")
+PHASE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+REQUEST_SECONDS = Histogram("http_request_duration_seconds", "Request latency", LABELS + ("status",))
+DB_STATEMENTS = Histogram(
+    "http_request_db_statements", "SQL statements per request", LABELS,
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+)
+DB_SECONDS = Histogram("http_request_db_seconds", "Time in SQL statements per request", LABELS, buckets=PHASE_BUCKETS)
+AUTH_SECONDS = Histogram("http_request_auth_seconds", "Time hashing passwords and handling JWTs per request", LABELS, buckets=PHASE_BUCKETS)
+SERIALIZE_SECONDS = Histogram(
+    "http_request_serialize_seconds", "Time validating and encoding the response per request", LABELS, buckets=PHASE_BUCKETS,
+)
+SLOW_REQUESTS = Counter("http_slow_requests", "Requests slower than SLOW_REQUEST_MS", LABELS)
+
+class RequestTimings:
+    """What one request spent its time on; seconds throughout"""
+
+    __slots__ = ("started", "db_statements", "db_seconds", "auth_seconds", "endpoint_returned", "serialize_seconds", "statements")
+
+    def __init__(self, capture_statements: bool):
+        self.started = time.perf_counter()
+        self.db_statements = 0
+        self.db_seconds = 0.0
+        self.auth_seconds = 0.0
+        self.endpoint_returned: Optional[float] = None
+        self.serialize_seconds = 0.0
+        # (seconds, SQL) per statement, kept only when the slow log is on
+        self.statements: Optional[List[Tuple[float, str]]] = [] if capture_statements else None
+
+    def server_timing(self, total: float) -> str:
+        return (
+            f'db;dur={self.db_seconds * 1000:.2f};desc="{self.db_statements} statements", '
+            f"auth;dur={self.auth_seconds * 1000:.2f}, "
+            f"serialize;dur={self.serialize_seconds * 1000:.2f}, "
+            f"total;dur={total * 1000:.2f}"
+        )
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+@contextmanager
+def phase(name: str):
+    """Add the time spent in the block to the current request's ``<name>_seconds``"""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        attribute = f"{name}_seconds"
+        setattr(timings, attribute, getattr(timings, attribute) + time.perf_counter() - started)
+
+def _mark_endpoint_returned(endpoint):
+    """Wrap an endpoint so the request's serialize phase starts when it returns"""
+    if getattr(endpoint, "_marks_return", False):
+        return endpoint
+
+    def mark():
+        timings = _current.get()
+        if timings is not None:
+            timings.endpoint_returned = time.perf_counter()
+
+    if asyncio.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                mark()
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                mark()
+    wrapper._marks_return = True
+    return wrapper
+
+class TimedRoute(APIRoute):
+    """APIRoute whose endpoint notes when it returns, so the rest of the handler counts as serialization"""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, _mark_endpoint_returned(endpoint), **kwargs)
+
+_STARTED = "instrumentation_started"
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault(_STARTED, []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timings = _current.get()
+    if timings is None:
+        return
+    elapsed = time.perf_counter() - conn.info[_STARTED].pop()
+    timings.db_statements += 1
+    timings.db_seconds += elapsed
+    if timings.statements is not None:
+        timings.statements.append((elapsed, statement))
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute
+    connection = exception_context.connection
+    if _current.get() is not None and connection is not None and connection.info.get(_STARTED):
+        connection.info[_STARTED].pop()
+
+def instrument_engine(sync_engine) -> None:
+    """Time every statement ``sync_engine`` runs on behalf of a request"""
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+def _log_slow_request(scope, route: str, status: int, total: float, timings: RequestTimings) -> None:
+    lines = [
+        f"Slow request {scope['method']} {scope['path']} (route {route}, request id {current_request_id()}) "
+        f"-> {status} in {total * 1000:.1f} ms: "
+        f"{timings.db_statements} SQL statements in {timings.db_seconds * 1000:.1f} ms, "
+        f"auth {timings.auth_seconds * 1000:.1f} ms, serialize {timings.serialize_seconds * 1000:.1f} ms"
+    ]
+    for elapsed, statement in sorted(timings.statements or (), key=lambda entry: entry[0], reverse=True)[:SLOW_REQUEST_STATEMENTS]:
+        lines.append(f"  {elapsed * 1000:8.1f} ms  {' '.join(statement.split())}")
+    logger.warning("\n".join(lines))
+
+class InstrumentationMiddleware:
+    """Pure ASGI middleware that times each HTTP request; add it outside all but ``RequestIDMiddleware``"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        timings = RequestTimings(capture_statements=SLOW_REQUEST_MS > 0)
+        token = _current.set(timings)
+        status = 500
+        streaming = False
+
+        async def send_with_timings(message):
+            nonlocal status, streaming
+            if message["type"] == "http.response.start":
+                now = time.perf_counter()
+                status = message["status"]
+                if timings.endpoint_returned is not None:
+                    timings.serialize_seconds = now - timings.endpoint_returned
+                headers = list(message.get("headers", ()))
+                streaming = any(name == b"content-type" and value.startswith(b"text/event-stream") for name, value in headers)
+                if SERVER_TIMING_ENABLED:
+                    headers.append((b"server-timing", timings.server_timing(now - timings.started).encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timings)
+        finally:
+            _current.reset(token)
+            total = time.perf_counter() - timings.started
+            # The router stores the matched route in the scope; label unmatched paths
+            # together so 404 scans can't blow up the label set
+            route = getattr(scope.get("route"), "path", "unmatched")
+            labels = (scope["method"], route)
+            REQUEST_SECONDS.labels(*labels, str(status)).observe(total)
+            DB_STATEMENTS.labels(*labels).observe(timings.db_statements)
+            DB_SECONDS.labels(*labels).observe(timings.db_seconds)
+            AUTH_SECONDS.labels(*labels).observe(timings.auth_seconds)
+            SERIALIZE_SECONDS.labels(*labels).observe(timings.serialize_seconds)
+            # Event streams are meant to stay open
+            if SLOW_REQUEST_MS > 0 and total * 1000 >= SLOW_REQUEST_MS and not streaming:
+                SLOW_REQUESTS.labels(*labels).inc()
+                _log_slow_request(scope, route, status, total, timings)
+
+def metrics_response() -> Response:
+    """The Prometheus exposition, merged across workers when PROMETHEUS_MULTIPROC_DIR is set"""
+    registry = REGISTRY
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
\ No newline at end of file
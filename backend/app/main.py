@@ -1,54 +1,76 @@
-from fastapi import FastAPI, Request
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from app.database import engine, Base
-from app.routers import auth, user, feedback, dashboard
+from app.caching import NotModified, conditional_stats, not_modified_response
+from app.database import engine, async_engine, pool_stats
+from app.auth import ACCESS_TOKEN_EXPIRE_MINUTES
+from app.principals import principal_cache
+from app.responses import ORJSONResponse
+from app.schema import check_schema
+from app.tokens import load_revocations, revoked_tokens, sync_revocations
+from app.events import broker
+from app.middleware import CORS_ORIGINS, COMPRESSION_ENCODINGS, REQUEST_ID_HEADER, CompressionMiddleware, RequestIDMiddleware
+from app.instrumentation import METRICS_ENABLED, InstrumentationMiddleware, TimedRoute, instrument_engine, metrics_response
+from app.routers import auth, user, feedback, dashboard, events, bootstrap
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Migrations run before workers start (`alembic upgrade head`); a worker
+    # only checks that the database is at the revision it was written for
+    check_schema(engine)
+    # Rebuild the in-memory revocation set from every access token that can
+    # still be in use, then keep it in step with the other workers
+    since = datetime.utcnow() - timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    load_revocations(since)
+    sync = asyncio.create_task(sync_revocations(since))
+    yield
+    sync.cancel()
 
 # Create FastAPI app
 app = FastAPI(
     title="Internal Feedback Tool API",
     description="A tool for structured feedback sharing between managers and team members",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
-# List of allowed origins (add your frontend URL here)
-origins = [
-    "http://localhost:3000",
-    "http://localhost:5173",
-    "http://127.0.0.1:5173",
-    "http://localhost:8000",
-]
-
-# Add CORS middleware for frontend integration
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,
-    allow_credentials=True,
-    allow_methods=["*"],  # Allow all methods
-    allow_headers=["*"],  # Allow all headers
-    expose_headers=["Content-Disposition"],  # Expose additional headers if needed
-)
+# Middleware, innermost first; everything is pure ASGI (see app/middleware.py)
+if COMPRESSION_ENCODINGS:
+    app.add_middleware(CompressionMiddleware)
+if CORS_ORIGINS:
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=CORS_ORIGINS,
+        allow_credentials=True,
+        allow_methods=["*"],  # Allow all methods
+        allow_headers=["*"],  # Allow all headers
+        expose_headers=["Content-Disposition", REQUEST_ID_HEADER],
+    )
+# Request timing, SQL statement counts and the slow-request log
+if METRICS_ENABLED:
+    instrument_engine(engine)
+    if async_engine is not None:
+        instrument_engine(async_engine.sync_engine)
+    app.add_middleware(InstrumentationMiddleware)
+# Outermost, so every other layer and its logs see the request id
+app.add_middleware(RequestIDMiddleware)
+# Routes defined below also mark when their endpoint returns
+app.router.route_class = TimedRoute
 
-# Add middleware to handle CORS preflight requests
-@app.middleware("http")
-async def add_cors_headers(request: Request, call_next):
-    response = await call_next(request)
-    if request.method == "OPTIONS":
-        response.headers["Access-Control-Allow-Origin"] = request.headers.get("Origin", "*")
-        response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, OPTIONS"
-        response.headers["Access-Control-Allow-Headers"] = "Content-Type, Authorization"
-        response.headers["Access-Control-Allow-Credentials"] = "true"
-        response.status_code = 200
-    return response
+# Conditional GETs short-circuit from a dependency with a bodiless 304
+app.add_exception_handler(NotModified, not_modified_response)
 
 # Include routers
 app.include_router(auth.router)
 app.include_router(user.router)
 app.include_router(feedback.router)
 app.include_router(dashboard.router)
+app.include_router(events.router)
+app.include_router(bootstrap.router)
 
 @app.get("/")
 async def root():
@@ -56,4 +78,35 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+@app.get("/health/db")
+async def database_health():
+    """Connection pool checked-out/overflow stats for sizing the pool"""
+    return pool_stats()
+
+@app.get("/health/principal-cache")
+async def principal_cache_stats():
+    """Hit/miss/eviction counters for the authenticated principal cache"""
+    return principal_cache.stats()
+
+@app.get("/health/revoked-tokens")
+async def revoked_token_stats():
+    """Size of this worker's in-memory set of revoked access tokens"""
+    return revoked_tokens.stats()
+
+@app.get("/health/http-cache")
+async def http_cache_stats():
+    """Conditional GET counters and 304 hit rates, overall and per route"""
+    return conditional_stats.stats()
+
+@app.get("/health/events")
+async def event_stats():
+    """Connected event streams and publish/delivery/drop counters for this worker"""
+    return broker.stats()
+
+if METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Prometheus histograms of latency, SQL statements and phase times per route"""
+        return metrics_response()
\ No newline at end of file
@@ -0,0 +1,200 @@
+"""Pure ASGI middleware and its configuration.
+
+Everything here wraps the ``send`` callable rather than going through
+``BaseHTTPMiddleware``, so requests pay no extra task or memory stream and
+streaming responses (exports, the event stream) pass through chunk by chunk.
+``main.py`` assembles the stack, outermost first:
+
+* ``RequestIDMiddleware``    - takes ``X-Request-ID`` from the client or makes
+  one, exposes it to logs through ``current_request_id`` and echoes it back
+* ``InstrumentationMiddleware`` (``app.instrumentation``)
+* Starlette's ``CORSMiddleware`` for ``CORS_ORIGINS``
+* ``CompressionMiddleware``  - brotli or gzip for responses of at least
+  ``COMPRESSION_MIN_SIZE`` bytes
+
+``bench/middleware.py`` measures what each layer costs per request.
+"""
+import os
+import re
+import uuid
+import zlib
+from contextvars import ContextVar
+from typing import Optional
+
+import brotli
+
+# Origins allowed to call the API from a browser, comma-separated; empty turns CORS off
+CORS_ORIGINS = [
+    origin.strip()
+    for origin in os.getenv(
+        "CORS_ORIGINS", "http://localhost:3000,http://localhost:5173,http://127.0.0.1:5173,http://localhost:8000"
+    ).split(",")
+    if origin.strip()
+]
+# Encodings offered, most preferred first; empty turns compression off
+COMPRESSION_ENCODINGS = [
+    encoding.strip() for encoding in os.getenv("COMPRESSION_ENCODINGS", "br,gzip").split(",") if encoding.strip()
+]
+# Smaller bodies are sent as they are; compressing them costs more than it saves
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+# Fast settings suit dynamic responses: most of the size win for little CPU
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "5"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+REQUEST_ID_HEADER = os.getenv("REQUEST_ID_HEADER", "X-Request-ID")
+
+SUPPORTED_ENCODINGS = ("br", "gzip")
+
+# Client-supplied ids are kept only if they are short and plain
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+
+_request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+def current_request_id() -> Optional[str]:
+    """The id of the request being handled, for logs; None outside a request"""
+    return _request_id.get()
+
+def _header(scope, name: bytes) -> Optional[bytes]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value
+    return None
+
+class RequestIDMiddleware:
+    """Pure ASGI middleware giving every HTTP request an id; add it outermost"""
+
+    def __init__(self, app, header: str = REQUEST_ID_HEADER):
+        self.app = app
+        self.header = header.lower().encode("latin-1")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        incoming = _header(scope, self.header)
+        request_id = incoming.decode("latin-1") if incoming else ""
+        if not _VALID_REQUEST_ID.match(request_id):
+            request_id = uuid.uuid4().hex
+        token = _request_id.set(request_id)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", ()), (self.header, request_id.encode("latin-1"))]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            _request_id.reset(token)
+
+def negotiate_encoding(accept_encoding: str, offered) -> Optional[str]:
+    """The first of ``offered`` that an Accept-Encoding header allows, if any"""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for encoding in offered:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+class _Compressor:
+    """One response's compression stream"""
+
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=BROTLI_QUALITY)
+            self._zlib = None
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def chunk(self, data: bytes) -> bytes:
+        """Compress ``data`` and flush it, so streamed chunks reach the client promptly"""
+        if self._brotli is not None:
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self._brotli is not None:
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush()
+
+class CompressionMiddleware:
+    """Pure ASGI response compression
+
+    Picks brotli or gzip from Accept-Encoding. A complete body smaller than
+    ``minimum_size`` is sent uncompressed; streamed bodies are compressed
+    chunk by chunk. Event streams and responses that already carry a
+    Content-Encoding are left alone.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE, encodings=tuple(COMPRESSION_ENCODINGS)):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = [encoding for encoding in encodings if encoding in SUPPORTED_ENCODINGS]
+
+    async def __call__(self, scope, receive, send):
+        accept_encoding = _header(scope, b"accept-encoding") if scope["type"] == "http" else None
+        encoding = negotiate_encoding(accept_encoding.decode("latin-1"), self.encodings) if accept_encoding else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        compressor = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                headers = message.get("headers", ())
+                content_type = next((value for name, value in headers if name == b"content-type"), b"")
+                passthrough = (
+                    message["status"] in (204, 304)
+                    or content_type.startswith(b"text/event-stream")
+                    or any(name == b"content-encoding" for name, _ in headers)
+                )
+                if passthrough:
+                    await send(message)
+                else:
+                    # Held back until the first body shows whether compression pays off
+                    start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start is not None:
+                headers = [(name, value) for name, value in start.get("headers", ()) if name != b"content-length"]
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                compressor = _Compressor(encoding)
+                vary = next((value for name, value in headers if name == b"vary"), None)
+                headers = [(name, value) for name, value in headers if name != b"vary"]
+                headers.append((b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"))
+                headers.append((b"content-encoding", encoding.encode()))
+                if not more_body:
+                    body = compressor.finish(body)
+                    headers.append((b"content-length", str(len(body)).encode()))
+                    await send({**start, "headers": headers})
+                    start = None
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                await send({**start, "headers": headers})
+                start = None
+            data = compressor.chunk(body) if more_body else compressor.finish(body)
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
\ No newline at end of file
@@ -1,9 +1,18 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Text, Boolean, Date, DateTime, ForeignKey, Enum, Index, Table
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
 import enum
 
+# SQLite compares datetimes as text. Store feedback timestamps in the same
+# second-resolution format CURRENT_TIMESTAMP produces, so bound keyset cursors
+# compare consistently with server-defaulted rows.
+FeedbackTimestamp = DateTime(timezone=True).with_variant(
+    sqlite.DATETIME(storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"),
+    "sqlite",
+)
+
 class UserRole(enum.Enum):
     MANAGER = "manager"
     EMPLOYEE = "employee"
@@ -20,8 +29,8 @@ class User(Base):
     name = Column(String(100), nullable=False)
     email = Column(String(100), unique=True, index=True, nullable=False)
     password_hash = Column(String(100), nullable=False)
-    role = Column(Enum(UserRole), nullable=False)
-    manager_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    role = Column(Enum(UserRole), nullable=False, index=True)
+    manager_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
@@ -32,8 +41,49 @@ class User(Base):
     feedback_given = relationship("Feedback", foreign_keys="Feedback.manager_id", back_populates="manager")
     feedback_received = relationship("Feedback", foreign_keys="Feedback.employee_id", back_populates="employee")
 
+class UserClosure(Base):
+    """Transitive closure of the reporting hierarchy, maintained by ``app.org``
+
+    One row per (ancestor, descendant) pair, including each user paired with
+    themselves at depth 0. The primary key answers "is A above B", the
+    ancestor index pages through "everyone under X, level by level" and the
+    descendant index answers "everyone above B".
+    """
+    __tablename__ = "user_closure"
+    __table_args__ = (
+        Index("ix_user_closure_ancestor_depth", "ancestor_id", "depth", "descendant_id"),
+        Index("ix_user_closure_descendant_depth", "descendant_id", "depth"),
+    )
+    
+    ancestor_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    descendant_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    depth = Column(Integer, nullable=False)
+
+class Tag(Base):
+    __tablename__ = "tags"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(50), unique=True, index=True, nullable=False)
+
+# The primary key serves "tags of a feedback item"; the reverse index serves
+# tag filters and counts, which start from the tag
+feedback_tags = Table(
+    "feedback_tags",
+    Base.metadata,
+    Column("feedback_id", Integer, ForeignKey("feedback.id", ondelete="CASCADE"), primary_key=True),
+    Column("tag_id", Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_feedback_tags_tag_feedback", "tag_id", "feedback_id"),
+)
+
 class Feedback(Base):
     __tablename__ = "feedback"
+    __table_args__ = (
+        # Keyset pagination over (created_at, id) for both sides of a feedback item
+        Index("ix_feedback_employee_created", "employee_id", "created_at", "id"),
+        Index("ix_feedback_manager_created", "manager_id", "created_at", "id"),
+    )
+    # Read created_at back with RETURNING on insert; crud needs it to bucket rollups
+    __mapper_args__ = {"eager_defaults": True}
     
     id = Column(Integer, primary_key=True, index=True)
     employee_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -41,16 +91,85 @@ class Feedback(Base):
     strengths = Column(Text, nullable=False)
     areas_to_improve = Column(Text, nullable=False)
     sentiment = Column(Enum(FeedbackSentiment), nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(FeedbackTimestamp, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     acknowledged = Column(Boolean, default=False)
     acknowledged_at = Column(DateTime(timezone=True), nullable=True)
     
     # Optional fields for bonus features
-    tags = Column(String(200), nullable=True)  # Comma-separated tags
     is_anonymous = Column(Boolean, default=False)
     employee_comment = Column(Text, nullable=True)
     
     # Relationships
     employee = relationship("User", foreign_keys=[employee_id], back_populates="feedback_received")
-    manager = relationship("User", foreign_keys=[manager_id], back_populates="feedback_given")
\ No newline at end of file
+    manager = relationship("User", foreign_keys=[manager_id], back_populates="feedback_given")
+    tags = relationship("Tag", secondary=feedback_tags, order_by=Tag.name)
+
+class FeedbackStats(Base):
+    """Per-user feedback counters, maintained by crud alongside feedback writes.
+
+    ``role_side`` is MANAGER for feedback the user has given and EMPLOYEE for
+    feedback they have received.
+    """
+    __tablename__ = "feedback_stats"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    role_side = Column(Enum(UserRole), primary_key=True)
+    total_feedback = Column(Integer, nullable=False, default=0)
+    positive_feedback = Column(Integer, nullable=False, default=0)
+    neutral_feedback = Column(Integer, nullable=False, default=0)
+    negative_feedback = Column(Integer, nullable=False, default=0)
+    unacknowledged_feedback = Column(Integer, nullable=False, default=0)
+
+class FeedbackRollup(Base):
+    """Feedback counts per day or week, maintained by crud alongside feedback writes.
+
+    One row per (granularity, bucket, manager, employee, sentiment) that has
+    had feedback; edits can leave a row at zero. ``bucket`` is the UTC day, or
+    the Monday starting the week.
+    """
+    __tablename__ = "feedback_rollups"
+    __table_args__ = (
+        Index("ix_feedback_rollups_employee", "granularity", "employee_id", "bucket"),
+    )
+    
+    granularity = Column(String(8), primary_key=True)  # "day" or "week"
+    manager_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    bucket = Column(Date, primary_key=True)
+    employee_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    sentiment = Column(Enum(FeedbackSentiment), primary_key=True)
+    feedback_count = Column(Integer, nullable=False, default=0)
+
+class CacheVersion(Base):
+    """Per-user counter bumped by crud whenever something the user can read changes.
+
+    HTTP ETags are derived from it, so a conditional GET can be answered with
+    a primary-key lookup.
+    """
+    __tablename__ = "cache_versions"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+class RefreshToken(Base):
+    """A refresh token, stored as its SHA-256 digest, with the access token issued alongside it
+
+    Refresh tokens rotate: using one marks it used and issues the next in the
+    same ``family_id``. Presenting a used or revoked token again revokes the
+    whole family, access tokens included. Times are naive UTC.
+    """
+    __tablename__ = "refresh_tokens"
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    token_hash = Column(String(64), nullable=False, unique=True, index=True)
+    family_id = Column(String(32), nullable=False, index=True)
+    access_jti = Column(String(32), nullable=False)
+    access_expires_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    used_at = Column(DateTime, nullable=True)
+    # Workers poll for recent revocations through this index
+    revoked_at = Column(DateTime, nullable=True, index=True)
+    
+    user = relationship("User")
\ No newline at end of file
@@ -0,0 +1,151 @@
+"""Reporting hierarchy as a closure table.
+
+``user_closure`` holds one row per (ancestor, descendant) pair of the
+``users.manager_id`` tree, so "everyone under X to depth N" and "is A above
+B" are single indexed lookups instead of walks up or down the tree. ``crud``
+keeps it in sync incrementally: ``add_user`` when a user is created and
+``move_subtree`` when someone changes manager. Existing databases are
+backfilled level by level, and the table can be audited against a recursive
+CTE over ``users``:
+
+    python -m app.org verify     # report drift, exit 1 if any
+    python -m app.org rebuild    # recompute the closure from users.manager_id
+"""
+import argparse
+import sys
+from typing import Optional
+
+from sqlalchemy import delete, func, insert, literal, select, true
+from sqlalchemy.orm import Session, aliased
+
+from app import models
+from app.database import SessionLocal, engine as default_engine
+from app.schema import SchemaOutOfDate, check_schema
+
+closure = models.UserClosure.__table__
+users = models.User.__table__
+
+# Deeper than any real org; guards the rebuild against manager_id cycles
+MAX_ORG_DEPTH = 1000
+
+def add_user(db: Session, user_id: int, manager_id: Optional[int]) -> None:
+    """Insert closure rows for a new leaf user"""
+    db.execute(insert(closure).values(ancestor_id=user_id, descendant_id=user_id, depth=0))
+    if manager_id is not None:
+        db.execute(insert(closure).from_select(
+            ["ancestor_id", "descendant_id", "depth"],
+            select(closure.c.ancestor_id, literal(user_id), closure.c.depth + 1)
+            .where(closure.c.descendant_id == manager_id),
+        ))
+
+def move_subtree(db: Session, user_id: int, new_manager_id: Optional[int]) -> None:
+    """Re-parent ``user_id`` and everyone under them in two set-based statements
+
+    Only the links between the subtree and its old ancestors are replaced;
+    links inside the subtree are untouched. The caller must make sure the new
+    manager isn't inside the subtree.
+    """
+    subtree = select(closure.c.descendant_id).where(closure.c.ancestor_id == user_id)
+    old_ancestors = select(closure.c.ancestor_id).where(
+        closure.c.descendant_id == user_id, closure.c.ancestor_id != user_id
+    )
+    db.execute(
+        delete(closure)
+        .where(closure.c.descendant_id.in_(subtree), closure.c.ancestor_id.in_(old_ancestors))
+        .execution_options(synchronize_session=False)
+    )
+    if new_manager_id is None:
+        return
+    above = closure.alias("above")
+    below = closure.alias("below")
+    db.execute(insert(closure).from_select(
+        ["ancestor_id", "descendant_id", "depth"],
+        # Every new ancestor paired with every member of the subtree
+        select(above.c.ancestor_id, below.c.descendant_id, above.c.depth + below.c.depth + 1)
+        .select_from(above.join(below, true()))
+        .where(above.c.descendant_id == new_manager_id, below.c.ancestor_id == user_id),
+    ))
+
+def is_ancestor(db: Session, ancestor_id: int, descendant_id: int, max_depth: Optional[int] = None) -> bool:
+    """Whether ``ancestor_id`` is above ``descendant_id``, within ``max_depth`` levels if given"""
+    query = select(closure.c.depth).where(
+        closure.c.ancestor_id == ancestor_id,
+        closure.c.descendant_id == descendant_id,
+        closure.c.depth >= 1,
+    )
+    if max_depth is not None:
+        query = query.where(closure.c.depth <= max_depth)
+    return db.execute(query).first() is not None
+
+def rebuild_closure(db: Session) -> int:
+    """Recompute the whole closure from users.manager_id, one statement per level
+
+    Returns the number of levels below the roots.
+    """
+    db.execute(delete(closure))
+    db.execute(insert(closure).from_select(
+        ["ancestor_id", "descendant_id", "depth"],
+        select(users.c.id, users.c.id, literal(0)),
+    ))
+    level = 0
+    while True:
+        # Extend every path ending at depth ``level`` by one direct report
+        added = db.execute(insert(closure).from_select(
+            ["ancestor_id", "descendant_id", "depth"],
+            select(closure.c.ancestor_id, users.c.id, closure.c.depth + 1)
+            .join(users, users.c.manager_id == closure.c.descendant_id)
+            .where(closure.c.depth == level),
+        )).rowcount
+        if not added:
+            return level
+        level += 1
+        if level > MAX_ORG_DEPTH:
+            raise ValueError("users.manager_id contains a cycle")
+
+def expected_closure():
+    """The closure computed on the fly with a recursive CTE, for auditing"""
+    paths = (
+        select(users.c.id.label("ancestor_id"), users.c.id.label("descendant_id"), literal(0).label("depth"))
+        .cte("paths", recursive=True)
+    )
+    report = aliased(users)
+    paths = paths.union_all(
+        select(paths.c.ancestor_id, report.c.id, paths.c.depth + 1)
+        .join(report, report.c.manager_id == paths.c.descendant_id)
+        .where(paths.c.depth < MAX_ORG_DEPTH)
+    )
+    return select(paths.c.ancestor_id, paths.c.descendant_id, paths.c.depth)
+
+def closure_drift(db: Session) -> dict:
+    """Count closure rows that are missing or shouldn't be there"""
+    stored = select(closure.c.ancestor_id, closure.c.descendant_id, closure.c.depth)
+    expected = expected_closure()
+    return {
+        "missing": db.execute(select(func.count()).select_from(expected.except_(stored).subquery())).scalar(),
+        "unexpected": db.execute(select(func.count()).select_from(stored.except_(expected).subquery())).scalar(),
+    }
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Rebuild or verify the user_closure org hierarchy")
+    parser.add_argument("command", choices=["verify", "rebuild"])
+    args = parser.parse_args(argv)
+
+    try:
+        check_schema(default_engine)
+    except SchemaOutOfDate as exc:
+        parser.exit(2, f"{exc}\n")
+    db = SessionLocal()
+    try:
+        if args.command == "rebuild":
+            levels = rebuild_closure(db)
+            db.commit()
+            print(f"rebuilt closure with {levels} level(s) below the top")
+            return 0
+        drift = closure_drift(db)
+    finally:
+        db.close()
+    print(f"{drift['missing']} missing and {drift['unexpected']} unexpected closure row(s)")
+    return 1 if drift["missing"] or drift["unexpected"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
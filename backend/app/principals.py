@@ -0,0 +1,107 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Set
+from sqlalchemy import event, inspect
+from app import models
+
+# Principal cache configuration. Entries never outlive their token; the TTL
+# bounds how stale a role or manager change can look to other workers, since
+# invalidation is per-process.
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+
+@dataclass(frozen=True)
+class Principal:
+    """Immutable snapshot of the authenticated user, enough for route guards"""
+    id: int
+    email: str
+    role: models.UserRole
+    manager_id: Optional[int] = None
+
+    @classmethod
+    def from_user(cls, user: models.User) -> "Principal":
+        return cls(id=user.id, email=user.email, role=user.role, manager_id=user.manager_id)
+
+class PrincipalCache:
+    """Bounded LRU of token -> Principal with per-entry expiry"""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._tokens_by_user: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, token: str) -> Optional[Principal]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            principal, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._remove(token)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return principal
+
+    def put(self, token: str, principal: Principal, token_expires_in: Optional[float] = None) -> None:
+        """Cache ``principal`` for ``token`` for the TTL, or until the token expires if sooner"""
+        ttl = self.ttl_seconds if token_expires_in is None else min(self.ttl_seconds, token_expires_in)
+        if self.max_size <= 0 or ttl <= 0:
+            return
+        with self._lock:
+            if token in self._entries:
+                self._remove(token)
+            self._entries[token] = (principal, time.monotonic() + ttl)
+            self._tokens_by_user.setdefault(principal.id, set()).add(token)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Drop every cached token for a user"""
+        with self._lock:
+            for token in list(self._tokens_by_user.get(user_id, ())):
+                self._remove(token)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _remove(self, token: str) -> None:
+        principal, _ = self._entries.pop(token)
+        tokens = self._tokens_by_user.get(principal.id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[principal.id]
+
+principal_cache = PrincipalCache(PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL_SECONDS)
+
+@event.listens_for(models.User, "after_update")
+def _invalidate_changed_principal(mapper, connection, target):
+    """Forget cached principals when a user's role or manager changes"""
+    state = inspect(target)
+    if state.attrs.role.history.has_changes() or state.attrs.manager_id.history.has_changes():
+        principal_cache.invalidate_user(target.id)
\ No newline at end of file
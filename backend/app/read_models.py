@@ -0,0 +1,73 @@
+"""Flat read models for the feedback list endpoints.
+
+The lists used to load Feedback entities with their user graph and then have
+FastAPI validate every item against ``FeedbackResponse`` with
+``from_attributes``. For these read-only pages the data comes straight from
+our own tables, so instead ``FEEDBACK_READ_SELECT`` fetches plain column
+tuples (feedback plus the four embedded users, joined in one statement) and
+``feedback_from_row`` shapes each one into the exact dict ``FeedbackResponse``
+would produce. Routes return those dicts through ``responses.trusted_json``,
+skipping validation.
+
+The field lists and column positions are derived from the pydantic schemas
+once, at import, so the two stay in step.
+"""
+from typing import Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+
+from app import models, schemas
+
+USER_FIELDS = tuple(schemas.UserSummary.model_fields)
+FEEDBACK_FIELDS = tuple(schemas.FeedbackResponse.model_fields)
+
+# Embedded users, in select order, and the UserResponse each one becomes
+USER_PREFIXES = ("employee", "employee_manager", "manager", "manager_manager")
+_NESTED_FIELDS = {"tags", "employee", "manager"}
+_FEEDBACK_COLUMNS = tuple(field for field in FEEDBACK_FIELDS if field not in _NESTED_FIELDS)
+
+def _build_select():
+    users = {prefix: aliased(models.User, name=prefix) for prefix in USER_PREFIXES}
+    feedback = models.Feedback
+    columns = [getattr(feedback, field).label(field) for field in _FEEDBACK_COLUMNS]
+    for prefix, user in users.items():
+        columns.extend(getattr(user, field).label(f"{prefix}__{field}") for field in USER_FIELDS)
+    return (
+        select(*columns)
+        .join(users["employee"], users["employee"].id == feedback.employee_id)
+        .outerjoin(users["employee_manager"], users["employee_manager"].id == users["employee"].manager_id)
+        .join(users["manager"], users["manager"].id == feedback.manager_id)
+        .outerjoin(users["manager_manager"], users["manager_manager"].id == users["manager"].manager_id)
+    )
+
+FEEDBACK_READ_SELECT = _build_select()
+
+# Row positions, computed once
+_FEEDBACK_SLICE = slice(0, len(_FEEDBACK_COLUMNS))
+_USER_SLICES = {
+    prefix: slice(len(_FEEDBACK_COLUMNS) + i * len(USER_FIELDS), len(_FEEDBACK_COLUMNS) + (i + 1) * len(USER_FIELDS))
+    for i, prefix in enumerate(USER_PREFIXES)
+}
+_USER_ID = USER_FIELDS.index("id")
+
+def _user(row, prefix: str) -> Optional[dict]:
+    values = row[_USER_SLICES[prefix]]
+    if values[_USER_ID] is None:
+        return None
+    return dict(zip(USER_FIELDS, values))
+
+def _user_response(row, prefix: str) -> Optional[dict]:
+    user = _user(row, prefix)
+    if user is not None:
+        user["manager"] = _user(row, f"{prefix}_manager")
+    return user
+
+def feedback_from_row(row, tags: List[str]) -> dict:
+    """Shape one ``FEEDBACK_READ_SELECT`` row like a serialized FeedbackResponse"""
+    item = dict(zip(_FEEDBACK_COLUMNS, row[_FEEDBACK_SLICE]))
+    nested = {"tags": tags, "employee": _user_response(row, "employee"), "manager": _user_response(row, "manager")}
+    return {field: item[field] if field in item else nested[field] for field in FEEDBACK_FIELDS}
+
+def feedback_from_rows(rows, tags_by_id: Dict[int, List[str]]) -> List[dict]:
+    return [feedback_from_row(row, tags_by_id.get(row.id, [])) for row in rows]
\ No newline at end of file
@@ -0,0 +1,33 @@
+"""orjson-backed responses.
+
+``ORJSONResponse`` is the app's default response class. For routes with a
+``response_model`` FastAPI still validates and encodes the content first, so
+only the final ``json.dumps`` gets cheaper. Hot read-only lists go further:
+they build plain dicts already shaped like their schema (see
+``read_models``) and return them with ``trusted_json``, which skips
+validation and hands the dicts straight to orjson.
+"""
+import orjson
+from fastapi import Response
+from fastapi.responses import ORJSONResponse as _ORJSONResponse
+
+# Enums render as their values and datetimes as ISO 8601, as pydantic does;
+# OPT_UTC_Z keeps aware UTC datetimes as "Z" rather than "+00:00"
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+class ORJSONResponse(_ORJSONResponse):
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+def trusted_json(content, response: Response) -> ORJSONResponse:
+    """Serialize ``content`` without validation, keeping headers set on the route's ``response``
+
+    Only for content built from our own tables in the exact response shape.
+    A returned Response bypasses FastAPI's merge of the injected one, so its
+    headers (e.g. the ETag from ``conditional_get``) are copied over here.
+    """
+    trusted = ORJSONResponse(content)
+    for name, value in response.headers.items():
+        if name not in ("content-length", "content-type"):
+            trusted.headers[name] = value
+    return trusted
\ No newline at end of file
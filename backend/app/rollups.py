@@ -0,0 +1,103 @@
+"""Rebuild and verify the feedback_rollups trend tables.
+
+The rollups are maintained incrementally by ``crud``; this module recomputes
+them from the feedback table in id-ordered chunks, so memory stays bounded by
+the chunk size however much history there is:
+
+    python -m app.rollups verify     # report drift, exit 1 if any
+    python -m app.rollups rebuild    # recompute the rollups from feedback
+
+The baseline migration fills rollups that are still empty with its own
+frozen copy of the rebuild.
+"""
+import argparse
+import sys
+from typing import Dict, Iterator, List
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.crud import ROLLUP_KEY_COLUMNS, RollupKey, add_rollup_deltas, apply_rollup_deltas
+from app.database import SessionLocal, engine as default_engine
+from app.schema import SchemaOutOfDate, check_schema
+
+rollups = models.FeedbackRollup.__table__
+feedback = models.Feedback.__table__
+
+def _history_chunks(db: Session, batch_size: int) -> Iterator[Dict[RollupKey, int]]:
+    """Yield the rollup contribution of each ``batch_size`` feedback rows, in id order"""
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(feedback.c.id, feedback.c.manager_id, feedback.c.employee_id, feedback.c.sentiment, feedback.c.created_at)
+            .where(feedback.c.id > last_id)
+            .order_by(feedback.c.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return
+        last_id = rows[-1].id
+        deltas: Dict[RollupKey, int] = {}
+        for row in rows:
+            add_rollup_deltas(deltas, row.manager_id, row.employee_id, row.sentiment, row.created_at)
+        yield deltas
+
+def rebuild_rollups(db: Session, batch_size: int = 10_000) -> int:
+    """Replace the rollups with ones recomputed from feedback; returns the number of rows written
+
+    Runs in the caller's transaction, so readers see either the old or the
+    new rollups.
+    """
+    db.execute(delete(rollups))
+    for deltas in _history_chunks(db, batch_size):
+        apply_rollup_deltas(db, deltas)
+    return db.execute(select(func.count()).select_from(rollups)).scalar()
+
+def rollup_drift(db: Session, batch_size: int = 10_000) -> List[dict]:
+    """Compare stored rollups with ones recomputed from feedback
+
+    Returns one entry per rollup key whose stored count differs; rows left at
+    zero count the same as missing ones.
+    """
+    expected: Dict[RollupKey, int] = {}
+    for deltas in _history_chunks(db, batch_size):
+        for key, delta in deltas.items():
+            expected[key] = expected.get(key, 0) + delta
+    stored = {
+        tuple(row[:-1]): row[-1]
+        for row in db.execute(select(*(rollups.c[column] for column in ROLLUP_KEY_COLUMNS), rollups.c.feedback_count))
+    }
+    return [
+        {"key": dict(zip(ROLLUP_KEY_COLUMNS, key)), "stored": stored.get(key, 0), "expected": expected.get(key, 0)}
+        for key in sorted(expected.keys() | stored.keys(), key=str)
+        if stored.get(key, 0) != expected.get(key, 0)
+    ]
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Rebuild or verify the feedback_rollups trend tables")
+    parser.add_argument("command", choices=["verify", "rebuild"])
+    parser.add_argument("--batch-size", type=int, default=10_000, help="feedback rows per chunk")
+    args = parser.parse_args(argv)
+
+    try:
+        check_schema(default_engine)
+    except SchemaOutOfDate as exc:
+        parser.exit(2, f"{exc}\n")
+    db = SessionLocal()
+    try:
+        if args.command == "rebuild":
+            written = rebuild_rollups(db, batch_size=args.batch_size)
+            db.commit()
+            print(f"rebuilt {written} rollup row(s)")
+            return 0
+        drift = rollup_drift(db, batch_size=args.batch_size)
+    finally:
+        db.close()
+    for entry in drift:
+        print(f"{entry['key']}: stored={entry['stored']} expected={entry['expected']}")
+    print(f"found {len(drift)} drifted rollup row(s)")
+    return 1 if drift else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -1,32 +1,52 @@
-from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app.auth import authenticate_user, create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
+from app.auth import authenticate_user, get_password_hash_async, issue_tokens, refresh_tokens, revoke_tokens
 from app import schemas
-from app import crud
+from app import async_crud
+from app.instrumentation import TimedRoute
 
-router = APIRouter(prefix="/auth", tags=["authentication"])
+router = APIRouter(prefix="/auth", tags=["authentication"], route_class=TimedRoute)
 
 @router.post("/login", response_model=schemas.AuthResponse)
 async def login(
     credentials: schemas.LoginCredentials,
     db: Session = Depends(get_db)
 ):
-    """Login endpoint that returns JWT token"""
-    user = authenticate_user(db, credentials.email, credentials.password)
+    """Login endpoint that returns an access token and a refresh token"""
+    user = await authenticate_user(db, credentials.email, credentials.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
-    )
-    return {"access_token": access_token, "token_type": "bearer"}
+    return await issue_tokens(db, user)
+
+@router.post("/refresh", response_model=schemas.AuthResponse)
+async def refresh(
+    request: schemas.RefreshRequest,
+    db: Session = Depends(get_db)
+):
+    """Exchange a refresh token for a new pair; each refresh token works once"""
+    tokens = await refresh_tokens(db, request.refresh_token)
+    if tokens is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return tokens
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    request: schemas.RefreshRequest,
+    db: Session = Depends(get_db)
+):
+    """Revoke a refresh token, the tokens refreshed from it and their access tokens"""
+    await revoke_tokens(db, request.refresh_token)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 @router.post("/register", response_model=schemas.UserResponse)
 async def register(
@@ -35,7 +55,7 @@ async def register(
 ):
     """Register a new user"""
     # Check if user already exists
-    existing_user = crud.get_user_by_email(db, user_data.email)
+    existing_user = await async_crud.get_user_by_email(db, user_data.email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -44,13 +64,14 @@ async def register(
     
     # Validate manager relationship for employees
     if user_data.role == "employee" and user_data.manager_id:
-        manager = crud.get_user(db, user_data.manager_id)
+        manager = await async_crud.get_user(db, user_data.manager_id)
         if not manager or manager.role.value != "manager":
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Invalid manager ID"
             )
     
-    # Create new user
-    user = crud.create_user(db, user_data)
+    # Create new user, hashing the password off the event loop
+    password_hash = await get_password_hash_async(user_data.password)
+    user = await async_crud.create_user(db, user_data, password_hash)
     return user
\ No newline at end of file
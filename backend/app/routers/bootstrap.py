@@ -0,0 +1,58 @@
+from typing import Optional, Set
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.auth import get_current_user
+from app.principals import Principal
+from app.caching import conditional_get
+from app.responses import trusted_json
+from app.routers.user import team_with_stats
+from app import models, schemas, async_crud, crud
+from app.instrumentation import TimedRoute
+
+router = APIRouter(prefix="/bootstrap", tags=["bootstrap"], route_class=TimedRoute)
+
+def bootstrap_sections(
+    include: Optional[str] = Query(None, description=f"Comma-separated sections out of {', '.join(crud.BOOTSTRAP_SECTIONS)}; all by default")
+) -> Set[str]:
+    """The sections asked for with ``include``, rejecting unknown names"""
+    if include is None:
+        return set(crud.BOOTSTRAP_SECTIONS)
+    sections = {section.strip() for section in include.split(",") if section.strip()}
+    unknown = sections.difference(crud.BOOTSTRAP_SECTIONS)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown sections: {', '.join(sorted(unknown))}. Choose from {', '.join(crud.BOOTSTRAP_SECTIONS)}",
+        )
+    return sections
+
+@router.get("", response_model=schemas.Bootstrap)
+async def get_bootstrap(
+    response: Response,
+    include: Set[str] = Depends(bootstrap_sections),
+    feedback_limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+    cache: None = Depends(conditional_get)
+):
+    """Everything the first screen needs in one request: profile, dashboard, team and the first page of feedback
+
+    The sections are read back to back on the request's session, with the
+    principal resolved once, so they form one consistent snapshot; ``team``
+    is null for employees.
+    """
+    is_manager = current_user.role == models.UserRole.MANAGER
+    sections = await async_crud.get_bootstrap(db, current_user.id, is_manager, include, feedback_limit=feedback_limit)
+    content = dict.fromkeys(crud.BOOTSTRAP_SECTIONS)
+    if "profile" in sections:
+        content["profile"] = schemas.UserResponse.model_validate(sections["profile"]).model_dump(mode="json")
+    if "dashboard" in sections:
+        dashboard_schema = schemas.ManagerDashboard if is_manager else schemas.EmployeeDashboard
+        content["dashboard"] = dashboard_schema.model_validate(sections["dashboard"], from_attributes=True).model_dump(mode="json")
+    if "team" in sections:
+        content["team"] = [member.model_dump(mode="json") for member in team_with_stats(sections["team"])]
+    if "feedback" in sections:
+        # Already shaped like FeedbackPage, as on the feedback list endpoints
+        content["feedback"] = sections["feedback"]
+    return trusted_json(content, response)
\ No newline at end of file
@@ -1,60 +1,88 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.auth import get_current_user, require_manager, require_employee
-from app import models, schemas, crud
+from app.principals import Principal
+from app.caching import conditional_get
+from app import models, schemas, async_crud
+from app.instrumentation import TimedRoute
 
-router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+router = APIRouter(prefix="/dashboard", tags=["dashboard"], route_class=TimedRoute)
 
 @router.get("/manager", response_model=schemas.ManagerDashboard)
 async def get_manager_dashboard(
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(require_manager)
+    current_user: Principal = Depends(require_manager),
+    cache: None = Depends(conditional_get)
 ):
     """Get dashboard data for managers"""
     # Get team members
-    team_members = crud.get_team_members(db, current_user.id)
+    team_members = await async_crud.get_team_members(db, current_user.id)
     
-    # Get feedback statistics
-    total_feedback = len(crud.get_feedback_by_manager(db, current_user.id))
-    recent_feedback = crud.get_feedback_by_manager(db, current_user.id)[:5]
-    
-    # Calculate sentiment distribution
-    all_feedback = crud.get_feedback_by_manager(db, current_user.id)
-    positive_feedback = len([f for f in all_feedback if f.sentiment == "positive"])
-    neutral_feedback = len([f for f in all_feedback if f.sentiment == "neutral"])
-    negative_feedback = len([f for f in all_feedback if f.sentiment == "negative"])
+    # Get feedback statistics for feedback the manager has given
+    stats = await async_crud.get_feedback_stats(db, current_user.id, is_manager=True)
     
     return {
         "team_size": len(team_members),
         "team_members": team_members,
-        "total_feedback": total_feedback,
-        "positive_feedback": positive_feedback,
-        "neutral_feedback": neutral_feedback,
-        "negative_feedback": negative_feedback,
-        "recent_feedback": recent_feedback
+        **stats
     }
 
 @router.get("/employee", response_model=schemas.EmployeeDashboard)
 async def get_employee_dashboard(
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(require_employee)
+    current_user: Principal = Depends(require_employee),
+    cache: None = Depends(conditional_get)
 ):
     """Get dashboard data for employees"""
-    # Get feedback statistics
-    all_feedback = crud.get_feedback_for_employee(db, current_user.id)
-    total_feedback = len(all_feedback)
-    unacknowledged_feedback = len([f for f in all_feedback if not f.acknowledged])
-    recent_feedback = crud.get_recent_feedback_by_employee(db, current_user.id, limit=5)
-    positive_feedback = len([f for f in all_feedback if f.sentiment == "positive"])
-    neutral_feedback = len([f for f in all_feedback if f.sentiment == "neutral"])
-    negative_feedback = len([f for f in all_feedback if f.sentiment == "negative"])
-    
-    return schemas.EmployeeDashboard(
-        total_feedback=total_feedback,
-        positive_feedback=positive_feedback,
-        neutral_feedback=neutral_feedback,
-        negative_feedback=negative_feedback,
-        recent_feedback=recent_feedback,
-        unacknowledged_feedback=unacknowledged_feedback
-    )
\ No newline at end of file
+    # Get feedback statistics for feedback the employee has received
+    return await async_crud.get_feedback_stats(db, current_user.id)
+
+@router.get("/org", response_model=schemas.OrgDashboard)
+async def get_org_dashboard(
+    depth: Optional[int] = Query(None, ge=1, description="Only roll up reports up to this many levels down"),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_manager),
+    cache: None = Depends(conditional_get)
+):
+    """Get feedback received across the manager's whole org, with a rollup per direct report"""
+    return await async_crud.get_org_stats(db, current_user.id, max_depth=depth)
+
+# Range shown when the client doesn't pass one
+DEFAULT_TREND_BUCKETS = {"day": 30, "week": 12}
+
+@router.get("/trends", response_model=schemas.FeedbackTrends)
+async def get_feedback_trends(
+    granularity: str = Query("week", pattern="^(day|week)$"),
+    start: Optional[date] = Query(None, alias="from"),
+    end: Optional[date] = Query(None, alias="to"),
+    scope: str = Query("org", pattern="^(org|given)$", description="Managers: feedback received across your org, or given by you"),
+    employee_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+    cache: None = Depends(conditional_get)
+):
+    """Get feedback counts by sentiment per day or week, read from the rollup tables
+
+    Employees see feedback they've received. Managers see feedback received
+    across their org, or with ``scope=given`` feedback they've written, and
+    may narrow either to one person in their org with ``employee_id``.
+    """
+    end = end or datetime.now(timezone.utc).date()
+    if start is None:
+        start = end - timedelta(days=(7 if granularity == "week" else 1) * (DEFAULT_TREND_BUCKETS[granularity] - 1))
+    if current_user.role == models.UserRole.MANAGER:
+        owner = {"org_manager_id": current_user.id} if scope == "org" else {"manager_id": current_user.id}
+        if employee_id is not None:
+            if not await async_crud.is_in_org(db, current_user.id, employee_id):
+                raise HTTPException(status_code=403, detail="You can only view trends for people in your org")
+            owner = {"employee_id": employee_id, **({"manager_id": current_user.id} if scope == "given" else {})}
+    else:
+        owner = {"employee_id": current_user.id}
+    try:
+        buckets = await async_crud.get_feedback_trends(db, granularity, start, end, **owner)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return {"granularity": granularity, "buckets": buckets}
\ No newline at end of file
@@ -0,0 +1,40 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Header
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.auth import get_current_user, oauth2_scheme, token_validity
+from app.principals import Principal
+from app.events import broker
+from app.instrumentation import TimedRoute
+
+router = APIRouter(prefix="/events", tags=["events"], route_class=TimedRoute)
+
+@router.get("/stream")
+async def stream_events(
+    last_event_id: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+    token: str = Depends(oauth2_scheme),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Server-sent events for feedback the current user can see
+
+    Sends ``feedback.created``, ``feedback.updated``, ``feedback.acknowledged``
+    and ``feedback.commented`` with the feedback, employee and manager ids,
+    and a comment line as a heartbeat while idle. Reconnect with
+    ``Last-Event-ID`` to receive what was missed; a ``reset`` event means
+    that is no longer possible and the client should refetch. The stream
+    ends once the access token expires or is revoked; reconnect with a new one.
+    """
+    # The stream outlives the request's DB work; hand the connection back now
+    # rather than holding it for as long as the client stays connected
+    if isinstance(db, AsyncSession):
+        await db.close()
+    else:
+        db.close()
+    return StreamingResponse(
+        broker.stream(current_user.id, last_event_id, still_valid=token_validity(token)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
\ No newline at end of file
@@ -1,65 +1,220 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.auth import get_current_user, require_manager
-from app import models, schemas, crud
+from app.principals import Principal
+from app.caching import conditional_get
+from app.responses import ORJSONResponse, trusted_json
+from app import models, schemas, async_crud, crud, export
+from app.instrumentation import TimedRoute
 
-router = APIRouter(prefix="/feedback", tags=["feedback"])
+router = APIRouter(prefix="/feedback", tags=["feedback"], route_class=TimedRoute)
+
+def feedback_list_params(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    sentiment: Optional[str] = None,
+    acknowledged: Optional[bool] = None,
+    tag: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+) -> dict:
+    """Pagination and filter query parameters shared by the feedback list endpoints"""
+    return {
+        "limit": limit,
+        "cursor": cursor,
+        "sentiment": sentiment,
+        "acknowledged": acknowledged,
+        "tag": tag,
+        "created_from": created_from,
+        "created_to": created_to,
+    }
+
+async def _feedback_page(db: Session, response: Response, **kwargs) -> ORJSONResponse:
+    """Fetch one page of feedback, turning bad cursors or filters into a 400
+
+    Pages are built from flat rows already shaped like ``FeedbackPage``, so
+    they skip response validation; ``response_model`` still documents them.
+    """
+    try:
+        items, next_cursor = await async_crud.get_feedback_page_rows(db, **kwargs)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return trusted_json({"items": items, "next_cursor": next_cursor}, response)
 
 @router.post("/", response_model=schemas.FeedbackResponse)
 async def create_feedback(
     feedback: schemas.FeedbackCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(require_manager)
+    current_user: Principal = Depends(require_manager)
 ):
     """Create new feedback (managers only)"""
     # Verify the employee belongs to the manager's team
-    employee = crud.get_user(db, feedback.employee_id)
+    employee = await async_crud.get_user(db, feedback.employee_id)
     if not employee or employee.manager_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You can only create feedback for your team members"
         )
     
-    return crud.create_feedback(db, feedback, current_user.id)
+    return await async_crud.create_feedback(db, feedback, current_user.id)
+
+@router.post("/bulk", response_model=schemas.FeedbackBulkResponse)
+async def create_feedback_bulk(
+    bulk: schemas.FeedbackBulkCreate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_manager)
+):
+    """Create feedback for many team members at once (managers only)
+
+    Valid items are created together; each item gets its own result, so one
+    bad item doesn't reject the rest.
+    """
+    results = await async_crud.create_feedback_bulk(db, bulk.items, current_user.id)
+    created = sum(1 for feedback, _ in results if feedback is not None)
+    return {
+        "created": created,
+        "failed": len(results) - created,
+        "results": [
+            {"index": index, "success": feedback is not None, "feedback": feedback, "error": error}
+            for index, (feedback, error) in enumerate(results)
+        ],
+    }
 
-@router.get("/", response_model=List[schemas.FeedbackResponse])
+@router.get("/", response_model=schemas.FeedbackPage)
 async def get_feedback(
+    response: Response,
+    params: dict = Depends(feedback_list_params),
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user),
+    cache: None = Depends(conditional_get)
 ):
-    """Get feedback based on user role"""
-    if current_user.role.value == models.Role.manager:
+    """Get a page of feedback based on user role"""
+    if current_user.role.value == models.UserRole.MANAGER.value:
         # Managers see all feedback they've given
-        return crud.get_feedback_by_manager(db, current_user.id)
+        return await _feedback_page(db, response, manager_id=current_user.id, **params)
     else:
         # Employees see feedback they've received
-        return crud.get_feedback_for_employee(db, current_user.id)
+        return await _feedback_page(db, response, employee_id=current_user.id, **params)
 
-@router.get("/my-feedback", response_model=List[schemas.FeedbackResponse])
+@router.get("/my-feedback", response_model=schemas.FeedbackPage)
 async def get_my_feedback(
+    response: Response,
+    params: dict = Depends(feedback_list_params),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+    cache: None = Depends(conditional_get)
+):
+    """Get a page of feedback for the current user (employee view)"""
+    return await _feedback_page(db, response, employee_id=current_user.id, **params)
+
+@router.get("/search", response_model=schemas.FeedbackSearchPage)
+async def search_feedback(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=10000),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Full-text search over feedback the current user can see, best match first
+
+    Managers search what they could open by id: feedback they've given and
+    feedback received by anyone in their org.
+    """
+    if current_user.role == models.UserRole.MANAGER:
+        owner = {"org_manager_id": current_user.id}
+    else:
+        owner = {"employee_id": current_user.id}
+    try:
+        hits, next_offset = await async_crud.search_feedback(db, q, limit=limit, offset=offset, **owner)
+    except NotImplementedError as exc:
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail=str(exc))
+    return {
+        "items": [{"feedback": feedback, "rank": rank, "snippet": snippet} for feedback, rank, snippet in hits],
+        "next_offset": next_offset,
+    }
+
+@router.get("/tags", response_model=List[schemas.TagCount])
+async def get_tag_counts(
+    limit: int = Query(100, ge=1, le=1000),
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user),
+    cache: None = Depends(conditional_get)
 ):
-    """Get feedback for the current user (employee view)"""
-    return crud.get_feedback_for_employee(db, current_user.id)
+    """Tags on feedback the current user can see, with usage counts, most used first"""
+    if current_user.role == models.UserRole.MANAGER:
+        owner = {"manager_id": current_user.id}
+    else:
+        owner = {"employee_id": current_user.id}
+    counts = await async_crud.get_tag_counts(db, limit=limit, **owner)
+    return [{"name": name, "count": count} for name, count in counts]
+
+@router.get("/export")
+async def export_feedback(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    scope: str = Query("org", pattern="^(org|given)$", description="Managers: feedback received across your org, or given by you"),
+    depth: Optional[int] = Query(None, ge=1, description="With scope=org, only include reports up to this many levels down"),
+    employee_id: Optional[int] = None,
+    sentiment: Optional[str] = None,
+    acknowledged: Optional[bool] = None,
+    tag: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Stream all feedback the current user can see as CSV or NDJSON, oldest first
+
+    Managers export the feedback received across their org, up to ``depth``
+    levels down, or with ``scope=given`` the feedback they've given. Either
+    can be narrowed to one person in their org with ``employee_id``.
+    """
+    if current_user.role == models.UserRole.MANAGER:
+        if scope == "org":
+            owner = {"org_manager_id": current_user.id, "max_depth": depth}
+        else:
+            owner = {"manager_id": current_user.id}
+        if employee_id is not None:
+            if not await async_crud.is_in_org(db, current_user.id, employee_id):
+                raise HTTPException(status_code=403, detail="You can only export feedback for people in your org")
+            owner = {"employee_id": employee_id, **({"manager_id": current_user.id} if scope == "given" else {})}
+    else:
+        owner = {"employee_id": current_user.id}
+    try:
+        query = crud.feedback_export_query(
+            sentiment=sentiment, acknowledged=acknowledged, tag=tag,
+            created_from=created_from, created_to=created_to, **owner
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return StreamingResponse(
+        export.stream_export(query, format),
+        media_type=export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="feedback.{format}"'},
+    )
 
 @router.get("/{feedback_id}", response_model=schemas.FeedbackResponse)
 async def get_feedback_by_id(
     feedback_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Get specific feedback by ID"""
-    feedback = crud.get_feedback(db, feedback_id)
+    feedback = await async_crud.get_feedback(db, feedback_id)
     if not feedback:
         raise HTTPException(status_code=404, detail="Feedback not found")
     
     # Check access permissions
-    if current_user.role.value == models.Role.manager and feedback.manager_id != current_user.id:
+    if (
+        current_user.role.value == models.UserRole.MANAGER.value
+        and feedback.manager_id != current_user.id
+        and not await async_crud.is_in_org(db, current_user.id, feedback.employee_id)
+    ):
         raise HTTPException(status_code=403, detail="Not authorized to view this feedback")
-    elif current_user.role.value == models.Role.employee and feedback.employee_id != current_user.id:
+    elif current_user.role.value == models.UserRole.EMPLOYEE.value and feedback.employee_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to view this feedback")
     
     return feedback
@@ -69,70 +224,91 @@ async def update_feedback(
     feedback_id: int,
     feedback_update: schemas.FeedbackUpdate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(require_manager)
+    current_user: Principal = Depends(require_manager)
 ):
     """Update feedback (managers only)"""
-    feedback = crud.get_feedback(db, feedback_id)
+    feedback = await async_crud.get_feedback(db, feedback_id)
     if not feedback:
         raise HTTPException(status_code=404, detail="Feedback not found")
     
     if feedback.manager_id != current_user.id:
         raise HTTPException(status_code=403, detail="You can only edit your own feedback")
     
-    return crud.update_feedback(db, feedback_id, feedback_update)
+    return await async_crud.update_feedback(db, feedback_id, feedback_update)
+
+@router.post("/acknowledge", response_model=schemas.FeedbackAcknowledgeResult)
+async def acknowledge_feedback_bulk(
+    target: schemas.FeedbackAcknowledge,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Acknowledge many of your feedback items at once (employees only)
+
+    Ownership is enforced by the UPDATE itself, so ids that aren't yours or
+    are already acknowledged are left out of ``acknowledged_ids``.
+    """
+    if current_user.role.value != models.UserRole.EMPLOYEE.value:
+        raise HTTPException(status_code=403, detail="Only employees can acknowledge feedback")
+    
+    acknowledged_ids = await async_crud.acknowledge_feedback_bulk(
+        db, current_user.id, feedback_ids=target.ids, before=target.before
+    )
+    return {"acknowledged_ids": acknowledged_ids, "count": len(acknowledged_ids)}
 
 @router.post("/{feedback_id}/acknowledge", response_model=schemas.FeedbackResponse)
 async def acknowledge_feedback(
     feedback_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Acknowledge feedback (employees only)"""
-    feedback = crud.get_feedback(db, feedback_id)
+    feedback = await async_crud.get_feedback(db, feedback_id)
     if not feedback:
         raise HTTPException(status_code=404, detail="Feedback not found")
     
-    if current_user.role.value != models.Role.employee:
+    if current_user.role.value != models.UserRole.EMPLOYEE.value:
         raise HTTPException(status_code=403, detail="Only employees can acknowledge feedback")
     
     if feedback.employee_id != current_user.id:
         raise HTTPException(status_code=403, detail="You can only acknowledge your own feedback")
     
-    return crud.acknowledge_feedback(db, feedback_id)
+    return await async_crud.acknowledge_feedback(db, feedback_id)
 
 @router.post("/{feedback_id}/comment", response_model=schemas.FeedbackResponse)
 async def add_employee_comment(
     feedback_id: int,
     comment_data: schemas.EmployeeComment,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Add employee comment to feedback"""
-    feedback = crud.get_feedback(db, feedback_id)
+    feedback = await async_crud.get_feedback(db, feedback_id)
     if not feedback:
         raise HTTPException(status_code=404, detail="Feedback not found")
     
-    if current_user.role.value != models.Role.employee:
+    if current_user.role.value != models.UserRole.EMPLOYEE.value:
         raise HTTPException(status_code=403, detail="Only employees can add comments")
     
     if feedback.employee_id != current_user.id:
         raise HTTPException(status_code=403, detail="You can only comment on your own feedback")
     
-    return crud.add_employee_comment(db, feedback_id, comment_data.comment)
+    return await async_crud.add_employee_comment(db, feedback_id, comment_data.comment)
 
-@router.get("/employee/{employee_id}", response_model=List[schemas.FeedbackResponse])
+@router.get("/employee/{employee_id}", response_model=schemas.FeedbackPage)
 async def get_employee_feedback(
     employee_id: int,
+    response: Response,
+    params: dict = Depends(feedback_list_params),
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(require_manager)
+    current_user: Principal = Depends(require_manager)
 ):
-    """Get feedback for a specific employee (managers only)"""
-    # Verify the employee is managed by current user
-    employee = crud.get_user(db, employee_id)
+    """Get a page of feedback for a specific employee (managers only)"""
+    # Verify the employee is in the current user's org
+    employee = await async_crud.get_user(db, employee_id)
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
     
-    if employee.manager_id != current_user.id:
-        raise HTTPException(status_code=403, detail="You can only view feedback for your team members")
+    if not await async_crud.is_in_org(db, current_user.id, employee_id):
+        raise HTTPException(status_code=403, detail="You can only view feedback for people in your org")
     
-    return crud.get_feedback_for_employee(db, employee_id)
\ No newline at end of file
+    return await _feedback_page(db, response, employee_id=employee_id, **params)
\ No newline at end of file
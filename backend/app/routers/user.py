@@ -1,53 +1,113 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.auth import get_current_user, require_manager
-from app import models, schemas, crud
+from app.principals import Principal
+from app.caching import conditional_get
+from app import models, schemas, async_crud
+from app.instrumentation import TimedRoute
 
-router = APIRouter(prefix="/users", tags=["users"])
+router = APIRouter(prefix="/users", tags=["users"], route_class=TimedRoute)
+
+def team_with_stats(members) -> List[schemas.TeamMember]:
+    """Turn ``crud.get_team_members_with_stats`` results into response models"""
+    return [
+        schemas.TeamMember.model_validate(user).model_copy(update={"stats": schemas.TeamMemberStats(**stats)})
+        for user, stats in members
+    ]
 
 @router.get("/me", response_model=schemas.UserResponse)
 async def get_current_user_profile(
-    current_user: models.User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    cache: None = Depends(conditional_get)
 ):
     """Get current user's profile"""
-    return current_user
+    return await async_crud.get_user(db, current_user.id)
 
-@router.get("/team", response_model=List[schemas.UserResponse])
+@router.get("/team", response_model=List[schemas.TeamMember])
 async def get_team_members(
-    current_user: models.User = Depends(require_manager),
-    db: Session = Depends(get_db)
+    with_stats: bool = False,
+    current_user: Principal = Depends(require_manager),
+    db: Session = Depends(get_db),
+    cache: None = Depends(conditional_get)
 ):
-    """Get team members for the current manager"""
-    team_members = crud.get_team_members(db, current_user.id)
+    """Get team members for the current manager, optionally with their feedback counts"""
+    if with_stats:
+        members = await async_crud.get_team_members_with_stats(db, current_user.id)
+        return team_with_stats(members)
+    team_members = await async_crud.get_team_members(db, current_user.id)
     return team_members
 
+@router.get("/org", response_model=schemas.OrgPage)
+async def get_org_members(
+    depth: Optional[int] = Query(None, ge=1, description="Only include reports up to this many levels down"),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(require_manager),
+    db: Session = Depends(get_db),
+    cache: None = Depends(conditional_get)
+):
+    """Get a page of everyone in the current manager's org, nearest levels first"""
+    try:
+        members, next_cursor = await async_crud.get_org_members(
+            db, current_user.id, max_depth=depth, limit=limit, cursor=cursor
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return {
+        "items": [{"user": user, "depth": member_depth} for user, member_depth in members],
+        "next_cursor": next_cursor,
+    }
+
 @router.get("/managers", response_model=List[schemas.UserResponse])
 async def get_managers(db: Session = Depends(get_db)):
     """Get all managers for registration dropdown"""
-    managers = crud.get_managers(db)
+    managers = await async_crud.get_managers(db)
     return managers
 
 @router.get("/{user_id}", response_model=schemas.UserResponse)
 async def get_user_by_id(
     user_id: int,
-    current_user: models.User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get user by ID (managers can see their team members, employees can see themselves)"""
-    user = crud.get_user(db, user_id)
+    """Get user by ID (managers can see their org, employees can see themselves)"""
+    user = await async_crud.get_user(db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    # Check permissions: managers can see their team members, employees can only see themselves
+    # Check permissions: managers can see anyone in their org, employees can only see themselves
     if current_user.role.value == "manager":
-        # Managers can see their team members
-        if user.manager_id != current_user.id and user.id != current_user.id:
-            raise HTTPException(status_code=403, detail="You can only view your team members")
+        if user.id != current_user.id and not await async_crud.is_in_org(db, current_user.id, user.id):
+            raise HTTPException(status_code=403, detail="You can only view people in your org")
     else:
         # Employees can only see themselves
         if user.id != current_user.id:
             raise HTTPException(status_code=403, detail="You can only view your own profile")
     
-    return user
\ No newline at end of file
+    return user
+
+@router.put("/{user_id}/manager", response_model=schemas.UserResponse)
+async def change_manager(
+    user_id: int,
+    update: schemas.ManagerUpdate,
+    current_user: Principal = Depends(require_manager),
+    db: Session = Depends(get_db)
+):
+    """Move someone in your org, along with their reports, to another manager in your org"""
+    if not await async_crud.is_in_org(db, current_user.id, user_id):
+        raise HTTPException(status_code=403, detail="You can only move people in your org")
+    if update.manager_id is None:
+        raise HTTPException(status_code=400, detail="People in your org need a manager")
+    if update.manager_id != current_user.id:
+        if not await async_crud.is_in_org(db, current_user.id, update.manager_id):
+            raise HTTPException(status_code=403, detail="The new manager must be you or someone in your org")
+        manager = await async_crud.get_user(db, update.manager_id)
+        if manager.role != models.UserRole.MANAGER:
+            raise HTTPException(status_code=400, detail="The new manager must have the manager role")
+    try:
+        return await async_crud.set_manager(db, user_id, update.manager_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
\ No newline at end of file
@@ -0,0 +1,58 @@
+"""Schema migrations and the startup version check.
+
+The schema is managed with Alembic (``alembic.ini`` and ``migrations/`` next
+to ``app/``). Workers never change it: on startup each one compares the
+database's revision with the newest migration, one primary-key read, and
+refuses to start if they differ. Upgrade before starting new code:
+
+    alembic upgrade head
+
+The baseline revision adopts databases created before migrations existed,
+so that command also upgrades an old ``feedback_tool.db`` in place.
+"""
+import os
+from typing import Optional
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class SchemaOutOfDate(RuntimeError):
+    """The database isn't at the revision this code expects"""
+
+def alembic_config() -> Config:
+    """The project's Alembic config, usable from any working directory"""
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    # Keep the app's own logging configuration when migrating in-process
+    config.attributes["configure_logging"] = False
+    return config
+
+def head_revision() -> str:
+    """The newest migration's revision"""
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+def current_revision(bind) -> Optional[str]:
+    """The database's revision; None if it has never been migrated"""
+    with bind.connect() as connection:
+        return MigrationContext.configure(connection).get_current_revision()
+
+def check_schema(bind) -> str:
+    """Raise SchemaOutOfDate unless the database is at the newest migration; returns the revision"""
+    current, head = current_revision(bind), head_revision()
+    if current != head:
+        found = f"revision {current}" if current else "no schema revision"
+        raise SchemaOutOfDate(
+            f"Database has {found}, expected {head}. Run `alembic upgrade head` from the backend directory."
+        )
+    return current
+
+def upgrade(bind, revision: str = "head") -> None:
+    """Migrate the database behind ``bind`` to ``revision``; for tools and benchmarks"""
+    config = alembic_config()
+    with bind.begin() as connection:
+        config.attributes["connection"] = connection
+        command.upgrade(config, revision)
\ No newline at end of file
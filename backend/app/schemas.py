@@ -1,6 +1,18 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional, List
-from datetime import datetime
+from pydantic import BaseModel, EmailStr, Field, field_validator, model_validator
+from typing import Optional, List, Union
+from datetime import date, datetime
+from enum import Enum
+
+def _enum_value(value):
+    """Unwrap ORM enum members so they serialize as their plain string value"""
+    return value.value if isinstance(value, Enum) else value
+
+MAX_TAG_LENGTH = 50  # matches tags.name
+
+def _check_tags(tags):
+    if tags and any(len(tag.strip()) > MAX_TAG_LENGTH for tag in tags):
+        raise ValueError(f"Tags must be at most {MAX_TAG_LENGTH} characters")
+    return tags
 
 # User schemas
 class UserBase(BaseModel):
@@ -8,22 +20,54 @@ class UserBase(BaseModel):
     email: str
     role: str  # "manager" or "employee"
 
+    @field_validator("role", mode="before")
+    @classmethod
+    def role_value(cls, value):
+        return _enum_value(value)
+
 class UserCreate(UserBase):
     password: str
     manager_id: Optional[int] = None
 
-class UserResponse(UserBase):
+class UserSummary(UserBase):
     id: int
     created_at: datetime
     manager_id: Optional[int] = None
-    manager: Optional['UserResponse'] = None
     
     class Config:
         from_attributes = True
 
+class UserResponse(UserSummary):
+    # Only one level of manager is embedded so serialization never walks the
+    # whole reporting chain
+    manager: Optional[UserSummary] = None
+
 class User(UserResponse):
     pass
 
+class ManagerUpdate(BaseModel):
+    manager_id: Optional[int] = None
+
+class TeamMemberStats(BaseModel):
+    # Feedback the member has received, from anyone
+    total_feedback: int
+    positive_feedback: int
+    neutral_feedback: int
+    negative_feedback: int
+    unacknowledged_feedback: int
+    last_feedback_at: Optional[datetime] = None
+
+class TeamMember(UserResponse):
+    stats: Optional[TeamMemberStats] = None  # only with ?with_stats=true
+
+class OrgMember(BaseModel):
+    user: UserSummary
+    depth: int  # 1 for direct reports, 2 for their reports, ...
+
+class OrgPage(BaseModel):
+    items: List[OrgMember]
+    next_cursor: Optional[str] = None
+
 # Auth schemas
 class LoginCredentials(BaseModel):
     email: str
@@ -32,6 +76,11 @@ class LoginCredentials(BaseModel):
 class AuthResponse(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: str
+    expires_in: int  # seconds until access_token expires
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 class TokenData(BaseModel):
     email: Optional[str] = None
@@ -44,9 +93,24 @@ class FeedbackBase(BaseModel):
     tags: Optional[List[str]] = []
     is_anonymous: bool = False
 
+    @field_validator("sentiment", mode="before")
+    @classmethod
+    def sentiment_value(cls, value):
+        return _enum_value(value)
+
+    @field_validator("tags")
+    @classmethod
+    def tag_length(cls, value):
+        return _check_tags(value)
+
 class FeedbackCreate(FeedbackBase):
     employee_id: int
 
+MAX_BULK_FEEDBACK = 1000
+
+class FeedbackBulkCreate(BaseModel):
+    items: List[FeedbackCreate] = Field(..., min_length=1, max_length=MAX_BULK_FEEDBACK)
+
 class FeedbackUpdate(BaseModel):
     strengths: Optional[str] = None
     areas_to_improve: Optional[str] = None
@@ -54,6 +118,11 @@ class FeedbackUpdate(BaseModel):
     tags: Optional[List[str]] = None
     is_anonymous: Optional[bool] = None
 
+    @field_validator("tags")
+    @classmethod
+    def tag_length(cls, value):
+        return _check_tags(value)
+
 class FeedbackResponse(FeedbackBase):
     id: int
     employee_id: int
@@ -66,22 +135,11 @@ class FeedbackResponse(FeedbackBase):
     employee: Optional[UserResponse] = None
     manager: Optional[UserResponse] = None
     
-    @property
-    def tags(self) -> List[str]:
-        if hasattr(self, '_tags'):
-            return self._tags
-        if isinstance(self.__dict__.get('tags'), str):
-            return [tag.strip() for tag in self.tags.split(',') if tag.strip()]
-        return self.__dict__.get('tags') or []
-    
-    @tags.setter
-    def tags(self, value):
-        if isinstance(value, str):
-            self._tags = [tag.strip() for tag in value.split(',') if tag.strip()]
-        elif isinstance(value, list):
-            self._tags = value
-        else:
-            self._tags = []
+    @field_validator("tags", mode="before")
+    @classmethod
+    def tag_names(cls, value):
+        """Flatten the Tag rows of the tags relationship into their names"""
+        return [getattr(tag, "name", tag) for tag in value or []]
     
     class Config:
         from_attributes = True
@@ -92,19 +150,97 @@ class FeedbackResponse(FeedbackBase):
 class Feedback(FeedbackResponse):
     pass
 
+class FeedbackPage(BaseModel):
+    items: List[FeedbackResponse]
+    next_cursor: Optional[str] = None
+
+class FeedbackSearchHit(BaseModel):
+    feedback: FeedbackResponse
+    rank: float
+    snippet: str  # HTML-escaped, with matches wrapped in <mark> tags
+
+class FeedbackSearchPage(BaseModel):
+    items: List[FeedbackSearchHit]
+    next_offset: Optional[int] = None
+
+class FeedbackBulkResult(BaseModel):
+    index: int  # position in the request's items
+    success: bool
+    feedback: Optional[FeedbackResponse] = None
+    error: Optional[str] = None
+
+class FeedbackBulkResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[FeedbackBulkResult]
+
+class TagCount(BaseModel):
+    name: str
+    count: int
+
+class FeedbackAcknowledge(BaseModel):
+    # Exactly one of: specific feedback ids, or everything created before a time
+    ids: Optional[List[int]] = Field(None, min_length=1, max_length=MAX_BULK_FEEDBACK)
+    before: Optional[datetime] = None
+
+    @model_validator(mode="after")
+    def one_target(self):
+        if (self.ids is None) == (self.before is None):
+            raise ValueError("Provide either ids or before")
+        return self
+
+class FeedbackAcknowledgeResult(BaseModel):
+    acknowledged_ids: List[int]
+    count: int
+
 class EmployeeComment(BaseModel):
     comment: str
 
 # Dashboard schemas
-class ManagerDashboard(BaseModel):
+class DashboardStats(BaseModel):
+    total_feedback: int
+    positive_feedback: int
+    neutral_feedback: int
+    negative_feedback: int
+    recent_feedback: List[FeedbackResponse]
+
+class ManagerDashboard(DashboardStats):
     team_size: int
     team_members: List[UserResponse]
+
+class EmployeeDashboard(DashboardStats):
+    unacknowledged_feedback: int
+
+class OrgStats(BaseModel):
+    org_size: int
     total_feedback: int
     positive_feedback: int
     neutral_feedback: int
     negative_feedback: int
-    recent_feedback: List[FeedbackResponse]
+    unacknowledged_feedback: int
+
+class OrgReportStats(OrgStats):
+    # A direct report and everyone under them, themselves included
+    user: UserSummary
 
-class EmployeeDashboard(BaseModel):
+class OrgDashboard(OrgStats):
+    depth: int  # levels below the manager
+    direct_reports: List[OrgReportStats]
+
+class TrendBucket(BaseModel):
+    bucket: date  # the day, or the Monday starting the week
     total_feedback: int
-    unacknowledged_feedback: int
\ No newline at end of file
+    positive_feedback: int
+    neutral_feedback: int
+    negative_feedback: int
+
+class FeedbackTrends(BaseModel):
+    granularity: str
+    buckets: List[TrendBucket]
+
+class Bootstrap(BaseModel):
+    # Sections left out of ?include= are null, as is team for employees
+    profile: Optional[UserResponse] = None
+    dashboard: Optional[Union[ManagerDashboard, EmployeeDashboard]] = None
+    team: Optional[List[TeamMember]] = None
+    feedback: Optional[FeedbackPage] = None
\ No newline at end of file
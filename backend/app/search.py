@@ -0,0 +1,222 @@
+"""Full-text search over feedback.
+
+Each feedback item is indexed as one document made of its strengths,
+areas_to_improve, employee_comment and tags. ``crud`` calls ``index_feedback``
+whenever one of those fields is written, so the index stays in sync within
+the same transaction. The backend is chosen from the session's dialect:
+
+* SQLite uses an FTS5 virtual table ranked with bm25 and ``snippet``.
+* PostgreSQL uses a ``tsvector`` table with a GIN index, ranked with
+  ``ts_rank`` and highlighted with ``ts_headline``.
+"""
+import html
+import re
+from typing import List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.orm import Session, selectinload
+from app import models
+
+# Highlight markers chosen so they can't collide with user text; they are
+# swapped for <mark> tags after the snippet has been HTML-escaped
+_MARK_START = "\x02"
+_MARK_END = "\x03"
+SNIPPET_TOKENS = 16
+
+# (feedback_id, rank, snippet); lower rank is a better match
+SearchHit = Tuple[int, float, str]
+
+def _document(feedback: models.Feedback) -> dict:
+    """The searchable fields of a feedback item"""
+    return {
+        "strengths": feedback.strengths or "",
+        "areas_to_improve": feedback.areas_to_improve or "",
+        "employee_comment": feedback.employee_comment or "",
+        "tags": " ".join(tag.name for tag in feedback.tags),
+    }
+
+def _highlight(snippet: str) -> str:
+    """HTML-escape a snippet and turn the match markers into <mark> tags"""
+    return html.escape(snippet or "").replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+
+def _owner_clause(manager_id: Optional[int], employee_id: Optional[int],
+                  org_manager_id: Optional[int]) -> Tuple[str, dict]:
+    clauses, params = [], {}
+    if manager_id is not None:
+        clauses.append("f.manager_id = :manager_id")
+        params["manager_id"] = manager_id
+    if employee_id is not None:
+        clauses.append("f.employee_id = :employee_id")
+        params["employee_id"] = employee_id
+    if org_manager_id is not None:
+        # Same rule as opening one item: given by the manager, or received anywhere in their org
+        clauses.append(
+            "(f.manager_id = :org_manager_id OR EXISTS (SELECT 1 FROM user_closure c "
+            "WHERE c.ancestor_id = :org_manager_id AND c.descendant_id = f.employee_id AND c.depth >= 1))"
+        )
+        params["org_manager_id"] = org_manager_id
+    return "".join(f" AND {clause}" for clause in clauses), params
+
+class SQLiteSearchBackend:
+    """FTS5 index in a standalone ``feedback_fts`` table keyed by feedback id"""
+
+    def create_index(self, connection) -> bool:
+        """Create the index if it is missing; return True if it was created"""
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'feedback_fts'")
+        ).first()
+        if exists:
+            return False
+        connection.execute(text(
+            "CREATE VIRTUAL TABLE feedback_fts USING fts5("
+            "strengths, areas_to_improve, employee_comment, tags, "
+            "tokenize = 'porter unicode61')"
+        ))
+        return True
+
+    def index(self, db: Session, feedbacks: List[models.Feedback]) -> None:
+        db.execute(text("DELETE FROM feedback_fts WHERE rowid = :id"), [{"id": feedback.id} for feedback in feedbacks])
+        db.execute(
+            text(
+                "INSERT INTO feedback_fts (rowid, strengths, areas_to_improve, employee_comment, tags) "
+                "VALUES (:id, :strengths, :areas_to_improve, :employee_comment, :tags)"
+            ),
+            [{"id": feedback.id, **_document(feedback)} for feedback in feedbacks],
+        )
+
+    def match_expression(self, query: str) -> Optional[str]:
+        """Turn free text into an FTS5 query: every word must match, as a prefix"""
+        terms = re.findall(r"\w+", query)
+        if not terms:
+            return None
+        return " ".join(f'"{term}"*' for term in terms)
+
+    def search(self, db: Session, query: str, manager_id: Optional[int], employee_id: Optional[int],
+               org_manager_id: Optional[int], limit: int, offset: int) -> List[SearchHit]:
+        match = self.match_expression(query)
+        if match is None:
+            return []
+        owner_sql, params = _owner_clause(manager_id, employee_id, org_manager_id)
+        rows = db.execute(
+            text(
+                "SELECT f.id, bm25(feedback_fts) AS rank, "
+                "snippet(feedback_fts, -1, :mark_start, :mark_end, '…', :tokens) "
+                "FROM feedback_fts JOIN feedback f ON f.id = feedback_fts.rowid "
+                f"WHERE feedback_fts MATCH :match{owner_sql} "
+                "ORDER BY rank, f.id DESC LIMIT :limit OFFSET :offset"
+            ),
+            {
+                "match": match, "mark_start": _MARK_START, "mark_end": _MARK_END,
+                "tokens": SNIPPET_TOKENS, "limit": limit, "offset": offset, **params,
+            },
+        ).all()
+        return [(row[0], row[1], _highlight(row[2])) for row in rows]
+
+class PostgresSearchBackend:
+    """``tsvector`` documents in a ``feedback_search`` table with a GIN index"""
+
+    CONFIG = "english"
+
+    def create_index(self, connection) -> bool:
+        exists = connection.execute(text("SELECT to_regclass('feedback_search')")).scalar()
+        if exists:
+            return False
+        connection.execute(text(
+            "CREATE TABLE feedback_search ("
+            "feedback_id INTEGER PRIMARY KEY REFERENCES feedback (id) ON DELETE CASCADE, "
+            "body TEXT NOT NULL, "
+            "document TSVECTOR NOT NULL)"
+        ))
+        connection.execute(text(
+            "CREATE INDEX ix_feedback_search_document ON feedback_search USING GIN (document)"
+        ))
+        return True
+
+    def index(self, db: Session, feedbacks: List[models.Feedback]) -> None:
+        documents = [(feedback.id, _document(feedback)) for feedback in feedbacks]
+        db.execute(
+            text(
+                "INSERT INTO feedback_search (feedback_id, body, document) VALUES (:id, :body, "
+                f"setweight(to_tsvector('{self.CONFIG}', :strengths), 'A') || "
+                f"setweight(to_tsvector('{self.CONFIG}', :areas_to_improve), 'A') || "
+                f"setweight(to_tsvector('{self.CONFIG}', :tags), 'B') || "
+                f"setweight(to_tsvector('{self.CONFIG}', :employee_comment), 'C')) "
+                "ON CONFLICT (feedback_id) DO UPDATE SET body = EXCLUDED.body, document = EXCLUDED.document"
+            ),
+            [{"id": feedback_id, "body": "\n".join(fields.values()), **fields} for feedback_id, fields in documents],
+        )
+
+    def search(self, db: Session, query: str, manager_id: Optional[int], employee_id: Optional[int],
+               org_manager_id: Optional[int], limit: int, offset: int) -> List[SearchHit]:
+        if not re.search(r"\w", query):
+            return []
+        owner_sql, params = _owner_clause(manager_id, employee_id, org_manager_id)
+        rows = db.execute(
+            text(
+                "SELECT f.id, -ts_rank(s.document, q) AS rank, "
+                f"ts_headline('{self.CONFIG}', s.body, q, :headline_options) "
+                "FROM feedback_search s JOIN feedback f ON f.id = s.feedback_id, "
+                f"websearch_to_tsquery('{self.CONFIG}', :query) q "
+                f"WHERE s.document @@ q{owner_sql} "
+                "ORDER BY rank, f.id DESC LIMIT :limit OFFSET :offset"
+            ),
+            {
+                "query": query, "limit": limit, "offset": offset,
+                "headline_options": f"StartSel={_MARK_START}, StopSel={_MARK_END}, MaxWords={SNIPPET_TOKENS}",
+                **params,
+            },
+        ).all()
+        return [(row[0], row[1], _highlight(row[2])) for row in rows]
+
+BACKENDS = {
+    "sqlite": SQLiteSearchBackend(),
+    "postgresql": PostgresSearchBackend(),
+}
+
+def get_backend(dialect_name: str):
+    return BACKENDS.get(dialect_name)
+
+def index_feedback(db: Session, feedback: models.Feedback) -> None:
+    """(Re)index one feedback item; a no-op on databases without a search backend"""
+    index_feedback_many(db, [feedback])
+
+def index_feedback_many(db: Session, feedbacks: List[models.Feedback]) -> None:
+    """(Re)index several feedback items with one executemany per statement"""
+    backend = get_backend(db.get_bind().dialect.name)
+    if backend is not None and feedbacks:
+        backend.index(db, feedbacks)
+
+def search(db: Session, query: str, manager_id: Optional[int] = None, employee_id: Optional[int] = None,
+           org_manager_id: Optional[int] = None, limit: int = 20, offset: int = 0) -> List[SearchHit]:
+    """Ranked matches for ``query`` among the feedback a user may see
+
+    ``org_manager_id`` matches everything that manager may open: feedback
+    they gave, or received by anyone in their org.
+    """
+    backend = get_backend(db.get_bind().dialect.name)
+    if backend is None:
+        raise NotImplementedError(f"Full-text search is not supported on {db.get_bind().dialect.name}")
+    return backend.search(db, query, manager_id, employee_id, org_manager_id, limit, offset)
+
+def rebuild_search_index(db: Session, batch_size: int = 1000) -> int:
+    """(Re)index every feedback item in id batches, committing after each; returns the number indexed"""
+    backend = get_backend(db.get_bind().dialect.name)
+    if backend is None:
+        return 0
+    indexed = 0
+    last_id = 0
+    while True:
+        batch = (
+            db.query(models.Feedback)
+            .options(selectinload(models.Feedback.tags))
+            .filter(models.Feedback.id > last_id)
+            .order_by(models.Feedback.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not batch:
+            return indexed
+        backend.index(db, batch)
+        last_id = batch[-1].id
+        indexed += len(batch)
+        db.commit()
+        db.expunge_all()
\ No newline at end of file
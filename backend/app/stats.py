@@ -0,0 +1,111 @@
+"""Rebuild and verify the feedback_stats counters.
+
+The counters are maintained incrementally by ``crud``; this module recomputes
+them from the feedback table in batches of users so existing databases can be
+backfilled and audited:
+
+    python -m app.stats verify     # report drift, exit 1 if any
+    python -m app.stats rebuild    # report drift and overwrite the counters
+"""
+import argparse
+import sys
+from typing import Dict, List, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app import models
+from app.crud import STAT_FIELDS, empty_feedback_stats
+from app.database import SessionLocal, engine
+from app.schema import SchemaOutOfDate, check_schema
+
+StatsKey = Tuple[int, models.UserRole]
+
+def _expected_counters(db: Session, user_ids: List[int]) -> Dict[StatsKey, dict]:
+    """Recompute counters for a batch of users with one grouped query per side"""
+    expected = {(user_id, side): empty_feedback_stats() for user_id in user_ids for side in models.UserRole}
+    for side, owner_column in (
+        (models.UserRole.MANAGER, models.Feedback.manager_id),
+        (models.UserRole.EMPLOYEE, models.Feedback.employee_id),
+    ):
+        rows = (
+            db.query(owner_column, models.Feedback.sentiment, models.Feedback.acknowledged, func.count(models.Feedback.id))
+            .filter(owner_column.in_(user_ids))
+            .group_by(owner_column, models.Feedback.sentiment, models.Feedback.acknowledged)
+            .all()
+        )
+        for user_id, sentiment, acknowledged, count in rows:
+            stats = expected[(user_id, side)]
+            stats["total_feedback"] += count
+            stats[f"{sentiment.value}_feedback"] += count
+            if not acknowledged:
+                stats["unacknowledged_feedback"] += count
+    return expected
+
+def reconcile_feedback_stats(db: Session, fix: bool = False, batch_size: int = 500) -> List[dict]:
+    """Compare stored counters with the feedback table, optionally rewriting them
+
+    Returns one drift entry per (user, side) whose stored counters are missing
+    or differ from the recomputed values.
+    """
+    drift = []
+    last_id = 0
+    while True:
+        user_ids = [
+            user_id for (user_id,) in
+            db.query(models.User.id)
+            .filter(models.User.id > last_id)
+            .order_by(models.User.id)
+            .limit(batch_size)
+            .all()
+        ]
+        if not user_ids:
+            break
+        last_id = user_ids[-1]
+
+        stored = {
+            (row.user_id, row.role_side): row
+            for row in db.query(models.FeedbackStats).filter(models.FeedbackStats.user_id.in_(user_ids))
+        }
+        for key, expected in _expected_counters(db, user_ids).items():
+            row = stored.get(key)
+            actual = {field: getattr(row, field) for field in STAT_FIELDS} if row else None
+            if actual == expected:
+                continue
+            drift.append({"user_id": key[0], "role_side": key[1].value, "stored": actual, "expected": expected})
+            if fix:
+                if row is None:
+                    db.add(models.FeedbackStats(user_id=key[0], role_side=key[1], **expected))
+                else:
+                    for field, value in expected.items():
+                        setattr(row, field, value)
+        if fix:
+            db.commit()
+        # Drop the batch's ORM objects before moving on
+        db.expunge_all()
+    return drift
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Rebuild or verify the feedback_stats counters")
+    parser.add_argument("command", choices=["verify", "rebuild"])
+    parser.add_argument("--batch-size", type=int, default=500, help="users per batch")
+    args = parser.parse_args(argv)
+
+    try:
+        check_schema(engine)
+    except SchemaOutOfDate as exc:
+        parser.exit(2, f"{exc}\n")
+    db = SessionLocal()
+    try:
+        drift = reconcile_feedback_stats(db, fix=args.command == "rebuild", batch_size=args.batch_size)
+    finally:
+        db.close()
+
+    for entry in drift:
+        print(f"user {entry['user_id']} ({entry['role_side']}): stored={entry['stored']} expected={entry['expected']}")
+    action = "rewrote" if args.command == "rebuild" else "found"
+    print(f"{action} {len(drift)} drifted counter row(s)")
+    return 1 if drift and args.command == "verify" else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
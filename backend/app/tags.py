@@ -0,0 +1,83 @@
+"""Backfill the tags tables from the legacy comma-joined column.
+
+Feedback tags used to live in ``feedback.tags`` as a comma-joined string.
+They now live in ``tags`` and the ``feedback_tags`` association. This
+migration copies every legacy value across in id batches and clears it in the
+same transaction, so it can be interrupted and re-run safely:
+
+    python -m app.tags migrate
+
+The baseline migration carries a frozen copy of it, so upgrading an old
+database doesn't depend on this module staying as it is.
+"""
+import argparse
+import sys
+
+from sqlalchemy import inspect
+from sqlalchemy.sql import column, table
+from sqlalchemy.orm import Session
+
+from app import models
+from app.crud import get_or_create_tags
+from app.database import engine as default_engine
+from app.schema import SchemaOutOfDate, check_schema
+
+# The legacy column is no longer mapped, so address it through a lightweight table
+legacy_feedback = table("feedback", column("id"), column("tags"))
+
+def has_legacy_tags_column(engine) -> bool:
+    return any(col["name"] == "tags" for col in inspect(engine).get_columns("feedback"))
+
+def migrate_legacy_tags(engine, batch_size: int = 500) -> int:
+    """Move legacy tag strings into feedback_tags; returns the number of feedback rows migrated"""
+    if not has_legacy_tags_column(engine):
+        return 0
+    pending = legacy_feedback.c.tags.isnot(None) & (legacy_feedback.c.tags != "")
+    migrated = 0
+    db = Session(bind=engine)
+    try:
+        while True:
+            rows = db.execute(
+                legacy_feedback.select()
+                .where(pending)
+                .order_by(legacy_feedback.c.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            links = []
+            for feedback_id, tags in rows:
+                links.extend(
+                    {"feedback_id": feedback_id, "tag_id": tag.id}
+                    for tag in get_or_create_tags(db, tags.split(","))
+                )
+            if links:
+                db.execute(models.feedback_tags.insert(), links)
+            db.execute(
+                legacy_feedback.update()
+                .where(legacy_feedback.c.id.in_([feedback_id for feedback_id, _ in rows]))
+                .values(tags=None)
+            )
+            db.commit()
+            db.expunge_all()
+            migrated += len(rows)
+    finally:
+        db.close()
+    return migrated
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Backfill the tags tables from the legacy feedback.tags column")
+    parser.add_argument("command", choices=["migrate"])
+    parser.add_argument("--batch-size", type=int, default=500, help="feedback rows per batch")
+    args = parser.parse_args(argv)
+
+    try:
+        check_schema(default_engine)
+    except SchemaOutOfDate as exc:
+        parser.exit(2, f"{exc}\n")
+    migrated = migrate_legacy_tags(default_engine, batch_size=args.batch_size)
+    print(f"migrated tags for {migrated} feedback row(s)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,153 @@
+"""Refresh tokens and the access token revocation set.
+
+Logging in hands out a short-lived access token (a JWT with ``jti``, ``iat``
+and ``exp``) and a refresh token. Refresh tokens are random strings stored
+only as their SHA-256 digest in ``refresh_tokens``; each is good for one
+``/auth/refresh``, which returns a new pair in the same family. Presenting a
+refresh token a second time means it was copied, so the whole family is
+revoked, along with every access token issued from it. Logout does the same.
+
+Checking an access token must not cost a query, so each worker keeps the
+``jti`` of revoked, unexpired access tokens in memory, grouped into buckets
+by expiry so whole buckets are dropped once their tokens have expired
+anyway. A worker adds its own revocations immediately, loads the rest from
+the table on startup and polls it every ``REVOCATION_SYNC_SECONDS`` for
+revocations made by other workers.
+"""
+import asyncio
+import calendar
+import hashlib
+import logging
+import os
+import secrets
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Set, Tuple
+from app import crud
+from app.database import SessionLocal
+from app.principals import principal_cache
+
+# Refresh token lifetime, and how often each worker picks up revocations
+# made by the others. A token revoked elsewhere can be used here for up to
+# one sync interval.
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "14"))
+REVOCATION_SYNC_SECONDS = float(os.getenv("REVOCATION_SYNC_SECONDS", "10"))
+# Width of an expiry bucket in the revocation set
+REVOCATION_BUCKET_SECONDS = 300
+# How often each worker deletes refresh tokens past their expiry
+REFRESH_TOKEN_PRUNE_SECONDS = 3600
+
+logger = logging.getLogger(__name__)
+
+def hash_token(token: str) -> str:
+    """Digest stored in place of a refresh token"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def new_refresh_token() -> str:
+    return secrets.token_urlsafe(32)
+
+def new_token_id() -> str:
+    """A ``jti`` or refresh token family id"""
+    return uuid.uuid4().hex
+
+def to_timestamp(value: datetime) -> int:
+    """Seconds since the epoch for a naive UTC datetime, as in a JWT ``exp``"""
+    return calendar.timegm(value.utctimetuple())
+
+class RevokedTokens:
+    """Set of revoked access token ids, bucketed by the tokens' expiry"""
+
+    def __init__(self, bucket_seconds: int = REVOCATION_BUCKET_SECONDS):
+        self.bucket_seconds = bucket_seconds
+        self._buckets: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, jti: str, expires_at: int) -> bool:
+        """Remember a revoked token until it expires; returns False if it was already known"""
+        with self._lock:
+            bucket = self._buckets.setdefault(expires_at // self.bucket_seconds, set())
+            if jti in bucket:
+                return False
+            bucket.add(jti)
+            return True
+
+    def is_revoked(self, jti: Optional[str], expires_at: Optional[int]) -> bool:
+        """One dict and one set lookup; tokens without a ``jti`` predate revocation and pass"""
+        if jti is None or expires_at is None:
+            return False
+        bucket = self._buckets.get(expires_at // self.bucket_seconds)
+        return bucket is not None and jti in bucket
+
+    def prune(self, now: Optional[float] = None) -> None:
+        """Drop buckets whose tokens have all expired"""
+        current = int(time.time() if now is None else now) // self.bucket_seconds
+        with self._lock:
+            for key in [key for key in self._buckets if key < current]:
+                del self._buckets[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": sum(len(bucket) for bucket in self._buckets.values()),
+                "buckets": len(self._buckets),
+                "bucket_seconds": self.bucket_seconds,
+            }
+
+revoked_tokens = RevokedTokens()
+
+def remember_revoked(revoked: Iterable[Tuple[str, datetime, int]]) -> int:
+    """Add ``(access_jti, access_expires_at, user_id)`` rows to the set; returns how many were new
+
+    Cached principals of affected users are dropped too, since cache hits
+    skip the revocation check.
+    """
+    added = 0
+    for jti, expires_at, user_id in revoked:
+        if revoked_tokens.add(jti, to_timestamp(expires_at)):
+            principal_cache.invalidate_user(user_id)
+            added += 1
+    return added
+
+def load_revocations(since: datetime) -> int:
+    """Pick up access tokens revoked after ``since`` that haven't expired; returns how many were new"""
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        revoked = crud.get_revoked_access_tokens(db, since, now)
+    finally:
+        db.close()
+    revoked_tokens.prune()
+    return remember_revoked(revoked)
+
+def delete_expired_refresh_tokens() -> int:
+    db = SessionLocal()
+    try:
+        return crud.delete_expired_refresh_tokens(db, datetime.utcnow())
+    finally:
+        db.close()
+
+async def sync_revocations(since: datetime) -> None:
+    """Poll for other workers' revocations until cancelled
+
+    Each poll reaches one interval further back than the last one started,
+    so revocations committed while a poll was running aren't missed.
+    """
+    overlap = timedelta(seconds=REVOCATION_SYNC_SECONDS)
+    last_pruned = time.monotonic()
+    while True:
+        await asyncio.sleep(REVOCATION_SYNC_SECONDS)
+        started = datetime.utcnow()
+        try:
+            await asyncio.to_thread(load_revocations, since)
+            since = started - overlap
+            if time.monotonic() - last_pruned >= REFRESH_TOKEN_PRUNE_SECONDS:
+                await asyncio.to_thread(delete_expired_refresh_tokens)
+                last_pruned = time.monotonic()
+        except Exception:
+            logger.exception("Syncing revoked tokens failed; retrying in %ss", REVOCATION_SYNC_SECONDS)
\ No newline at end of file
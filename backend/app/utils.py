@@ -0,0 +1,36 @@
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+
+def _encode(values: list) -> str:
+    raw = json.dumps(values, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def _decode(cursor: str) -> list:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode()))
+
+def encode_cursor(created_at: datetime, item_id: int) -> str:
+    """Encode a (created_at, id) keyset position as an opaque URL-safe cursor"""
+    return _encode([created_at.isoformat(), item_id])
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor produced by encode_cursor, raising ValueError if it is malformed"""
+    try:
+        created_at, item_id = _decode(cursor)
+        return datetime.fromisoformat(created_at), int(item_id)
+    except (TypeError, ValueError, UnicodeDecodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+def encode_depth_cursor(depth: int, item_id: int) -> str:
+    """Encode a (depth, id) keyset position in an org listing"""
+    return _encode([depth, item_id])
+
+def decode_depth_cursor(cursor: str) -> Tuple[int, int]:
+    """Decode a cursor produced by encode_depth_cursor, raising ValueError if it is malformed"""
+    try:
+        depth, item_id = _decode(cursor)
+        return int(depth), int(item_id)
+    except (TypeError, ValueError, UnicodeDecodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
\ No newline at end of file
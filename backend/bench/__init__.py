@@ -0,0 +1 @@
+# Benchmarks for the Internal Feedback Tool API
\ No newline at end of file
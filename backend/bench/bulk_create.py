@@ -0,0 +1,115 @@
+"""Bulk feedback creation benchmark.
+
+Runs the ASGI app in-process against a throwaway SQLite database and creates
+N feedback items for a manager's team in two ways:
+
+* ``single`` - one ``POST /feedback/`` per item, as the review-cycle UI used to
+* ``bulk``   - one ``POST /feedback/bulk`` carrying all N items
+
+For each size it reports wall time, items per second and the number of SQL
+statements executed.
+
+Run from the backend directory:
+
+    python -m bench.bulk_create --sizes 10 100 1000
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+TEAM_SIZE = 25
+
+
+class StatementCounter:
+    """Count statements executed on the app's engine(s)"""
+
+    def __init__(self, engines):
+        from sqlalchemy import event
+
+        self.count = 0
+        for engine in engines:
+            event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+def make_items(employee_ids, size):
+    return [
+        {
+            "employee_id": employee_ids[i % len(employee_ids)],
+            "strengths": f"Delivered milestone {i} ahead of schedule",
+            "areas_to_improve": "Share progress earlier with the wider team",
+            "sentiment": ("positive", "neutral", "negative")[i % 3],
+            "tags": ["review-cycle", f"q{i % 4 + 1}"],
+        }
+        for i in range(size)
+    ]
+
+
+async def run(sizes) -> list:
+    import httpx
+    from app import database
+    from app.main import app
+    from app.schema import upgrade
+
+    # The client doesn't run the app's lifespan, which only checks the schema anyway
+    upgrade(database.engine)
+    engines = [database.engine] + ([database.async_engine.sync_engine] if database.async_engine is not None else [])
+    counter = StatementCounter(engines)
+
+    async with httpx.AsyncClient(app=app, base_url="http://bench", timeout=None) as client:
+        manager = {"name": "Bench Manager", "email": "manager@bench.local", "password": "password", "role": "manager"}
+        manager_id = (await client.post("/auth/register", json=manager)).json()["id"]
+        employee_ids = []
+        for i in range(TEAM_SIZE):
+            employee = {
+                "name": f"Employee {i}", "email": f"employee{i}@bench.local", "password": "password",
+                "role": "employee", "manager_id": manager_id,
+            }
+            employee_ids.append((await client.post("/auth/register", json=employee)).json()["id"])
+        login = await client.post("/auth/login", json={"email": "manager@bench.local", "password": "password"})
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+        results = []
+        for size in sizes:
+            items = make_items(employee_ids, size)
+            for mode in ("single", "bulk"):
+                counter.count = 0
+                started = time.perf_counter()
+                if mode == "single":
+                    for item in items:
+                        (await client.post("/feedback/", json=item, headers=headers)).raise_for_status()
+                else:
+                    response = await client.post("/feedback/bulk", json={"items": items}, headers=headers)
+                    response.raise_for_status()
+                    assert response.json()["created"] == size
+                elapsed = time.perf_counter() - started
+                results.append({
+                    "size": size,
+                    "mode": mode,
+                    "ms": round(elapsed * 1000, 1),
+                    "items_per_sec": round(size / elapsed, 1),
+                    "sql_statements": counter.count,
+                })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Point the app at a throwaway database before it is imported; cheap
+        # hashes keep registration out of the measurement
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        os.environ.setdefault("BCRYPT_ROUNDS", "4")
+        for result in asyncio.run(run(args.sizes)):
+            print(json.dumps(result))
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
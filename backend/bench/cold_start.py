@@ -0,0 +1,159 @@
+"""Worker cold-start benchmark.
+
+Seeds a throwaway SQLite database with ``bench.seed``, then repeatedly starts
+a single uvicorn worker on it and times how long the new process takes to
+answer its first ``GET /health``. Two startups take turns:
+
+* ``check``      - the app as it is: the lifespan compares the schema
+  revision with the newest migration and nothing else
+* ``create_all`` - the same, plus what every worker used to do at import:
+  ``create_all``, the legacy tags migration and the closure, rollup and
+  search index backfill checks
+
+For each it reports the time to first response and, timed inside the worker
+after the app is imported, the schema step on its own. The lifespan check
+runs in both, so the first-response difference is what the old steps cost.
+
+Run from the backend directory:
+
+    python -m bench.cold_start --runs 20 --feedback 100000
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench.common import BACKEND_DIR, summarize
+
+VARIANTS = ["check", "create_all"]
+
+
+def legacy_startup(engine) -> None:
+    """Import-time startup from before migrations"""
+    from sqlalchemy import select
+    from sqlalchemy.orm import Session
+
+    from app import models
+    from app.database import Base
+    from app.org import rebuild_closure
+    from app.rollups import rebuild_rollups
+    from app.search import get_backend, rebuild_search_index
+    from app.tags import migrate_legacy_tags
+
+    Base.metadata.create_all(bind=engine)
+    migrate_legacy_tags(engine)
+    db = Session(bind=engine)
+    try:
+        # Each backfill only ran on an empty table, so a seeded database pays one read apiece
+        if db.execute(select(models.UserClosure.ancestor_id).limit(1)).first() is None:
+            rebuild_closure(db)
+            db.commit()
+        if db.execute(select(models.FeedbackRollup.granularity).limit(1)).first() is None:
+            rebuild_rollups(db)
+            db.commit()
+        backend = get_backend(engine.dialect.name)
+        if backend is not None and backend.create_index(db.connection()):
+            rebuild_search_index(db)
+        db.commit()
+    finally:
+        db.close()
+
+
+def serve(variant: str, port: int) -> None:
+    """Import the app, run the schema step and report its duration on stdout, then serve"""
+    import uvicorn
+
+    from app.database import engine
+    from app.main import app
+    from app.schema import check_schema
+
+    # Timed after the import so that only the step's own work is counted
+    started = time.perf_counter()
+    if variant == "create_all":
+        legacy_startup(engine)
+    else:
+        check_schema(engine)
+    print(json.dumps({"schema_seconds": time.perf_counter() - started}), flush=True)
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def boot(variant: str, env: dict, timeout: float = 30.0) -> tuple:
+    """Start a worker and poll until it answers; returns seconds to first response and its schema step"""
+    port = free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "bench.cold_start", "--serve", variant, "--port", str(port)],
+        env=env, cwd=BACKEND_DIR, stdout=subprocess.PIPE, text=True,
+    )
+    try:
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"{variant} worker exited with {process.returncode}")
+            if time.perf_counter() - started > timeout:
+                raise RuntimeError(f"{variant} worker didn't answer within {timeout}s")
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            try:
+                connection.request("GET", "/health")
+                if connection.getresponse().status == 200:
+                    break
+            except OSError:
+                time.sleep(0.002)
+            finally:
+                connection.close()
+        ready = time.perf_counter() - started
+        return ready, json.loads(process.stdout.readline())["schema_seconds"]
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20, help="boots per variant")
+    parser.add_argument("--feedback", type=int, default=100_000, help="feedback rows to seed")
+    parser.add_argument("--serve", choices=VARIANTS, help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        env = dict(os.environ, PYTHONPATH=BACKEND_DIR, DATABASE_URL=database_url, BCRYPT_ROUNDS="4")
+        subprocess.run(
+            [sys.executable, "-m", "bench.seed", "--database-url", database_url, "--feedback", str(args.feedback)],
+            env=env, cwd=BACKEND_DIR, check=True, stdout=subprocess.DEVNULL,
+        )
+        ready = {variant: [] for variant in VARIANTS}
+        schema = {variant: [] for variant in VARIANTS}
+        # Alternate so disk cache and CPU frequency affect both alike
+        for _ in range(args.runs):
+            for variant in VARIANTS:
+                seconds, schema_seconds = boot(variant, env)
+                ready[variant].append(seconds)
+                schema[variant].append(schema_seconds)
+
+    for variant in VARIANTS:
+        print(json.dumps({
+            "variant": variant,
+            "feedback": args.feedback,
+            "first_response": summarize(ready[variant]),
+            "schema_step": summarize(schema[variant]),
+        }))
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
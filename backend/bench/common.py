@@ -0,0 +1,39 @@
+"""Helpers shared by the benchmarks."""
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(samples, pct):
+    """Return the ``pct`` percentile of ``samples`` (seconds) in milliseconds"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return round(ordered[index] * 1000, 2)
+
+
+def summarize(samples):
+    return {
+        "count": len(samples),
+        "p50_ms": percentile(samples, 50),
+        "p95_ms": percentile(samples, 95),
+        "p99_ms": percentile(samples, 99),
+    }
+
+
+def run_child(module: str, args, env_overrides: dict) -> dict:
+    """Run ``python -m module --child ...`` with extra environment and parse its JSON result
+
+    The app reads its configuration at import time, so each configuration
+    under test gets a fresh interpreter.
+    """
+    env = dict(os.environ, PYTHONPATH=BACKEND_DIR, **env_overrides)
+    output = subprocess.run(
+        [sys.executable, "-m", module, "--child", *[str(arg) for arg in args]],
+        env=env, cwd=BACKEND_DIR, check=True, stdout=subprocess.PIPE, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
@@ -0,0 +1,89 @@
+"""Conditional GET benchmark.
+
+Runs the ASGI app in-process against a throwaway SQLite database with one
+manager, a team and a few hundred feedback items. For each cached read it
+times full responses against revalidations that send the previous ETag back
+in ``If-None-Match`` and get a 304, and reports latency, response bytes and
+SQL statements per request.
+
+Run from the backend directory:
+
+    python -m bench.conditional_get --requests 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from bench.bulk_create import StatementCounter, make_items
+from bench.common import summarize
+
+TEAM_SIZE = 25
+FEEDBACK_ITEMS = 500
+ENDPOINTS = ["/feedback/", "/dashboard/manager", "/users/team", "/dashboard/trends", "/dashboard/org"]
+
+
+async def run(requests: int) -> list:
+    import httpx
+    from app import database
+    from app.main import app
+    from app.schema import upgrade
+
+    # The client doesn't run the app's lifespan, which only checks the schema anyway
+    upgrade(database.engine)
+    engines = [database.engine] + ([database.async_engine.sync_engine] if database.async_engine is not None else [])
+    counter = StatementCounter(engines)
+
+    async with httpx.AsyncClient(app=app, base_url="http://bench", timeout=None) as client:
+        manager = {"name": "Bench Manager", "email": "manager@bench.local", "password": "password", "role": "manager"}
+        manager_id = (await client.post("/auth/register", json=manager)).json()["id"]
+        employee_ids = []
+        for i in range(TEAM_SIZE):
+            employee = {
+                "name": f"Employee {i}", "email": f"employee{i}@bench.local", "password": "password",
+                "role": "employee", "manager_id": manager_id,
+            }
+            employee_ids.append((await client.post("/auth/register", json=employee)).json()["id"])
+        login = await client.post("/auth/login", json={"email": "manager@bench.local", "password": "password"})
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        items = make_items(employee_ids, FEEDBACK_ITEMS)
+        (await client.post("/feedback/bulk", json={"items": items}, headers=headers)).raise_for_status()
+
+        results = []
+        for path in ENDPOINTS:
+            etag = (await client.get(path, headers=headers)).headers["etag"]
+            for mode, request_headers in (("full", headers), ("revalidate", {**headers, "If-None-Match": etag})):
+                samples, size = [], 0
+                counter.count = 0
+                for _ in range(requests):
+                    started = time.perf_counter()
+                    response = await client.get(path, headers=request_headers)
+                    samples.append(time.perf_counter() - started)
+                    assert response.status_code == (304 if mode == "revalidate" else 200), response.status_code
+                    size = len(response.content)
+                results.append({
+                    "path": path,
+                    "mode": mode,
+                    "bytes": size,
+                    "sql_per_request": round(counter.count / requests, 2),
+                    **summarize(samples),
+                })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Point the app at a throwaway database before it is imported
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        os.environ.setdefault("BCRYPT_ROUNDS", "4")
+        for result in asyncio.run(run(args.requests)):
+            print(json.dumps(result))
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
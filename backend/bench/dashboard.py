@@ -0,0 +1,156 @@
+"""Dashboard stats benchmark.
+
+Seeds a throwaway SQLite database with one manager, one employee and N
+feedback rows, then compares three ways of building the manager dashboard
+stats: the legacy path (three full ``get_feedback_by_manager`` loads plus
+Python counting), ``crud.get_feedback_stats`` falling back to the grouped
+aggregate, and ``crud.get_feedback_stats`` reading backfilled feedback_stats
+counters. For each size it reports the number of SQL statements, wall time
+and peak traced memory.
+
+Run from the backend directory:
+
+    python -m bench.dashboard --sizes 100 10000 1000000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app import crud, models
+from app.stats import reconcile_feedback_stats
+
+SENTIMENTS = [
+    models.FeedbackSentiment.POSITIVE,
+    models.FeedbackSentiment.POSITIVE,
+    models.FeedbackSentiment.NEUTRAL,
+    models.FeedbackSentiment.NEGATIVE,
+]
+INSERT_CHUNK = 10_000
+
+
+class StatementCounter:
+    """Count statements executed on an engine"""
+
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+def seed(engine, rows: int) -> int:
+    """Insert a manager, an employee and ``rows`` feedback items; return the manager id"""
+    users = models.User.__table__
+    feedback = models.Feedback.__table__
+    start = datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        manager_id = conn.execute(users.insert().values(
+            name="Bench Manager", email="manager@bench.local", password_hash="x",
+            role=models.UserRole.MANAGER,
+        )).inserted_primary_key[0]
+        employee_id = conn.execute(users.insert().values(
+            name="Bench Employee", email="employee@bench.local", password_hash="x",
+            role=models.UserRole.EMPLOYEE, manager_id=manager_id,
+        )).inserted_primary_key[0]
+        for offset in range(0, rows, INSERT_CHUNK):
+            conn.execute(feedback.insert(), [
+                {
+                    "employee_id": employee_id,
+                    "manager_id": manager_id,
+                    "strengths": "Consistently ships well-tested changes",
+                    "areas_to_improve": "Share context earlier in design reviews",
+                    "sentiment": SENTIMENTS[i % len(SENTIMENTS)],
+                    "created_at": start + timedelta(seconds=i),
+                    "acknowledged": i % 3 == 0,
+                    "is_anonymous": False,
+                }
+                for i in range(offset, min(offset + INSERT_CHUNK, rows))
+            ])
+    return manager_id
+
+
+def legacy_stats(db, manager_id: int) -> dict:
+    """The pre-aggregate dashboard path: load the full history three times"""
+    total_feedback = len(crud.get_feedback_by_manager(db, manager_id))
+    recent_feedback = crud.get_feedback_by_manager(db, manager_id)[:5]
+    all_feedback = crud.get_feedback_by_manager(db, manager_id)
+    return {
+        "total_feedback": total_feedback,
+        "positive_feedback": len([f for f in all_feedback if f.sentiment == models.FeedbackSentiment.POSITIVE]),
+        "neutral_feedback": len([f for f in all_feedback if f.sentiment == models.FeedbackSentiment.NEUTRAL]),
+        "negative_feedback": len([f for f in all_feedback if f.sentiment == models.FeedbackSentiment.NEGATIVE]),
+        "recent_feedback": recent_feedback,
+    }
+
+
+def aggregate_stats(db, manager_id: int) -> dict:
+    return crud.get_feedback_stats(db, manager_id, is_manager=True)
+
+
+def measure(session_factory, counter, fn, manager_id: int, warm_up: bool = False) -> dict:
+    db = session_factory()
+    try:
+        if warm_up:
+            # Prime SQLAlchemy's compiled statement caches outside the measurement
+            fn(db, manager_id)
+        counter.count = 0
+        tracemalloc.start()
+        started = time.perf_counter()
+        stats = fn(db, manager_id)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        db.close()
+    return {
+        "statements": counter.count,
+        "seconds": round(elapsed, 4),
+        "peak_kib": round(peak / 1024, 1),
+        "total_feedback": stats["total_feedback"],
+    }
+
+
+def run(rows: int, skip_legacy_above: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        manager_id = seed(engine, rows)
+        counter = StatementCounter(engine)
+        session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        result = {"rows": rows, "aggregate": measure(session_factory, counter, aggregate_stats, manager_id, warm_up=True)}
+
+        db = session_factory()
+        reconcile_feedback_stats(db, fix=True)
+        db.close()
+        result["counters"] = measure(session_factory, counter, aggregate_stats, manager_id, warm_up=True)
+
+        if rows <= skip_legacy_above:
+            result["legacy"] = measure(session_factory, counter, legacy_stats, manager_id)
+        engine.dispose()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10_000, 1_000_000])
+    parser.add_argument(
+        "--skip-legacy-above", type=int, default=1_000_000,
+        help="only run the legacy path up to this many rows (it loads the full history 3x)",
+    )
+    args = parser.parse_args()
+    for rows in args.sizes:
+        print(json.dumps(run(rows, args.skip_legacy_above)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Sync vs async database mode benchmark.
+
+Seeds a throwaway SQLite database with a manager, a team and their feedback,
+then drives the ASGI app in-process with concurrent clients reading
+``/feedback/`` and the dashboards. Each ``DATABASE_ASYNC`` mode runs in its
+own subprocess against identical data and reports requests/sec and latency.
+
+Keep ``--clients`` at or below ``DB_POOL_SIZE + DB_MAX_OVERFLOW`` (15 by
+default): in sync mode a request that waits for a pooled connection
+blocks the event loop, so the requests holding connections can never finish
+and release them.
+
+Run from the backend directory:
+
+    python -m bench.db_modes --clients 8 --seconds 10
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from bench.common import run_child, summarize
+
+MODES = {"sync": {"DATABASE_ASYNC": "false"}, "async": {"DATABASE_ASYNC": "true"}}
+TEAM_SIZE = 20
+
+
+def seed(feedback_rows: int) -> None:
+    """Bulk-insert a team and its feedback, then backfill the dashboard counters"""
+    from app import models
+    from app.auth import get_password_hash
+    from app.database import Base, SessionLocal, engine
+    from app.stats import reconcile_feedback_stats
+
+    Base.metadata.create_all(bind=engine)
+    users = models.User.__table__
+    password_hash = get_password_hash("password")
+    with engine.begin() as conn:
+        conn.execute(users.insert(), [{
+            "id": 1, "name": "Bench Manager", "email": "manager@bench.local",
+            "password_hash": password_hash, "role": models.UserRole.MANAGER,
+        }] + [{
+            "id": i + 2, "name": f"Bench Employee {i}", "email": f"employee{i}@bench.local",
+            "password_hash": password_hash, "role": models.UserRole.EMPLOYEE, "manager_id": 1,
+        } for i in range(TEAM_SIZE)])
+        sentiments = list(models.FeedbackSentiment)
+        start = datetime(2024, 1, 1)
+        conn.execute(models.Feedback.__table__.insert(), [{
+            "employee_id": 2 + i % TEAM_SIZE, "manager_id": 1,
+            "strengths": "Consistently ships well-tested changes",
+            "areas_to_improve": "Share context earlier in design reviews",
+            "sentiment": sentiments[i % len(sentiments)], "created_at": start + timedelta(minutes=i),
+            "acknowledged": i % 2 == 0, "is_anonymous": False,
+        } for i in range(feedback_rows)])
+    db = SessionLocal()
+    reconcile_feedback_stats(db, fix=True)
+    db.close()
+
+
+async def client_loop(client, requests, stop, latencies, errors):
+    for path, headers in itertools.cycle(requests):
+        if stop.is_set():
+            return
+        started = time.perf_counter()
+        response = await client.get(path, headers=headers)
+        if response.status_code != 200:
+            errors.append(response.status_code)
+        latencies.append(time.perf_counter() - started)
+
+
+async def run_mode(clients: int, seconds: float) -> dict:
+    import httpx
+    from app.main import app
+
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        async def token(email):
+            response = await client.post("/auth/login", json={"email": email, "password": "password"})
+            response.raise_for_status()
+            return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        manager = await token("manager@bench.local")
+        employee = await token("employee0@bench.local")
+        requests = [
+            ("/feedback/", manager),
+            ("/dashboard/manager", manager),
+            ("/feedback/my-feedback", employee),
+            ("/dashboard/employee", employee),
+        ]
+
+        stop = asyncio.Event()
+        latencies, errors = [], []
+        tasks = [asyncio.create_task(client_loop(client, requests, stop, latencies, errors)) for _ in range(clients)]
+        started = time.perf_counter()
+        await asyncio.sleep(seconds)
+        stop.set()
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "latency": summarize(latencies),
+        "errors": len(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=["sync", "async", "both"], default="both")
+    parser.add_argument("--clients", type=int, default=8, help="concurrent in-process clients")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--feedback-rows", type=int, default=10_000)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        # Point the app at a throwaway database before it is imported
+        with tempfile.TemporaryDirectory() as tmp:
+            os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            seed(args.feedback_rows)
+            print(json.dumps(asyncio.run(run_mode(args.clients, args.seconds))))
+        return
+
+    for mode in (["sync", "async"] if args.mode == "both" else [args.mode]):
+        result = run_child(
+            "bench.db_modes",
+            ["--clients", args.clients, "--seconds", args.seconds, "--feedback-rows", args.feedback_rows],
+            dict(MODES[mode], BCRYPT_ROUNDS="4"),
+        )
+        print(json.dumps({"mode": mode, **result}))
+
+
+if __name__ == "__main__":
+    main()
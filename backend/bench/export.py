@@ -0,0 +1,161 @@
+"""Streaming export benchmark.
+
+Seeds a throwaway SQLite database with one manager, a small team and N
+feedback rows (two tags each), then streams ``GET /feedback/export`` for the
+manager in a fresh interpreter and reports rows, bytes, throughput and the
+process's peak RSS before and after the export. The response is consumed
+chunk by chunk straight from the ASGI app, so nothing but the app itself
+holds export data in memory.
+
+SQLite's mmap window and page cache also count towards RSS and grow with the
+database file up to their configured limits, so by default the child runs
+with mmap off and a small page cache to isolate the export path itself.
+
+Run from the backend directory:
+
+    python -m bench.export --sizes 10000 1000000 --format csv
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from bench.common import run_child
+
+TEAM_SIZE = 20
+INSERT_CHUNK = 10_000
+
+
+def seed(database_url: str, rows: int) -> None:
+    from sqlalchemy import create_engine
+
+    from app import models
+    from app.database import Base
+
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine)
+    sentiments = list(models.FeedbackSentiment)
+    start = datetime(2020, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(models.User.__table__.insert(), [{
+            "id": 1, "name": "Bench Manager", "email": "manager@bench.local", "password_hash": "x",
+            "role": models.UserRole.MANAGER,
+        }] + [{
+            "id": 2 + i, "name": f"Employee {i}", "email": f"employee{i}@bench.local", "password_hash": "x",
+            "role": models.UserRole.EMPLOYEE, "manager_id": 1,
+        } for i in range(TEAM_SIZE)])
+        conn.execute(models.Tag.__table__.insert(), [{"id": 1, "name": "delivery"}, {"id": 2, "name": "communication"}])
+        for offset in range(0, rows, INSERT_CHUNK):
+            ids = range(offset + 1, min(offset + INSERT_CHUNK, rows) + 1)
+            conn.execute(models.Feedback.__table__.insert(), [{
+                "id": i, "employee_id": 2 + i % TEAM_SIZE, "manager_id": 1,
+                "strengths": "Consistently ships well-tested changes, with clear write-ups",
+                "areas_to_improve": "Share context earlier in design reviews",
+                "sentiment": sentiments[i % len(sentiments)], "created_at": start + timedelta(seconds=i),
+                "acknowledged": i % 2 == 0, "is_anonymous": False,
+            } for i in ids])
+            conn.execute(models.feedback_tags.insert(), [
+                {"feedback_id": i, "tag_id": tag_id} for i in ids for tag_id in (1, 2)
+            ])
+    engine.dispose()
+
+
+def peak_rss_mib() -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale, 1)
+
+
+async def consume(app, path: str, query: str, token: str) -> dict:
+    """Drive one GET through the ASGI app, counting the streamed body without keeping it"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+        "headers": [(b"host", b"bench"), (b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 0), "server": ("bench", 80),
+    }
+    stats = {"status": None, "bytes": 0, "lines": 0, "chunks": 0}
+
+    request_sent = False
+    response_done = asyncio.Event()
+
+    async def receive():
+        # Deliver the (empty) request body once, then report a disconnect only
+        # after the response is complete, like a real client that stays connected
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await response_done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            stats["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            body = message.get("body", b"")
+            stats["bytes"] += len(body)
+            stats["lines"] += body.count(b"\n")
+            stats["chunks"] += 1 if body else 0
+            if not message.get("more_body", False):
+                response_done.set()
+
+    await app(scope, receive, send)
+    return stats
+
+
+def child(export_format: str) -> dict:
+    from app.auth import create_access_token
+    from app.main import app
+
+    token = create_access_token({"sub": "manager@bench.local"}, timedelta(hours=1))
+    # Warm up imports, the auth path and the statement cache on a tiny export
+    asyncio.run(consume(app, "/feedback/export", f"format={export_format}&scope=given&employee_id=2&tag=none", token))
+    rss_before = peak_rss_mib()
+    started = time.perf_counter()
+    # The seed has no org closure, so export what the manager gave
+    stats = asyncio.run(consume(app, "/feedback/export", f"format={export_format}&scope=given", token))
+    elapsed = time.perf_counter() - started
+    return {
+        "status": stats["status"],
+        "lines": stats["lines"],
+        "mib": round(stats["bytes"] / 1024 / 1024, 1),
+        "chunks": stats["chunks"],
+        "seconds": round(elapsed, 2),
+        "rows_per_sec": round(stats["lines"] / elapsed),
+        "peak_rss_before_mib": rss_before,
+        "peak_rss_after_mib": peak_rss_mib(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 1_000_000])
+    parser.add_argument("--format", choices=["csv", "ndjson"], default="csv")
+    parser.add_argument("--sqlite-mmap-size", type=int, default=0, help="SQLITE_MMAP_SIZE for the app")
+    parser.add_argument("--sqlite-cache-kib", type=int, default=8192, help="SQLITE_CACHE_SIZE_KIB for the app")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(child(args.format)))
+        return
+
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            database_url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            seed(database_url, size)
+            result = run_child("bench.export", ["--format", args.format], {
+                "DATABASE_URL": database_url,
+                "SQLITE_MMAP_SIZE": str(args.sqlite_mmap_size),
+                "SQLITE_CACHE_SIZE_KIB": str(args.sqlite_cache_kib),
+            })
+            print(json.dumps({"rows": size, "format": args.format, **result}))
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,253 @@
+"""Load test scenarios against the ASGI app.
+
+Seeds a throwaway database with ``bench.seed`` (or reuses one given with
+``--database-url``), then drives the app in-process with ``--clients``
+concurrent clients through these scenarios, in order:
+
+* ``login``       - ``POST /auth/login`` as a spread of employees
+* ``refresh``     - ``POST /auth/refresh`` as the same employees, each request
+  rotating the refresh token that employee's previous one returned. Keep
+  ``--clients`` at most the number of sampled employees, or two requests
+  can present the same token and the second revokes its family
+* ``dashboard``   - ``/dashboard/manager`` and ``/dashboard/employee``, alternating
+* ``list``        - the first page of ``/feedback/`` for managers and of
+  ``/feedback/my-feedback`` for employees, alternating
+* ``create``      - ``POST /feedback/`` from managers to their direct reports
+* ``acknowledge`` - ``POST /feedback/{id}/acknowledge`` on employees' unacknowledged
+  feedback, so it is capped by how much of that the sampled employees have
+
+Each scenario makes ``--requests`` requests and reports throughput,
+p50/p95/p99 latency, non-200 responses, SQL statements per request (the mean
+over the scenario) and the process's peak RSS so far, one JSON line each
+after a line describing the run. With the defaults the data, users and
+request order are the same on every run, so the output can be diffed against
+an earlier run to spot regressions.
+
+The app runs in a fresh interpreter with ``BCRYPT_ROUNDS=4``; set
+``DATABASE_ASYNC`` and the other settings in the environment as usual. As in
+``bench.db_modes``, keep ``--clients`` within the connection pool in sync
+mode. The write scenarios change a reused database, so reseed it to compare
+runs exactly. With only 4 rounds, ``login`` is much cheaper than in
+production; ``bench.login_storm`` measures bcrypt at its real cost.
+
+Run from the backend directory:
+
+    python -m bench.load --clients 8 --requests 1000 --feedback 100000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy.engine import make_url
+
+from bench.bulk_create import StatementCounter
+from bench.common import run_child, summarize
+from bench.export import peak_rss_mib
+
+SCENARIOS = ["login", "refresh", "dashboard", "list", "create", "acknowledge"]
+# Distinct users logged in per role; requests are spread across them
+SAMPLE_USERS = 50
+
+
+def sample_users(db, rng: random.Random) -> dict:
+    """Managers with direct reports and employees, chosen the same way on every run"""
+    from app import models
+
+    managers = {}
+    for employee_id, manager_id in (
+        db.query(models.User.id, models.User.manager_id)
+        .filter(models.User.role == models.UserRole.EMPLOYEE)
+        .order_by(models.User.id)
+    ):
+        managers.setdefault(manager_id, []).append(employee_id)
+    manager_ids = rng.sample(sorted(managers), min(SAMPLE_USERS, len(managers)))
+    employees = [employee_id for reports in managers.values() for employee_id in reports]
+    employee_ids = rng.sample(employees, min(SAMPLE_USERS, len(employees)))
+    emails = dict(db.query(models.User.id, models.User.email).filter(models.User.id.in_(manager_ids + employee_ids)))
+    return {
+        "managers": [(emails[manager_id], managers[manager_id]) for manager_id in manager_ids],
+        "employees": [(employee_id, emails[employee_id]) for employee_id in employee_ids],
+    }
+
+
+def unacknowledged(db, employee_ids) -> list:
+    """(employee id, feedback id) for the employees' unacknowledged feedback, oldest first"""
+    from app import models
+
+    return (
+        db.query(models.Feedback.employee_id, models.Feedback.id)
+        .filter(models.Feedback.employee_id.in_(employee_ids), models.Feedback.acknowledged.is_(False))
+        .order_by(models.Feedback.id)
+        .all()
+    )
+
+
+async def drive(client, requests: int, clients: int, make_request) -> tuple:
+    """Send ``requests`` requests from ``clients`` concurrent workers; returns latencies, failures and seconds"""
+    latencies, failures = [], {}
+    next_index = iter(range(requests))
+
+    async def worker():
+        for index in next_index:
+            started = time.perf_counter()
+            response = await make_request(client, index)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                failures[response.status_code] = failures.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(clients)))
+    return latencies, failures, time.perf_counter() - started
+
+
+async def run_scenarios(scenarios, clients: int, requests: int, seed: int) -> list:
+    import httpx
+    from app import database
+    from app.main import app
+
+    rng = random.Random(seed)
+    db = database.SessionLocal()
+    users = sample_users(db, rng)
+    db.close()
+
+    engines = [database.engine] + ([database.async_engine.sync_engine] if database.async_engine is not None else [])
+    counter = StatementCounter(engines)
+    results = []
+    async with httpx.AsyncClient(app=app, base_url="http://bench", timeout=None) as client:
+        async def login(email):
+            response = await client.post("/auth/login", json={"email": email, "password": "password"})
+            response.raise_for_status()
+            return response.json()
+
+        def bearer(tokens):
+            return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+        managers = [(bearer(await login(email)), reports) for email, reports in users["managers"]]
+        employee_tokens = {employee_id: await login(email) for employee_id, email in users["employees"]}
+        employees = {employee_id: bearer(tokens) for employee_id, tokens in employee_tokens.items()}
+        employee_emails = [email for _, email in users["employees"]]
+        employee_headers = list(employees.values())
+        # The current refresh token of each sampled employee, replaced as it rotates
+        refresh_tokens = [tokens["refresh_token"] for tokens in employee_tokens.values()]
+
+        async def login_request(client, i):
+            return await client.post("/auth/login", json={
+                "email": employee_emails[i % len(employee_emails)], "password": "password",
+            })
+
+        async def refresh_request(client, i):
+            slot = i % len(refresh_tokens)
+            response = await client.post("/auth/refresh", json={"refresh_token": refresh_tokens[slot]})
+            if response.status_code == 200:
+                refresh_tokens[slot] = response.json()["refresh_token"]
+            return response
+
+        async def dashboard_request(client, i):
+            if i % 2:
+                return await client.get("/dashboard/employee", headers=employee_headers[i // 2 % len(employee_headers)])
+            return await client.get("/dashboard/manager", headers=managers[i // 2 % len(managers)][0])
+
+        async def list_request(client, i):
+            if i % 2:
+                return await client.get("/feedback/my-feedback", headers=employee_headers[i // 2 % len(employee_headers)])
+            return await client.get("/feedback/", headers=managers[i // 2 % len(managers)][0])
+
+        async def create_request(client, i):
+            headers, reports = managers[i % len(managers)]
+            return await client.post("/feedback/", headers=headers, json={
+                "employee_id": reports[i // len(managers) % len(reports)],
+                "strengths": f"Load test feedback {i}: kept the release on track",
+                "areas_to_improve": "Share progress earlier with the wider team",
+                "sentiment": ("positive", "positive", "neutral", "negative")[i % 4],
+                "tags": ["load-test"],
+            })
+
+        pending = []
+
+        async def acknowledge_request(client, i):
+            employee_id, feedback_id = pending[i]
+            return await client.post(f"/feedback/{feedback_id}/acknowledge", headers=employees[employee_id])
+
+        handlers = {
+            "login": login_request,
+            "refresh": refresh_request,
+            "dashboard": dashboard_request,
+            "list": list_request,
+            "create": create_request,
+            "acknowledge": acknowledge_request,
+        }
+        for scenario in scenarios:
+            count = requests
+            if scenario == "acknowledge":
+                db = database.SessionLocal()
+                pending = unacknowledged(db, list(employees))[:requests]
+                db.close()
+                count = len(pending)
+            counter.count = 0
+            latencies, failures, elapsed = await drive(client, count, clients, handlers[scenario])
+            results.append({
+                "scenario": scenario,
+                "requests": count,
+                "requests_per_second": round(count / elapsed, 1) if elapsed else None,
+                "latency": summarize(latencies),
+                "failures": {str(status): n for status, n in sorted(failures.items())},
+                "sql_per_request": round(counter.count / count, 2) if count else None,
+                "peak_rss_mib": peak_rss_mib(),
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--clients", type=int, default=8, help="concurrent in-process clients")
+    parser.add_argument("--requests", type=int, default=1000, help="requests per scenario")
+    parser.add_argument("--database-url", help="an already seeded database to use instead of a fresh one")
+    parser.add_argument("--orgs", type=int, default=2)
+    parser.add_argument("--managers", type=int, default=10, help="managers per director")
+    parser.add_argument("--team-size", type=int, default=8)
+    parser.add_argument("--feedback", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        with tempfile.TemporaryDirectory() as tmp:
+            # Point the app at the database before it is imported
+            os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            from bench.seed import seed
+            from app.database import engine
+
+            seeded = None
+            if not args.database_url:
+                seeded = seed(
+                    engine, orgs=args.orgs, managers=args.managers, team_size=args.team_size,
+                    feedback=args.feedback, seed=args.seed,
+                )
+            results = asyncio.run(run_scenarios(args.scenarios, args.clients, args.requests, args.seed))
+            print(json.dumps({"seeded": seeded, "results": results}))
+        return
+
+    child_args = [
+        "--clients", args.clients, "--requests", args.requests, "--orgs", args.orgs, "--managers", args.managers,
+        "--team-size", args.team_size, "--feedback", args.feedback, "--seed", args.seed, "--scenarios", *args.scenarios,
+    ]
+    if args.database_url:
+        child_args += ["--database-url", args.database_url]
+    output = run_child("bench.load", child_args, {"BCRYPT_ROUNDS": "4"})
+    print(json.dumps({
+        "clients": args.clients,
+        "database_async": os.getenv("DATABASE_ASYNC", "false"),
+        "database": make_url(args.database_url).render_as_string(hide_password=True) if args.database_url else "fresh",
+        "seeded": output["seeded"],
+    }))
+    for result in output["results"]:
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,106 @@
+"""Login storm benchmark.
+
+Runs the ASGI app in-process against a throwaway SQLite database and measures
+the latency of ``/health`` and ``/feedback/`` while a pool of clients hammers
+``/auth/login``. Each password mode runs in its own subprocess because the
+password pool is configured at import time:
+
+* ``pool``   - bcrypt on the dedicated password pool (the default)
+* ``inline`` - bcrypt on the event loop (``PASSWORD_HASH_WORKERS=0``), the old
+  behaviour
+
+Run from the backend directory:
+
+    python -m bench.login_storm --mode both --logins 8 --seconds 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from bench.common import run_child, summarize
+
+MODES = {"pool": {}, "inline": {"PASSWORD_HASH_WORKERS": "0"}}
+
+
+async def probe(client, path, headers, stop, samples):
+    """Issue sequential requests to ``path`` until ``stop`` is set"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        response = await client.get(path, headers=headers)
+        response.raise_for_status()
+        samples.append(time.perf_counter() - started)
+        await asyncio.sleep(0.01)
+
+
+async def login_loop(client, stop, outcomes):
+    while not stop.is_set():
+        response = await client.post("/auth/login", json={"email": "employee@bench.local", "password": "password"})
+        outcomes[response.status_code] = outcomes.get(response.status_code, 0) + 1
+
+
+async def run_phase(client, headers, seconds, logins):
+    stop = asyncio.Event()
+    health, feedback, outcomes = [], [], {}
+    tasks = [
+        asyncio.create_task(probe(client, "/health", {}, stop, health)),
+        asyncio.create_task(probe(client, "/feedback/", headers, stop, feedback)),
+    ] + [asyncio.create_task(login_loop(client, stop, outcomes)) for _ in range(logins)]
+    await asyncio.sleep(seconds)
+    stop.set()
+    await asyncio.gather(*tasks)
+    return {
+        "health": summarize(health),
+        "feedback": summarize(feedback),
+        "logins": {str(code): count for code, count in sorted(outcomes.items())},
+    }
+
+
+async def run_mode(logins: int, seconds: float) -> dict:
+    import httpx
+    from app.database import engine
+    from app.main import app
+    from app.schema import upgrade
+
+    # The client doesn't run the app's lifespan, which only checks the schema anyway
+    upgrade(engine)
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        manager = {"name": "Bench Manager", "email": "manager@bench.local", "password": "password", "role": "manager"}
+        (await client.post("/auth/register", json=manager)).raise_for_status()
+        employee = {
+            "name": "Bench Employee", "email": "employee@bench.local", "password": "password",
+            "role": "employee", "manager_id": 1,
+        }
+        (await client.post("/auth/register", json=employee)).raise_for_status()
+        login = await client.post("/auth/login", json={"email": "employee@bench.local", "password": "password"})
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+        return {
+            "baseline": await run_phase(client, headers, seconds, 0),
+            "storm": await run_phase(client, headers, seconds, logins),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=["pool", "inline", "both"], default="both")
+    parser.add_argument("--logins", type=int, default=8, help="concurrent login clients during the storm")
+    parser.add_argument("--seconds", type=float, default=5.0, help="duration of each phase")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        # Point the app at a throwaway database before it is imported
+        with tempfile.TemporaryDirectory() as tmp:
+            os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            print(json.dumps(asyncio.run(run_mode(args.logins, args.seconds))))
+        return
+
+    for mode in (["pool", "inline"] if args.mode == "both" else [args.mode]):
+        result = run_child("bench.login_storm", ["--logins", args.logins, "--seconds", args.seconds], MODES[mode])
+        print(json.dumps({"mode": mode, **result}))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Middleware stack overhead benchmark.
+
+Seeds a throwaway SQLite database with a manager, a team and their feedback,
+then sends the same requests through the app with different parts of its
+middleware stack: none, each layer on its own, and the full stack as
+configured. Requests go straight to the ASGI callable, with the headers a
+browser on the frontend would send, and the variants take turns so drift
+affects them all alike. For each path it reports latency in microseconds,
+the difference from no middleware at the median, and the body size on the
+wire.
+
+``/health`` shows the fixed cost per request. A 200-item ``/feedback/`` page
+is large enough to be compressed, which dominates the stack's cost there.
+The engine listeners behind instrumentation are installed at import and run
+in every variant; ``bench.instrumentation`` covers those.
+
+Run from the backend directory:
+
+    python -m bench.middleware --requests 2000
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from datetime import timedelta
+
+from bench.common import percentile, run_child
+from bench.db_modes import seed
+
+PATHS = [("/health", ""), ("/feedback/", "limit=200")]
+LAYERS = {
+    "RequestIDMiddleware": "request_id",
+    "InstrumentationMiddleware": "instrumentation",
+    "CORSMiddleware": "cors",
+    "CompressionMiddleware": "compression",
+}
+
+
+def variants(app) -> dict:
+    """ASGI callables for the app with no middleware, each layer alone and the whole stack"""
+    configured = list(app.user_middleware)
+    stacks = {"none": []}
+    stacks.update({LAYERS[middleware.cls.__name__]: [middleware] for middleware in configured})
+    stacks["stack"] = configured
+    built = {}
+    try:
+        for name, middleware in stacks.items():
+            app.user_middleware = middleware
+            built[name] = app.build_middleware_stack()
+    finally:
+        app.user_middleware = configured
+    return built
+
+
+async def call(asgi, path: str, query: str, headers) -> tuple:
+    """One GET through ``asgi``; returns the status and the body size"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+        "headers": headers, "client": ("127.0.0.1", 0), "server": ("bench", 80),
+    }
+    status, size = None, 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status, size
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+
+    await asgi(scope, receive, send)
+    return status, size
+
+
+def summarize_us(samples) -> dict:
+    micros = [sample * 1000 for sample in samples]
+    return {"count": len(samples), "p50_us": percentile(micros, 50), "p99_us": percentile(micros, 99)}
+
+
+async def run(requests: int) -> list:
+    from app.auth import create_access_token
+    from app.main import app
+
+    token = create_access_token({"sub": "manager@bench.local"}, timedelta(hours=1))
+    headers = [
+        (b"host", b"bench"),
+        (b"authorization", f"Bearer {token}".encode()),
+        (b"origin", b"http://localhost:5173"),
+        (b"accept-encoding", b"gzip, deflate, br"),
+    ]
+    stacks = variants(app)
+    results = []
+    for path, query in PATHS:
+        samples = {name: [] for name in stacks}
+        sizes = {}
+        for round_ in range(requests + 20):
+            for name, asgi in stacks.items():
+                started = time.perf_counter()
+                status, sizes[name] = await call(asgi, path, query, headers)
+                elapsed = time.perf_counter() - started
+                assert status == 200, (name, path, status)
+                # The first rounds warm up the principal and statement caches
+                if round_ >= 20:
+                    samples[name].append(elapsed)
+        summaries = {name: summarize_us(values) for name, values in samples.items()}
+        results.append({
+            "path": f"{path}?{query}" if query else path,
+            **{
+                name: {**summary, "overhead_us": round(summary["p50_us"] - summaries["none"]["p50_us"], 1), "bytes": sizes[name]}
+                for name, summary in summaries.items()
+            },
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000, help="timed requests per path and variant")
+    parser.add_argument("--feedback-rows", type=int, default=1000)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        # Point the app at a throwaway database before it is imported
+        with tempfile.TemporaryDirectory() as tmp:
+            os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            seed(args.feedback_rows)
+            print(json.dumps(asyncio.run(run(args.requests))))
+        return
+
+    # The slow log stays out of the way so only the always-on cost is measured
+    results = run_child(
+        "bench.middleware", ["--requests", args.requests, "--feedback-rows", args.feedback_rows],
+        {"BCRYPT_ROUNDS": "4", "SLOW_REQUEST_MS": "0"},
+    )
+    for result in results:
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,216 @@
+"""Org hierarchy benchmark.
+
+Seeds a throwaway SQLite database with a synthetic org (50k people over 8
+levels by default) plus feedback_stats counters for everyone. It then builds
+the ``user_closure`` table and checks it, and times the org queries both
+ways: through the closure, and as recursive CTEs over ``users.manager_id``.
+
+* ``rebuild``    - ``org.rebuild_closure`` from scratch, then a drift audit
+* ``subtree``    - everyone under a manager at each level, plus the first
+  ``/users/org`` page
+* ``ancestor``   - "is A above B" for random pairs, checked against the CTE
+* ``org_stats``  - the ``/dashboard/org`` rollup for a manager at each level
+* ``move``       - re-parenting a large subtree with ``crud.set_manager``,
+  then a drift audit
+
+The script asserts that both approaches agree and that the closure has no
+drift after each change, so it doubles as a consistency check. Run it from the
+backend directory:
+
+    python -m bench.org --people 50000 --levels 8
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app import crud, models, org
+
+INSERT_CHUNK = 10_000
+SAMPLES = 200
+
+SUBTREE_CTE = text("""
+    WITH RECURSIVE sub(id, depth) AS (
+        SELECT id, 0 FROM users WHERE id = :root
+        UNION ALL
+        SELECT users.id, sub.depth + 1 FROM users JOIN sub ON users.manager_id = sub.id
+    )
+    SELECT count(*) FROM sub WHERE depth >= 1
+""")
+
+ANCESTOR_CTE = text("""
+    WITH RECURSIVE up(id) AS (
+        SELECT manager_id FROM users WHERE id = :descendant
+        UNION ALL
+        SELECT users.manager_id FROM users JOIN up ON users.id = up.id WHERE users.manager_id IS NOT NULL
+    )
+    SELECT 1 FROM up WHERE id = :ancestor LIMIT 1
+""")
+
+ORG_STATS_CTE = text("""
+    WITH RECURSIVE sub(id) AS (
+        SELECT id FROM users WHERE manager_id = :root
+        UNION ALL
+        SELECT users.id FROM users JOIN sub ON users.manager_id = sub.id
+    )
+    SELECT count(*), coalesce(sum(feedback_stats.total_feedback), 0)
+    FROM sub LEFT JOIN feedback_stats
+      ON feedback_stats.user_id = sub.id AND feedback_stats.role_side = 'EMPLOYEE'
+""")
+
+
+def level_sizes(people: int, levels: int) -> list:
+    """Split ``people`` into ``levels`` levels with a constant fan-out and a partial last level"""
+    fanout = 1.0
+    while sum(round(fanout ** level) for level in range(levels)) < people:
+        fanout += 0.01
+    sizes = [max(1, round(fanout ** level)) for level in range(levels - 1)]
+    sizes.append(people - sum(sizes))
+    return sizes
+
+
+def seed(engine, people: int, levels: int) -> list:
+    """Insert the org and its counters; returns the user ids of each level"""
+    Base.metadata.create_all(engine)
+    rng = random.Random(14)
+    by_level = []
+    next_id = 1
+    with engine.begin() as conn:
+        for level, size in enumerate(level_sizes(people, levels)):
+            ids = list(range(next_id, next_id + size))
+            next_id += size
+            above = by_level[-1] if by_level else None
+            rows = [{
+                "id": user_id, "name": f"Person {user_id}", "email": f"person{user_id}@bench.local",
+                "password_hash": "x",
+                "role": models.UserRole.MANAGER if level < levels - 1 else models.UserRole.EMPLOYEE,
+                "manager_id": above[i % len(above)] if above else None,
+            } for i, user_id in enumerate(ids)]
+            for offset in range(0, len(rows), INSERT_CHUNK):
+                conn.execute(models.User.__table__.insert(), rows[offset:offset + INSERT_CHUNK])
+            by_level.append(ids)
+        stats = []
+        for user_id in range(1, next_id):
+            positive, neutral, negative = rng.randint(0, 6), rng.randint(0, 3), rng.randint(0, 2)
+            stats.append({
+                "user_id": user_id, "role_side": models.UserRole.EMPLOYEE,
+                "total_feedback": positive + neutral + negative, "positive_feedback": positive,
+                "neutral_feedback": neutral, "negative_feedback": negative,
+                "unacknowledged_feedback": rng.randint(0, positive + neutral + negative),
+            })
+        for offset in range(0, len(stats), INSERT_CHUNK):
+            conn.execute(models.FeedbackStats.__table__.insert(), stats[offset:offset + INSERT_CHUNK])
+    return by_level
+
+
+def timed(fn, *args, **kwargs):
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, round((time.perf_counter() - started) * 1000, 2)
+
+
+def assert_no_drift(db):
+    drift, ms = timed(org.closure_drift, db)
+    assert drift == {"missing": 0, "unexpected": 0}, drift
+    return ms
+
+
+def run(database_url: str, people: int, levels: int) -> list:
+    engine = create_engine(database_url)
+    by_level = seed(engine, people, levels)
+    db = sessionmaker(bind=engine)()
+    rng = random.Random(7)
+    results = []
+
+    depth, ms = timed(org.rebuild_closure, db)
+    db.commit()
+    rows = db.execute(select(func.count()).select_from(org.closure)).scalar()
+    results.append({
+        "case": "rebuild", "people": people, "levels": [len(ids) for ids in by_level],
+        "closure_rows": rows, "depth": depth, "ms": ms, "audit_ms": assert_no_drift(db),
+    })
+
+    for level, ids in enumerate(by_level[:-1]):
+        manager_id = ids[0]
+        closure_count, closure_ms = timed(lambda: db.execute(
+            select(func.count()).where(org.closure.c.ancestor_id == manager_id, org.closure.c.depth >= 1)
+        ).scalar())
+        cte_count, cte_ms = timed(lambda: db.execute(SUBTREE_CTE, {"root": manager_id}).scalar())
+        assert closure_count == cte_count, (manager_id, closure_count, cte_count)
+        (page, _), page_ms = timed(crud.get_org_members, db, manager_id, limit=100)
+        results.append({
+            "case": "subtree", "level": level, "reports": closure_count,
+            "closure_ms": closure_ms, "cte_ms": cte_ms, "first_page_ms": page_ms, "page_size": len(page),
+        })
+
+    everyone = [user_id for ids in by_level for user_id in ids]
+    pairs = [(rng.choice(by_level[rng.randrange(levels - 1)]), rng.choice(everyone)) for _ in range(SAMPLES)]
+    closure_answers, closure_ms = timed(lambda: [org.is_ancestor(db, a, b) for a, b in pairs])
+    cte_answers, cte_ms = timed(lambda: [
+        db.execute(ANCESTOR_CTE, {"ancestor": a, "descendant": b}).first() is not None for a, b in pairs
+    ])
+    assert closure_answers == cte_answers
+    results.append({
+        "case": "ancestor", "pairs": SAMPLES, "true": sum(closure_answers),
+        "closure_ms_per_check": round(closure_ms / SAMPLES, 3), "cte_ms_per_check": round(cte_ms / SAMPLES, 3),
+    })
+
+    for level, ids in enumerate(by_level[:-1]):
+        manager_id = ids[0]
+        stats, closure_ms = timed(crud.get_org_stats, db, manager_id)
+        (org_size, total), cte_ms = timed(lambda: tuple(db.execute(ORG_STATS_CTE, {"root": manager_id}).one()))
+        assert (stats["org_size"], stats["total_feedback"]) == (org_size, total), (stats, org_size, total)
+        results.append({
+            "case": "org_stats", "level": level, "org_size": org_size, "direct_reports": len(stats["direct_reports"]),
+            "closure_ms": closure_ms, "cte_ms": cte_ms,
+        })
+
+    # Move the largest level-2 subtree under another level-1 manager, then back
+    if levels > 3:
+        mover = by_level[2][0]
+        old_manager = db.get(models.User, mover).manager_id
+        new_manager = next(user_id for user_id in by_level[1] if user_id != old_manager)
+        subtree = db.execute(
+            select(func.count()).where(org.closure.c.ancestor_id == mover)
+        ).scalar()
+        for target in (new_manager, old_manager):
+            _, ms = timed(crud.set_manager, db, mover, target)
+            results.append({
+                "case": "move", "subtree": subtree, "new_manager": target, "ms": ms, "audit_ms": assert_no_drift(db),
+            })
+        deepest_report = db.execute(
+            select(org.closure.c.descendant_id)
+            .where(org.closure.c.ancestor_id == by_level[1][0])
+            .order_by(org.closure.c.depth.desc())
+            .limit(1)
+        ).scalar()
+        try:
+            crud.set_manager(db, by_level[1][0], deepest_report)
+        except ValueError:
+            db.rollback()
+        else:
+            raise AssertionError("moving a manager under their own report should fail")
+
+    db.close()
+    engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--people", type=int, default=50_000)
+    parser.add_argument("--levels", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for result in run(f"sqlite:///{os.path.join(tmp, 'bench.db')}", args.people, args.levels):
+            print(json.dumps(result))
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
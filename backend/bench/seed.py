@@ -0,0 +1,238 @@
+"""Synthetic data generator.
+
+Migrates an empty database, bulk-inserts a reproducible org and its
+feedback history with Core ``executemany`` inserts, then builds the derived
+tables (org closure, dashboard counters, trend rollups and the search index)
+the same way the app's maintenance commands do. The same ``--seed`` always produces the same
+database, so benchmark runs can be compared against each other.
+
+Each of the ``--orgs`` directors leads ``--managers`` managers, and each
+manager leads ``--team-size`` employees. Feedback is spread evenly over the
+last ``--days`` days up to a fixed date and goes from a person's manager to
+them, with some people receiving much more than others:
+
+* sentiment is roughly 55% positive, 30% neutral and 15% negative
+* 0-3 tags each, drawn from a small vocabulary where a few tags dominate
+* most feedback older than two weeks is acknowledged, some of it with a
+  comment; about 5% is anonymous
+
+Everyone's password is ``password``, hashed once with the app's bcrypt
+settings. Without ``BCRYPT_ROUNDS`` in the environment this uses 4 rounds,
+as the benchmarks do; the app upgrades weaker hashes at login.
+
+Also used by ``bench.load``. To build a local development database instead
+of the hand-made ``feedback_tool.db``, or a large one to load test against,
+run from the backend directory:
+
+    python -m bench.seed --database-url sqlite:///./bench.db --orgs 10 --managers 20 --team-size 8 --feedback 1000000
+"""
+import argparse
+import json
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+INSERT_CHUNK = 10_000
+END = datetime(2025, 1, 1)
+SENTIMENT_WEIGHTS = {"positive": 55, "neutral": 30, "negative": 15}
+TAG_COUNT_WEIGHTS = [30, 40, 20, 10]
+TAGS = [
+    "communication", "delivery", "ownership", "collaboration", "code-quality", "mentoring",
+    "planning", "initiative", "reliability", "customer-focus", "documentation", "testing",
+    "design", "leadership", "estimation", "on-call", "hiring", "security", "performance", "accessibility",
+]
+STRENGTHS = [
+    "Consistently ships well-tested changes",
+    "Keeps stakeholders informed without being asked",
+    "Unblocked the team during the release crunch",
+    "Writes clear design documents that others build on",
+    "Takes ownership of incidents through to the follow-ups",
+    "Gives thoughtful, kind code reviews",
+    "Onboarded two new hires and made them productive quickly",
+    "Breaks large projects into milestones that actually land",
+]
+AREAS = [
+    "Share context earlier in design reviews",
+    "Delegate more instead of picking up every ticket",
+    "Push back on scope when deadlines are unrealistic",
+    "Write down decisions so the team can find them later",
+    "Ask for help sooner when blocked",
+    "Spend more time on test coverage for edge cases",
+    "Speak up more in planning meetings",
+]
+COMMENTS = [
+    "Thanks, agreed on the design reviews",
+    "Fair point, I'll work on it this quarter",
+    "Appreciate the feedback",
+    "Could we talk about this in our next 1:1?",
+]
+
+
+def org_rows(orgs: int, managers: int, team_size: int, password_hash: str):
+    """Users for the org, as rows for ``users.insert()``: directors, then managers, then employees"""
+    from app import models
+
+    rows = []
+
+    def person(role, manager_id, label):
+        user_id = len(rows) + 1
+        rows.append({
+            "id": user_id, "name": f"{label.title()} {user_id}", "email": f"{label}{user_id}@bench.local",
+            "password_hash": password_hash, "role": role, "manager_id": manager_id,
+        })
+        return user_id
+
+    directors = [person(models.UserRole.MANAGER, None, "director") for _ in range(orgs)]
+    leads = [person(models.UserRole.MANAGER, director, "manager") for director in directors for _ in range(managers)]
+    for lead in leads:
+        for _ in range(team_size):
+            person(models.UserRole.EMPLOYEE, lead, "employee")
+    return rows
+
+
+def feedback_rows(rng: random.Random, users, count: int, days: int):
+    """Yield chunks of (feedback rows, feedback_tags rows), oldest first"""
+    from app import models
+
+    recipients = [user for user in users if user["manager_id"] is not None]
+    # Some people get much more feedback than others
+    activity = [rng.lognormvariate(0, 0.75) for _ in recipients]
+    sentiments = [models.FeedbackSentiment(value) for value in SENTIMENT_WEIGHTS]
+    sentiment_weights = list(SENTIMENT_WEIGHTS.values())
+    # Zipf-like: the first tags in the vocabulary are used far more than the rest
+    tag_ids = list(range(1, len(TAGS) + 1))
+    tag_weights = [1 / rank for rank in tag_ids]
+    span = timedelta(days=days)
+    start = END - span
+
+    for offset in range(0, count, INSERT_CHUNK):
+        size = min(INSERT_CHUNK, count - offset)
+        chosen = rng.choices(recipients, weights=activity, k=size)
+        chosen_sentiments = rng.choices(sentiments, weights=sentiment_weights, k=size)
+        rows, tag_rows = [], []
+        for i, (recipient, sentiment) in enumerate(zip(chosen, chosen_sentiments), start=offset):
+            feedback_id = i + 1
+            created_at = start + span * ((i + rng.random()) / count)
+            age_days = (END - created_at).days
+            acknowledged = rng.random() < (0.85 if age_days > 14 else 0.4)
+            acknowledged_at = min(END, created_at + timedelta(hours=rng.expovariate(1 / 30))) if acknowledged else None
+            rows.append({
+                "id": feedback_id,
+                "employee_id": recipient["id"],
+                "manager_id": recipient["manager_id"],
+                "strengths": rng.choice(STRENGTHS),
+                "areas_to_improve": rng.choice(AREAS),
+                "sentiment": sentiment,
+                "created_at": created_at,
+                "updated_at": created_at + timedelta(minutes=rng.randint(1, 600)) if rng.random() < 0.08 else None,
+                "acknowledged": acknowledged,
+                "acknowledged_at": acknowledged_at,
+                "employee_comment": rng.choice(COMMENTS) if acknowledged and rng.random() < 0.3 else None,
+                "is_anonymous": rng.random() < 0.05,
+            })
+            tags = set()
+            wanted = rng.choices(range(len(TAG_COUNT_WEIGHTS)), weights=TAG_COUNT_WEIGHTS)[0]
+            while len(tags) < wanted:
+                tags.add(rng.choices(tag_ids, weights=tag_weights)[0])
+            tag_rows.extend({"feedback_id": feedback_id, "tag_id": tag_id} for tag_id in sorted(tags))
+        yield rows, tag_rows
+
+
+def timed(timings: dict, name: str, fn, *args, **kwargs):
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    timings[name] = round(time.perf_counter() - started, 2)
+    return result
+
+
+def seed(engine, orgs: int = 1, managers: int = 5, team_size: int = 8, feedback: int = 10_000,
+         days: int = 365, seed: int = 42) -> dict:
+    """Fill an empty database and build its derived tables; returns row counts and seconds per phase"""
+    from sqlalchemy import func, select
+    from sqlalchemy.orm import Session
+
+    from app import models, org, rollups
+    from app.auth import get_password_hash
+    from app.schema import upgrade
+    from app.search import rebuild_search_index
+    from app.stats import reconcile_feedback_stats
+
+    upgrade(engine)
+    with engine.connect() as conn:
+        if conn.execute(select(func.count()).select_from(models.User.__table__)).scalar():
+            raise ValueError(f"{engine.url!r} already has users; seed an empty database")
+
+    rng = random.Random(seed)
+    timings = {}
+    users = org_rows(orgs, managers, team_size, get_password_hash("password"))
+    tag_links = 0
+
+    def insert_users():
+        with engine.begin() as conn:
+            for offset in range(0, len(users), INSERT_CHUNK):
+                conn.execute(models.User.__table__.insert(), users[offset:offset + INSERT_CHUNK])
+            conn.execute(models.Tag.__table__.insert(), [{"id": i + 1, "name": name} for i, name in enumerate(TAGS)])
+
+    def insert_feedback():
+        nonlocal tag_links
+        # One transaction per chunk keeps the SQLite journal small at millions of rows
+        for rows, tag_rows in feedback_rows(rng, users, feedback, days):
+            with engine.begin() as conn:
+                conn.execute(models.Feedback.__table__.insert(), rows)
+                if tag_rows:
+                    conn.execute(models.feedback_tags.insert(), tag_rows)
+            tag_links += len(tag_rows)
+
+    def derive(fn, *args, **kwargs):
+        db = Session(bind=engine)
+        try:
+            fn(db, *args, **kwargs)
+            db.commit()
+        finally:
+            db.close()
+
+    timed(timings, "users", insert_users)
+    timed(timings, "feedback", insert_feedback)
+    timed(timings, "closure", derive, org.rebuild_closure)
+    timed(timings, "stats", derive, reconcile_feedback_stats, fix=True)
+    timed(timings, "rollups", derive, rollups.rebuild_rollups)
+    timed(timings, "search", derive, rebuild_search_index)
+    return {
+        "seed": seed,
+        "users": len(users),
+        "managers": orgs * (managers + 1),
+        "feedback": feedback,
+        "feedback_tags": tag_links,
+        "seconds": timings,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", required=True, help="an empty database; it is migrated first")
+    parser.add_argument("--orgs", type=int, default=1, help="directors, each with their own managers")
+    parser.add_argument("--managers", type=int, default=5, help="managers per director")
+    parser.add_argument("--team-size", type=int, default=8, help="employees per manager")
+    parser.add_argument("--feedback", type=int, default=10_000, help="feedback rows in total")
+    parser.add_argument("--days", type=int, default=365, help="how far back feedback goes")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    # Set before the app reads its settings on import
+    os.environ.setdefault("BCRYPT_ROUNDS", "4")
+    from sqlalchemy import create_engine
+
+    engine = create_engine(args.database_url)
+    try:
+        result = seed(
+            engine, orgs=args.orgs, managers=args.managers, team_size=args.team_size,
+            feedback=args.feedback, days=args.days, seed=args.seed,
+        )
+    except ValueError as exc:
+        parser.error(str(exc))
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
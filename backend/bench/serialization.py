@@ -0,0 +1,151 @@
+"""Feedback list serialization benchmark.
+
+Seeds a throwaway SQLite database with a director, a manager, a team and N
+feedback rows (tags, comments and acknowledgements included), then builds
+the manager's feedback page of N items both ways the API has:
+
+* ``orm``  - ``crud.get_feedback_page``: ORM entities with their user graph,
+  validated into ``FeedbackPage`` and encoded with ``json.dumps``, as
+  FastAPI does for a ``response_model``
+* ``rows`` - ``crud.get_feedback_page_rows``: flat rows shaped into dicts and
+  encoded with orjson, as the list endpoints now do
+
+Both must produce the same JSON. Each is split into its ``fetch`` stage
+(query plus objects or dicts) and its ``serialize`` stage (validation plus
+encoding), reported as milliseconds per 1k items.
+
+Run from the backend directory:
+
+    python -m bench.serialization --items 1000 10000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import orjson
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, models, org, schemas
+from app.database import Base
+from app.responses import ORJSON_OPTIONS
+from bench.common import summarize
+
+TEAM_SIZE = 20
+INSERT_CHUNK = 10_000
+REPEATS = 20
+TAGS = ["communication", "delivery", "mentoring", "ownership"]
+
+page_adapter = TypeAdapter(schemas.FeedbackPage)
+
+
+def seed(engine, rows: int) -> None:
+    Base.metadata.create_all(engine)
+    sentiments = list(models.FeedbackSentiment)
+    start = datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(models.User.__table__.insert(), [{
+            "id": 1, "name": "Bench Director", "email": "director@bench.local", "password_hash": "x",
+            "role": models.UserRole.MANAGER,
+        }, {
+            "id": 2, "name": "Bench Manager", "email": "manager@bench.local", "password_hash": "x",
+            "role": models.UserRole.MANAGER, "manager_id": 1,
+        }] + [{
+            "id": 3 + i, "name": f"Employee {i}", "email": f"employee{i}@bench.local", "password_hash": "x",
+            "role": models.UserRole.EMPLOYEE, "manager_id": 2,
+        } for i in range(TEAM_SIZE)])
+        conn.execute(models.Tag.__table__.insert(), [{"id": i + 1, "name": name} for i, name in enumerate(TAGS)])
+        for offset in range(0, rows, INSERT_CHUNK):
+            ids = range(offset + 1, min(offset + INSERT_CHUNK, rows) + 1)
+            conn.execute(models.Feedback.__table__.insert(), [{
+                "id": i, "employee_id": 3 + i % TEAM_SIZE, "manager_id": 2,
+                "strengths": "Consistently ships well-tested changes, with clear write-ups",
+                "areas_to_improve": "Share context earlier in design reviews",
+                "sentiment": sentiments[i % len(sentiments)],
+                "created_at": start + timedelta(seconds=i),
+                "updated_at": start + timedelta(seconds=i, minutes=5) if i % 4 == 0 else None,
+                "acknowledged": i % 2 == 0,
+                "acknowledged_at": start + timedelta(seconds=i, hours=1) if i % 2 == 0 else None,
+                "employee_comment": "Thanks, agreed on the design reviews" if i % 3 == 0 else None,
+                "is_anonymous": i % 5 == 0,
+            } for i in ids])
+            conn.execute(models.feedback_tags.insert(), [
+                {"feedback_id": i, "tag_id": tag_id} for i in ids for tag_id in (1 + i % 4, 1 + (i + 1) % 4)
+            ])
+
+
+def orm_page(db, size: int):
+    items, next_cursor = crud.get_feedback_page(db, manager_id=2, limit=size)
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def orm_serialize(page) -> bytes:
+    # What FastAPI does for a response_model, then JSONResponse.render
+    content = page_adapter.dump_python(page_adapter.validate_python(page), mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def rows_page(db, size: int):
+    items, next_cursor = crud.get_feedback_page_rows(db, manager_id=2, limit=size)
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def rows_serialize(page) -> bytes:
+    return orjson.dumps(page, option=ORJSON_OPTIONS)
+
+
+def per_1k(samples, size: int):
+    return summarize([sample * 1000 / size for sample in samples])
+
+
+def timed(db, size: int, fetch, serialize) -> dict:
+    fetch_samples, serialize_samples, body = [], [], b""
+    for _ in range(REPEATS):
+        # A fresh session each round, so the ORM path pays for building its entities
+        db.expunge_all()
+        started = time.perf_counter()
+        page = fetch(db, size)
+        fetched = time.perf_counter()
+        body = serialize(page)
+        fetch_samples.append(fetched - started)
+        serialize_samples.append(time.perf_counter() - fetched)
+    total = [a + b for a, b in zip(fetch_samples, serialize_samples)]
+    return {
+        "bytes": len(body),
+        "fetch_per_1k": per_1k(fetch_samples, size),
+        "serialize_per_1k": per_1k(serialize_samples, size),
+        "total_per_1k": per_1k(total, size),
+        "_body": body,
+    }
+
+
+def run(database_url: str, size: int) -> dict:
+    engine = create_engine(database_url)
+    seed(engine, size)
+    db = sessionmaker(bind=engine)()
+    org.rebuild_closure(db)
+    db.commit()
+
+    orm = timed(db, size, orm_page, orm_serialize)
+    rows = timed(db, size, rows_page, rows_serialize)
+    assert json.loads(orm.pop("_body")) == json.loads(rows.pop("_body")), "orm and rows pages differ"
+    db.close()
+    engine.dispose()
+    return {"items": size, "orm": orm, "rows": rows}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, nargs="+", default=[1000, 10_000])
+    args = parser.parse_args()
+
+    for size in args.items:
+        with tempfile.TemporaryDirectory() as tmp:
+            print(json.dumps(run(f"sqlite:///{os.path.join(tmp, 'bench.db')}", size)))
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
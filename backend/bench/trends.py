@@ -0,0 +1,129 @@
+"""Trend rollup benchmark.
+
+Seeds a throwaway SQLite database with one manager, a team and N feedback
+rows spread over two years, rebuilds the rollups from that history, then
+times a year of weekly trends for the manager two ways:
+
+* ``rollups``   - ``crud.get_feedback_trends``, reading feedback_rollups
+* ``aggregate`` - a grouped aggregate over the feedback rows themselves
+
+Both must return the same counts. For each size it reports the rebuild time,
+the rollup row count and the median of each query.
+
+Run from the backend directory:
+
+    python -m bench.trends --sizes 10000 100000 1000000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app import crud, models, org, rollups
+from bench.common import summarize
+
+TEAM_SIZE = 20
+INSERT_CHUNK = 10_000
+HISTORY_DAYS = 730
+REPEATS = 20
+
+
+def seed(engine, rows: int) -> None:
+    Base.metadata.create_all(engine)
+    sentiments = list(models.FeedbackSentiment)
+    start = datetime(2024, 1, 1)
+    spacing = HISTORY_DAYS * 86400 / rows
+    with engine.begin() as conn:
+        conn.execute(models.User.__table__.insert(), [{
+            "id": 1, "name": "Bench Manager", "email": "manager@bench.local", "password_hash": "x",
+            "role": models.UserRole.MANAGER,
+        }] + [{
+            "id": 2 + i, "name": f"Employee {i}", "email": f"employee{i}@bench.local", "password_hash": "x",
+            "role": models.UserRole.EMPLOYEE, "manager_id": 1,
+        } for i in range(TEAM_SIZE)])
+        for offset in range(0, rows, INSERT_CHUNK):
+            conn.execute(models.Feedback.__table__.insert(), [{
+                "id": i + 1, "employee_id": 2 + i % TEAM_SIZE, "manager_id": 1,
+                "strengths": "Consistently ships well-tested changes",
+                "areas_to_improve": "Share context earlier in design reviews",
+                "sentiment": sentiments[i * 7 % len(sentiments)],
+                "created_at": start + timedelta(seconds=int(i * spacing)),
+                "acknowledged": False, "is_anonymous": False,
+            } for i in range(offset, min(offset + INSERT_CHUNK, rows))])
+
+
+def aggregate_trends(db, start: date, end: date) -> dict:
+    """Weekly counts straight from the feedback table: a day-level GROUP BY folded into weeks"""
+    feedback = models.Feedback
+    day = func.date(feedback.created_at)
+    counts = {}
+    for bucket_day, sentiment, count in (
+        db.query(day, feedback.sentiment, func.count(feedback.id))
+        .filter(
+            feedback.manager_id == 1,
+            feedback.created_at >= datetime.combine(start, datetime.min.time()),
+            feedback.created_at < datetime.combine(end + timedelta(days=1), datetime.min.time()),
+        )
+        .group_by(day, feedback.sentiment)
+    ):
+        key = (crud.rollup_bucket(date.fromisoformat(bucket_day), "week"), sentiment)
+        counts[key] = counts.get(key, 0) + count
+    return counts
+
+
+def timed_runs(fn):
+    samples, result = [], None
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - started)
+    return result, summarize(samples)
+
+
+def run(database_url: str, size: int) -> dict:
+    engine = create_engine(database_url)
+    seed(engine, size)
+    db = sessionmaker(bind=engine)()
+    org.rebuild_closure(db)
+    started = time.perf_counter()
+    rollup_rows = rollups.rebuild_rollups(db)
+    db.commit()
+    rebuild_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    # The last full year of history, starting on a Monday
+    start, end = date(2024, 12, 30), date(2025, 12, 28)
+    buckets, rollup_timing = timed_runs(lambda: crud.get_feedback_trends(db, "week", start, end, manager_id=1))
+    counts, aggregate_timing = timed_runs(lambda: aggregate_trends(db, start, end))
+    for entry in buckets:
+        for sentiment in models.FeedbackSentiment:
+            expected = counts.get((entry["bucket"], sentiment), 0)
+            assert entry[f"{sentiment.value}_feedback"] == expected, (entry, sentiment, expected)
+    db.close()
+    engine.dispose()
+    return {
+        "rows": size,
+        "rollup_rows": rollup_rows,
+        "rebuild_ms": rebuild_ms,
+        "buckets": len(buckets),
+        "rollups": rollup_timing,
+        "aggregate": aggregate_timing,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            print(json.dumps(run(f"sqlite:///{os.path.join(tmp, 'bench.db')}", size)))
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
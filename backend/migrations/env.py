@@ -0,0 +1,61 @@
+"""Alembic environment for the app's database.
+
+The URL comes from ``DATABASE_URL`` through ``app.database``. ``app.schema``
+runs migrations in-process by passing its own connection in
+``config.attributes["connection"]``; the app's logging is left alone then.
+"""
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
+
+from app import models  # noqa: F401 - registers the tables on Base.metadata
+from app.database import Base, SQLALCHEMY_DATABASE_URL
+
+config = context.config
+if config.config_file_name is not None and config.attributes.get("configure_logging", True):
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+# Created with raw DDL by app.search rather than declared on the models, so
+# autogenerate must not offer to drop them
+SEARCH_TABLES = ("feedback_fts", "feedback_search")
+
+def include_object(obj, name, type_, reflected, compare_to):
+    if type_ == "table" and name.startswith(SEARCH_TABLES):
+        return False
+    return True
+
+def configure(**kwargs) -> None:
+    context.configure(
+        target_metadata=target_metadata,
+        include_object=include_object,
+        # SQLite can't ALTER most things; batch mode recreates the table instead
+        render_as_batch=True,
+        **kwargs,
+    )
+
+def run_migrations_offline() -> None:
+    configure(url=SQLALCHEMY_DATABASE_URL, literal_binds=True, dialect_opts={"paramstyle": "named"})
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online() -> None:
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        configure(connection=connection)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+    engine = create_engine(SQLALCHEMY_DATABASE_URL, poolclass=NullPool)
+    with engine.connect() as connection:
+        configure(connection=connection)
+        with context.begin_transaction():
+            context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
\ No newline at end of file
@@ -0,0 +1,410 @@
+"""Baseline schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2025-01-06 09:00:00.000000
+
+The tables in ``app/models.py`` before migrations, without the indexes added
+in 0002. Databases made by the old import-time ``create_all`` may already
+have some or all of them, so only missing tables are created. The derived
+data (tags moved out of the legacy ``feedback.tags`` column, the org closure,
+counters, trend rollups and the search index) is then backfilled where it is
+empty; each is a quick check when there is nothing to fill in. Enum columns
+holding lowercase values, which the models can't read, are rewritten first.
+
+The backfills are frozen copies of the app's maintenance commands, written
+against the table definitions below rather than ``app`` code, so later model
+changes can't break upgrading an old database from scratch.
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+USER_ROLES = ("MANAGER", "EMPLOYEE")
+SENTIMENTS = ("POSITIVE", "NEUTRAL", "NEGATIVE")
+
+
+def enum(name: str, values, existing: bool = False):
+    """An Enum column type; ``existing`` reuses the PostgreSQL type an earlier table created"""
+    type_ = sa.Enum(*values, name=name)
+    if existing:
+        type_ = type_.with_variant(postgresql.ENUM(*values, name=name, create_type=False), "postgresql")
+    return type_
+
+
+def create_users() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=100), nullable=False),
+        sa.Column("email", sa.String(length=100), nullable=False),
+        sa.Column("password_hash", sa.String(length=100), nullable=False),
+        sa.Column("role", enum("userrole", USER_ROLES), nullable=False),
+        sa.Column("manager_id", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(["manager_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+
+def create_tags() -> None:
+    op.create_table(
+        "tags",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=50), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_tags_id", "tags", ["id"])
+    op.create_index("ix_tags_name", "tags", ["name"], unique=True)
+
+
+def create_feedback() -> None:
+    op.create_table(
+        "feedback",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("employee_id", sa.Integer(), nullable=False),
+        sa.Column("manager_id", sa.Integer(), nullable=False),
+        sa.Column("strengths", sa.Text(), nullable=False),
+        sa.Column("areas_to_improve", sa.Text(), nullable=False),
+        sa.Column("sentiment", enum("feedbacksentiment", SENTIMENTS), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("acknowledged", sa.Boolean(), nullable=True),
+        sa.Column("acknowledged_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("is_anonymous", sa.Boolean(), nullable=True),
+        sa.Column("employee_comment", sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(["employee_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(["manager_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_feedback_id", "feedback", ["id"])
+
+
+def create_feedback_tags() -> None:
+    op.create_table(
+        "feedback_tags",
+        sa.Column("feedback_id", sa.Integer(), nullable=False),
+        sa.Column("tag_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["feedback_id"], ["feedback.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["tag_id"], ["tags.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("feedback_id", "tag_id"),
+    )
+    op.create_index("ix_feedback_tags_tag_feedback", "feedback_tags", ["tag_id", "feedback_id"])
+
+
+def create_user_closure() -> None:
+    op.create_table(
+        "user_closure",
+        sa.Column("ancestor_id", sa.Integer(), nullable=False),
+        sa.Column("descendant_id", sa.Integer(), nullable=False),
+        sa.Column("depth", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["ancestor_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["descendant_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("ancestor_id", "descendant_id"),
+    )
+    op.create_index("ix_user_closure_ancestor_depth", "user_closure", ["ancestor_id", "depth", "descendant_id"])
+    op.create_index("ix_user_closure_descendant_depth", "user_closure", ["descendant_id", "depth"])
+
+
+def create_feedback_stats() -> None:
+    op.create_table(
+        "feedback_stats",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("role_side", enum("userrole", USER_ROLES, existing=True), nullable=False),
+        sa.Column("total_feedback", sa.Integer(), nullable=False),
+        sa.Column("positive_feedback", sa.Integer(), nullable=False),
+        sa.Column("neutral_feedback", sa.Integer(), nullable=False),
+        sa.Column("negative_feedback", sa.Integer(), nullable=False),
+        sa.Column("unacknowledged_feedback", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("user_id", "role_side"),
+    )
+
+
+def create_feedback_rollups() -> None:
+    op.create_table(
+        "feedback_rollups",
+        sa.Column("granularity", sa.String(length=8), nullable=False),
+        sa.Column("manager_id", sa.Integer(), nullable=False),
+        sa.Column("bucket", sa.Date(), nullable=False),
+        sa.Column("employee_id", sa.Integer(), nullable=False),
+        sa.Column("sentiment", enum("feedbacksentiment", SENTIMENTS, existing=True), nullable=False),
+        sa.Column("feedback_count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["employee_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(["manager_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("granularity", "manager_id", "bucket", "employee_id", "sentiment"),
+    )
+    op.create_index("ix_feedback_rollups_employee", "feedback_rollups", ["granularity", "employee_id", "bucket"])
+
+
+def create_cache_versions() -> None:
+    op.create_table(
+        "cache_versions",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+
+
+# In dependency order
+TABLES = {
+    "users": create_users,
+    "tags": create_tags,
+    "feedback": create_feedback,
+    "feedback_tags": create_feedback_tags,
+    "user_closure": create_user_closure,
+    "feedback_stats": create_feedback_stats,
+    "feedback_rollups": create_feedback_rollups,
+    "cache_versions": create_cache_versions,
+}
+
+
+def normalize_enums() -> None:
+    """Rows written outside the ORM may hold an enum's value ("positive") instead of its name"""
+    for table, column, names in (("users", "role", USER_ROLES), ("feedback", "sentiment", SENTIMENTS)):
+        for name in names:
+            op.execute(
+                sa.text(f"UPDATE {table} SET {column} = :name WHERE {column} = :value")
+                .bindparams(name=name, value=name.lower())
+            )
+
+
+# The columns the backfills touch, as of this revision
+users = sa.table("users", sa.column("id"), sa.column("manager_id"))
+feedback = sa.table(
+    "feedback",
+    sa.column("id"),
+    sa.column("employee_id"),
+    sa.column("manager_id"),
+    sa.column("sentiment"),
+    sa.column("acknowledged", sa.Boolean),
+    sa.column("created_at"),
+)
+legacy_feedback = sa.table("feedback", sa.column("id"), sa.column("tags"))
+tags = sa.table("tags", sa.column("id"), sa.column("name"))
+feedback_tags = sa.table("feedback_tags", sa.column("feedback_id"), sa.column("tag_id"))
+user_closure = sa.table("user_closure", sa.column("ancestor_id"), sa.column("descendant_id"), sa.column("depth"))
+feedback_stats = sa.table(
+    "feedback_stats",
+    sa.column("user_id"),
+    sa.column("role_side"),
+    sa.column("total_feedback"),
+    sa.column("positive_feedback"),
+    sa.column("neutral_feedback"),
+    sa.column("negative_feedback"),
+    sa.column("unacknowledged_feedback"),
+)
+feedback_rollups = sa.table(
+    "feedback_rollups",
+    sa.column("granularity"),
+    sa.column("manager_id"),
+    sa.column("bucket"),
+    sa.column("employee_id"),
+    sa.column("sentiment"),
+    sa.column("feedback_count"),
+)
+
+# Guards the closure backfill against manager_id cycles
+MAX_ORG_DEPTH = 1000
+
+
+def backfill_legacy_tags(bind, batch_size: int = 500) -> None:
+    """Move comma-joined ``feedback.tags`` strings into tags and feedback_tags, then clear them"""
+    if not any(column["name"] == "tags" for column in sa.inspect(bind).get_columns("feedback")):
+        return
+    pending = legacy_feedback.c.tags.isnot(None) & (legacy_feedback.c.tags != "")
+    while True:
+        rows = bind.execute(
+            sa.select(legacy_feedback.c.id, legacy_feedback.c.tags)
+            .where(pending)
+            .order_by(legacy_feedback.c.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return
+        # Stripped, without blanks or duplicates, in their original order
+        names = {
+            feedback_id: list(dict.fromkeys(name.strip() for name in value.split(",") if name.strip()))
+            for feedback_id, value in rows
+        }
+        wanted = list(dict.fromkeys(name for row_names in names.values() for name in row_names))
+        if wanted:
+            existing = set(bind.execute(sa.select(tags.c.name).where(tags.c.name.in_(wanted))).scalars())
+            missing = [name for name in wanted if name not in existing]
+            if missing:
+                bind.execute(tags.insert(), [{"name": name} for name in missing])
+            tag_ids = dict(bind.execute(sa.select(tags.c.name, tags.c.id).where(tags.c.name.in_(wanted))).all())
+            bind.execute(feedback_tags.insert(), [
+                {"feedback_id": feedback_id, "tag_id": tag_ids[name]}
+                for feedback_id, row_names in names.items() for name in row_names
+            ])
+        bind.execute(
+            legacy_feedback.update()
+            .where(legacy_feedback.c.id.in_([feedback_id for feedback_id, _ in rows]))
+            .values(tags=None)
+        )
+
+
+def backfill_org_closure(bind) -> None:
+    """Build user_closure from users.manager_id one level at a time, if it is empty"""
+    if bind.execute(sa.select(user_closure.c.ancestor_id).limit(1)).first() is not None:
+        return
+    columns = ["ancestor_id", "descendant_id", "depth"]
+    bind.execute(user_closure.insert().from_select(columns, sa.select(users.c.id, users.c.id, sa.literal(0))))
+    level = 0
+    while bind.execute(user_closure.insert().from_select(
+        columns,
+        # Extend every path ending at depth ``level`` by one direct report
+        sa.select(user_closure.c.ancestor_id, users.c.id, user_closure.c.depth + 1)
+        .join(users, users.c.manager_id == user_closure.c.descendant_id)
+        .where(user_closure.c.depth == level),
+    )).rowcount:
+        level += 1
+        if level > MAX_ORG_DEPTH:
+            raise ValueError("users.manager_id contains a cycle")
+
+
+def backfill_feedback_stats(bind) -> None:
+    """Count every user's feedback given and received into the newly created feedback_stats"""
+    def count_where(condition):
+        return sa.func.coalesce(sa.func.sum(sa.case((condition, 1), else_=0)), 0)
+
+    for side, owner in (("MANAGER", feedback.c.manager_id), ("EMPLOYEE", feedback.c.employee_id)):
+        bind.execute(feedback_stats.insert().from_select(
+            [column.name for column in feedback_stats.columns],
+            sa.select(
+                users.c.id,
+                sa.literal(side),
+                sa.func.count(feedback.c.id),
+                count_where(feedback.c.sentiment == "POSITIVE"),
+                count_where(feedback.c.sentiment == "NEUTRAL"),
+                count_where(feedback.c.sentiment == "NEGATIVE"),
+                count_where(feedback.c.id.isnot(None) & feedback.c.acknowledged.isnot(True)),
+            )
+            .select_from(users.outerjoin(feedback, owner == users.c.id))
+            .group_by(users.c.id),
+        ))
+
+
+def backfill_rollups(bind) -> None:
+    """Count feedback per UTC day and per week starting Monday, if the rollups are empty"""
+    if bind.execute(sa.select(feedback_rollups.c.granularity).limit(1)).first() is not None:
+        return
+    if bind.dialect.name == "sqlite":
+        day = sa.func.date(feedback.c.created_at)
+        week = sa.func.date(feedback.c.created_at, "weekday 0", "-6 days")
+    elif bind.dialect.name == "postgresql":
+        utc = sa.func.timezone("UTC", feedback.c.created_at)
+        day = sa.cast(utc, sa.Date)
+        week = sa.cast(sa.func.date_trunc("week", utc), sa.Date)
+    else:
+        return
+    for granularity, bucket in (("day", day), ("week", week)):
+        # Bucket in a subquery so the grouping doesn't repeat its bound parameters
+        rows = (
+            sa.select(feedback.c.manager_id, feedback.c.employee_id, feedback.c.sentiment, bucket.label("bucket"))
+            .where(feedback.c.created_at.isnot(None))
+            .subquery()
+        )
+        bind.execute(feedback_rollups.insert().from_select(
+            [column.name for column in feedback_rollups.columns],
+            sa.select(sa.literal(granularity), rows.c.manager_id, rows.c.bucket, rows.c.employee_id,
+                      rows.c.sentiment, sa.func.count())
+            .group_by(rows.c.manager_id, rows.c.bucket, rows.c.employee_id, rows.c.sentiment),
+        ))
+
+
+# Each document: strengths, areas_to_improve, employee_comment and space-separated tags
+SEARCH_DOCUMENTS = """
+    SELECT f.id,
+           coalesce(f.strengths, '') AS strengths,
+           coalesce(f.areas_to_improve, '') AS areas_to_improve,
+           coalesce(f.employee_comment, '') AS employee_comment,
+           coalesce((SELECT {aggregate} FROM feedback_tags ft JOIN tags t ON t.id = ft.tag_id
+                     WHERE ft.feedback_id = f.id), '') AS tags
+    FROM feedback f
+"""
+
+
+def backfill_search_index(bind) -> None:
+    """Create the full-text index, if missing, and index every feedback item"""
+    if bind.dialect.name == "sqlite":
+        if bind.execute(sa.text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'feedback_fts'")).first():
+            return
+        op.execute(
+            "CREATE VIRTUAL TABLE feedback_fts USING fts5("
+            "strengths, areas_to_improve, employee_comment, tags, "
+            "tokenize = 'porter unicode61')"
+        )
+        op.execute(
+            "INSERT INTO feedback_fts (rowid, strengths, areas_to_improve, employee_comment, tags) "
+            "SELECT id, strengths, areas_to_improve, employee_comment, tags FROM ("
+            + SEARCH_DOCUMENTS.format(aggregate="group_concat(t.name, ' ')") + ")"
+        )
+    elif bind.dialect.name == "postgresql":
+        if bind.execute(sa.text("SELECT to_regclass('feedback_search')")).scalar():
+            return
+        op.execute(
+            "CREATE TABLE feedback_search ("
+            "feedback_id INTEGER PRIMARY KEY REFERENCES feedback (id) ON DELETE CASCADE, "
+            "body TEXT NOT NULL, "
+            "document TSVECTOR NOT NULL)"
+        )
+        op.execute("CREATE INDEX ix_feedback_search_document ON feedback_search USING GIN (document)")
+        op.execute(
+            "INSERT INTO feedback_search (feedback_id, body, document) "
+            "SELECT id, concat_ws(E'\\n', strengths, areas_to_improve, employee_comment, tags), "
+            "setweight(to_tsvector('english', strengths), 'A') || "
+            "setweight(to_tsvector('english', areas_to_improve), 'A') || "
+            "setweight(to_tsvector('english', tags), 'B') || "
+            "setweight(to_tsvector('english', employee_comment), 'C') FROM ("
+            + SEARCH_DOCUMENTS.format(aggregate="string_agg(t.name, ' ')") + ") documents"
+        )
+
+
+def backfill(bind, created) -> None:
+    backfill_legacy_tags(bind)
+    backfill_org_closure(bind)
+    if "feedback_stats" in created:
+        backfill_feedback_stats(bind)
+    backfill_rollups(bind)
+    backfill_search_index(bind)
+
+
+def upgrade() -> None:
+    if context.is_offline_mode():
+        # No database to look at: emit the full schema; the search index and
+        # backfills need a live connection
+        for create in TABLES.values():
+            create()
+        return
+    bind = op.get_bind()
+    existing = set(sa.inspect(bind).get_table_names())
+    created = [name for name in TABLES if name not in existing]
+    for name in created:
+        TABLES[name]()
+    normalize_enums()
+    backfill(bind, created)
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS feedback_fts")
+    op.execute("DROP TABLE IF EXISTS feedback_search")
+    for name in reversed(TABLES):
+        op.drop_table(name)
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        sa.Enum(name="feedbacksentiment").drop(bind, checkfirst=True)
+        sa.Enum(name="userrole").drop(bind, checkfirst=True)
\ No newline at end of file
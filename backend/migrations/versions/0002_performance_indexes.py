@@ -0,0 +1,37 @@
+"""Indexes for the feedback lists and org lookups
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-01-06 09:30:00.000000
+
+Keyset pagination of each side's feedback by (created_at, id), and users by
+manager and by role. Databases created since the models declared some of
+these already have them, hence ``if_not_exists``.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ("ix_feedback_employee_created", "feedback", ["employee_id", "created_at", "id"]),
+    ("ix_feedback_manager_created", "feedback", ["manager_id", "created_at", "id"]),
+    ("ix_users_manager_id", "users", ["manager_id"]),
+    ("ix_users_role", "users", ["role"]),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
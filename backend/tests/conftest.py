@@ -0,0 +1,69 @@
+"""Shared fixtures: one throwaway SQLite database per run, emptied between tests."""
+import os
+import tempfile
+
+# Point the app at a scratch database before anything imports it
+_tmp = tempfile.TemporaryDirectory()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_tmp.name, 'test.db')}")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.database import Base, SessionLocal, engine
+from app.principals import principal_cache
+from app.schema import upgrade
+from app.tokens import revoked_tokens
+
+upgrade(engine)
+
+from app.main import app  # noqa: E402
+
+PASSWORD = "password"
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+@pytest.fixture(autouse=True)
+def clean_database():
+    """Empty every table, and the in-memory caches keyed by them, after each test"""
+    yield
+    with engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(table.delete())
+        connection.execute(text("DELETE FROM feedback_fts"))
+    principal_cache.clear()
+    revoked_tokens.clear()
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+@pytest.fixture
+def register(client):
+    """Register a user through the API; returns the created user as JSON"""
+    def register(name: str, role: str = "employee", manager_id=None) -> dict:
+        response = client.post("/auth/register", json={
+            "name": name, "email": f"{name.lower()}@example.com", "password": PASSWORD,
+            "role": role, "manager_id": manager_id,
+        })
+        assert response.status_code == 200, response.text
+        return response.json()
+    return register
+
+@pytest.fixture
+def auth(client):
+    """Log a user in; returns the Authorization header for them"""
+    def auth(user: dict) -> dict:
+        response = client.post("/auth/login", json={"email": user["email"], "password": PASSWORD})
+        assert response.status_code == 200, response.text
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+    return auth
@@ -0,0 +1,52 @@
+"""The event stream stops serving a token once it expires or is revoked."""
+import asyncio
+from datetime import timedelta
+
+import pytest
+from jose import jwt
+
+from app import events
+from app.auth import create_access_token, token_validity
+from app.tokens import revoked_tokens
+
+@pytest.fixture
+def fast_heartbeat(monkeypatch):
+    monkeypatch.setattr(events, "EVENTS_HEARTBEAT_SECONDS", 0.01)
+
+def read_stream(broker, user_id: int, still_valid, publish_after: int = 0) -> list:
+    """Frames of one stream until it ends; publishes an event to the user after each of the first frames"""
+    async def read():
+        frames = []
+        async for frame in broker.stream(user_id, still_valid=still_valid):
+            frames.append(frame)
+            if len(frames) <= publish_after:
+                broker.publish("feedback.created", frozenset({user_id}), {"id": len(frames)})
+            assert len(frames) < 100, "stream didn't end"
+        return frames
+    return asyncio.run(read())
+
+def test_stream_ends_when_no_longer_valid_while_idle(fast_heartbeat):
+    checks = iter([True, True, False])
+    frames = read_stream(events.broker, 1, lambda: next(checks))
+    assert frames[1:] == [events.HEARTBEAT, events.HEARTBEAT]
+
+def test_stream_ends_when_no_longer_valid_while_busy(fast_heartbeat):
+    checks = iter([True, True, False])
+    frames = read_stream(events.broker, 1, lambda: next(checks), publish_after=10)
+    assert [frame.split(b"\n")[1] for frame in frames[1:]] == [b"event: feedback.created"] * 2
+
+def test_token_validity_follows_expiry_and_revocation():
+    token = create_access_token({"sub": "someone@example.com"}, timedelta(minutes=5), jti="abc")
+    still_valid = token_validity(token)
+    assert still_valid()
+    revoked_tokens.add("abc", jwt.get_unverified_claims(token)["exp"])
+    assert not still_valid()
+    expired = create_access_token({"sub": "someone@example.com"}, timedelta(seconds=-1))
+    assert not token_validity(expired)()
+
+def test_stream_endpoint_closes_when_the_token_expires(client, register, fast_heartbeat):
+    user = register("Employee")
+    token = create_access_token({"sub": user["email"]}, timedelta(seconds=1))
+    response = client.get("/events/stream", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert response.text.startswith("retry:")
@@ -0,0 +1,38 @@
+"""Date filters on the feedback list endpoints."""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+@pytest.fixture
+def manager_headers(client, register, auth):
+    """A manager who has given one report one feedback item just now"""
+    manager = register("Manager", role="manager")
+    employee = register("Employee", manager_id=manager["id"])
+    headers = auth(manager)
+    response = client.post("/feedback/", headers=headers, json={
+        "employee_id": employee["id"], "strengths": "Clear writing",
+        "areas_to_improve": "Estimate earlier", "sentiment": "positive",
+    })
+    assert response.status_code == 200, response.text
+    return headers
+
+def an_hour_ago(tz: timezone) -> str:
+    return (datetime.now(timezone.utc) - timedelta(hours=1)).astimezone(tz).isoformat()
+
+@pytest.mark.parametrize("tz", [timezone.utc, timezone(timedelta(hours=5)), timezone(timedelta(hours=-8))])
+def test_created_range_honours_utc_offsets(client, manager_headers, tz):
+    after = client.get("/feedback/", headers=manager_headers, params={"created_from": an_hour_ago(tz)})
+    before = client.get("/feedback/", headers=manager_headers, params={"created_to": an_hour_ago(tz)})
+    assert len(after.json()["items"]) == 1
+    assert before.json()["items"] == []
+
+def test_naive_datetimes_are_utc(client, manager_headers):
+    since = (datetime.now(timezone.utc) - timedelta(hours=1)).replace(tzinfo=None).isoformat()
+    response = client.get("/feedback/", headers=manager_headers, params={"created_from": since})
+    assert len(response.json()["items"]) == 1
+
+def test_export_honours_utc_offsets(client, manager_headers):
+    params = {"format": "ndjson", "created_from": an_hour_ago(timezone(timedelta(hours=5)))}
+    response = client.get("/feedback/export", headers=manager_headers, params=params)
+    assert response.status_code == 200
+    assert len(response.text.splitlines()) == 1
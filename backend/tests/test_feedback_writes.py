@@ -0,0 +1,197 @@
+"""Feedback writes: updates, bulk endpoints and the caches they invalidate."""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+@pytest.fixture
+def team(client, register, auth):
+    """ceo > manager > employee, colleague; ceo > manager2; outsider > stranger
+
+    The manager has given the employee one tagged feedback item.
+    """
+    ceo = register("Ceo", role="manager")
+    manager = register("Manager", role="manager", manager_id=ceo["id"])
+    manager2 = register("Manager2", role="manager", manager_id=ceo["id"])
+    employee = register("Employee", manager_id=manager["id"])
+    colleague = register("Colleague", manager_id=manager["id"])
+    outsider = register("Outsider", role="manager")
+    stranger = register("Stranger", manager_id=outsider["id"])
+    team = {
+        "ceo": ceo, "manager": manager, "manager2": manager2, "employee": employee,
+        "colleague": colleague, "outsider": outsider, "stranger": stranger,
+    }
+    team["headers"] = {name: auth(person) for name, person in team.items()}
+    response = client.post("/feedback/", headers=team["headers"]["manager"], json={
+        "employee_id": employee["id"], "strengths": "Clear writing",
+        "areas_to_improve": "Estimate earlier", "sentiment": "positive", "tags": ["writing", "planning"],
+    })
+    assert response.status_code == 200, response.text
+    team["feedback_id"] = response.json()["id"]
+    return team
+
+def item(employee: dict, sentiment: str = "positive", **fields) -> dict:
+    return {"employee_id": employee["id"], "strengths": "Ownership", "areas_to_improve": "Delegation",
+            "sentiment": sentiment, **fields}
+
+def update_tags(client, team, body: dict) -> list:
+    response = client.put(f"/feedback/{team['feedback_id']}", headers=team["headers"]["manager"], json=body)
+    assert response.status_code == 200, response.text
+    return sorted(response.json()["tags"])
+
+def test_null_tags_leave_tags_alone(client, team):
+    assert update_tags(client, team, {"tags": None, "strengths": "Clearer writing"}) == ["planning", "writing"]
+    assert update_tags(client, team, {"tags": ["writing"]}) == ["writing"]
+    assert update_tags(client, team, {"tags": []}) == []
+
+def feedback_ids(client, headers: dict) -> set:
+    return {feedback["id"] for feedback in client.get("/feedback/", headers=headers).json()["items"]}
+
+def test_bulk_create_reports_each_failure_and_keeps_the_rest(client, team):
+    headers = team["headers"]["manager"]
+    before = client.get("/dashboard/manager", headers=headers).json()["total_feedback"]
+    response = client.post("/feedback/bulk", headers=headers, json={"items": [
+        item(team["employee"], tags=["delivery"]),
+        item(team["stranger"]),
+        item(team["colleague"], sentiment="ecstatic"),
+        item(team["colleague"], sentiment="negative"),
+    ]})
+    assert response.status_code == 200, response.text
+    body = response.json()
+
+    assert (body["created"], body["failed"]) == (2, 2)
+    assert [result["index"] for result in body["results"]] == [0, 1, 2, 3]
+    assert [result["success"] for result in body["results"]] == [True, False, False, True]
+    assert body["results"][1]["error"] == "You can only create feedback for your team members"
+    assert body["results"][2]["error"] == "Invalid sentiment: ecstatic"
+    created = [body["results"][0]["feedback"], body["results"][3]["feedback"]]
+    assert [(feedback["employee_id"], feedback["tags"]) for feedback in created] == [
+        (team["employee"]["id"], ["delivery"]), (team["colleague"]["id"], []),
+    ]
+    assert feedback_ids(client, headers) == {team["feedback_id"]} | {feedback["id"] for feedback in created}
+    assert client.get("/dashboard/manager", headers=headers).json()["total_feedback"] == before + 2
+
+def test_bulk_create_with_no_valid_items_writes_nothing(client, team):
+    headers = team["headers"]["manager"]
+    response = client.post("/feedback/bulk", headers=headers, json={"items": [item(team["stranger"])]})
+    assert response.status_code == 200, response.text
+    assert (response.json()["created"], response.json()["failed"]) == (0, 1)
+    assert feedback_ids(client, headers) == {team["feedback_id"]}
+
+@pytest.mark.parametrize("viewer, target, expected", [
+    # Creating feedback stays with the direct manager, even for skip-level managers
+    ("ceo", "employee", False),
+    ("manager2", "employee", False),
+    ("outsider", "stranger", True),
+])
+def test_bulk_create_is_limited_to_direct_reports(client, team, viewer, target, expected):
+    response = client.post("/feedback/bulk", headers=team["headers"][viewer], json={"items": [item(team[target])]})
+    assert response.status_code == 200, response.text
+    assert response.json()["results"][0]["success"] is expected
+
+def test_bulk_create_is_for_managers_only(client, team):
+    response = client.post("/feedback/bulk", headers=team["headers"]["employee"], json={"items": [item(team["colleague"])]})
+    assert response.status_code == 403
+
+def test_bulk_create_rejects_an_empty_batch(client, team):
+    assert client.post("/feedback/bulk", headers=team["headers"]["manager"], json={"items": []}).status_code == 422
+
+def give(client, team, employee: str, count: int) -> list:
+    response = client.post("/feedback/bulk", headers=team["headers"]["manager"],
+                           json={"items": [item(team[employee]) for _ in range(count)]})
+    assert response.status_code == 200, response.text
+    return [result["feedback"]["id"] for result in response.json()["results"]]
+
+def acknowledge(client, team, viewer: str, body: dict):
+    return client.post("/feedback/acknowledge", headers=team["headers"][viewer], json=body)
+
+def test_bulk_acknowledge_skips_ids_that_are_not_yours(client, team):
+    mine = [team["feedback_id"], *give(client, team, "employee", 2)]
+    theirs = give(client, team, "colleague", 1)
+
+    response = acknowledge(client, team, "employee", {"ids": [*mine, *theirs, 999_999]})
+
+    assert response.status_code == 200, response.text
+    assert sorted(response.json()["acknowledged_ids"]) == sorted(mine)
+    assert response.json()["count"] == 3
+    assert client.get("/dashboard/employee", headers=team["headers"]["employee"]).json()["unacknowledged_feedback"] == 0
+    assert client.get("/dashboard/employee", headers=team["headers"]["colleague"]).json()["unacknowledged_feedback"] == 1
+    # Already acknowledged ids are left out
+    assert acknowledge(client, team, "employee", {"ids": mine}).json() == {"acknowledged_ids": [], "count": 0}
+
+def test_bulk_acknowledge_before(client, team):
+    give(client, team, "employee", 2)
+    an_hour_ago = (datetime.now(timezone.utc) - timedelta(hours=1)).isoformat()
+    soon = (datetime.now(timezone.utc) + timedelta(minutes=1)).isoformat()
+
+    assert acknowledge(client, team, "employee", {"before": an_hour_ago}).json()["count"] == 0
+    assert acknowledge(client, team, "employee", {"before": soon}).json()["count"] == 3
+
+@pytest.mark.parametrize("viewer, body, expected", [
+    ("manager", {"ids": [1]}, 403),
+    ("employee", {}, 422),
+    ("employee", {"ids": [1], "before": "2025-01-01T00:00:00Z"}, 422),
+    ("employee", {"ids": []}, 422),
+])
+def test_bulk_acknowledge_rejects(client, team, viewer, body, expected):
+    assert acknowledge(client, team, viewer, body).status_code == expected
+
+# (viewer, cached read) pairs whose ETags each write should or shouldn't change
+READS = [
+    ("manager", "/feedback/"),
+    ("manager", "/users/team"),
+    ("manager2", "/users/team"),
+    ("employee", "/feedback/"),
+    ("colleague", "/dashboard/employee"),
+    ("ceo", "/dashboard/org"),
+    ("outsider", "/dashboard/manager"),
+]
+
+WRITES = {
+    "create": lambda client, team: client.post("/feedback/", headers=team["headers"]["manager"], json=item(team["colleague"])),
+    "bulk create": lambda client, team: client.post(
+        "/feedback/bulk", headers=team["headers"]["manager"], json={"items": [item(team["employee"])]}
+    ),
+    "update": lambda client, team: client.put(
+        f"/feedback/{team['feedback_id']}", headers=team["headers"]["manager"], json={"sentiment": "neutral"}
+    ),
+    "acknowledge": lambda client, team: client.post(
+        f"/feedback/{team['feedback_id']}/acknowledge", headers=team["headers"]["employee"]
+    ),
+    "bulk acknowledge": lambda client, team: acknowledge(client, team, "employee", {"ids": [team["feedback_id"]]}),
+    "re-parent": lambda client, team: client.put(
+        f"/users/{team['colleague']['id']}/manager", headers=team["headers"]["ceo"],
+        json={"manager_id": team["manager2"]["id"]},
+    ),
+}
+
+@pytest.mark.parametrize("write, stale", [
+    ("create", {("manager", "/feedback/"), ("manager", "/users/team"), ("colleague", "/dashboard/employee"),
+                ("ceo", "/dashboard/org")}),
+    ("bulk create", {("manager", "/feedback/"), ("manager", "/users/team"), ("employee", "/feedback/"),
+                     ("ceo", "/dashboard/org")}),
+    ("update", {("manager", "/feedback/"), ("manager", "/users/team"), ("employee", "/feedback/"),
+                ("ceo", "/dashboard/org")}),
+    ("acknowledge", {("manager", "/feedback/"), ("manager", "/users/team"), ("employee", "/feedback/"),
+                     ("ceo", "/dashboard/org")}),
+    ("bulk acknowledge", {("manager", "/feedback/"), ("manager", "/users/team"), ("employee", "/feedback/"),
+                          ("ceo", "/dashboard/org")}),
+    ("re-parent", {("manager", "/feedback/"), ("manager", "/users/team"), ("manager2", "/users/team"),
+                   ("colleague", "/dashboard/employee"), ("ceo", "/dashboard/org")}),
+])
+def test_writes_change_the_etags_of_affected_reads(client, team, write, stale):
+    etags = {}
+    for viewer, path in READS:
+        response = client.get(path, headers=team["headers"][viewer])
+        assert response.status_code == 200, response.text
+        etags[(viewer, path)] = response.headers["ETag"]
+
+    response = WRITES[write](client, team)
+    assert response.status_code == 200, response.text
+
+    revalidated = {
+        (viewer, path): client.get(path, headers={**team["headers"][viewer], "If-None-Match": etags[(viewer, path)]})
+        for viewer, path in READS
+    }
+    assert {read for read, response in revalidated.items() if response.status_code == 200} == stale
+    assert all(response.status_code == 304 for read, response in revalidated.items() if read not in stale)
+    assert all(revalidated[read].headers["ETag"] != etags[read] for read in stale)
@@ -0,0 +1,132 @@
+"""The baseline migration adopting a database made by the old import-time create_all."""
+import pytest
+from sqlalchemy import create_engine, inspect, select, text
+from sqlalchemy.orm import Session
+
+from app import models, org, rollups, stats, tags
+from app.org import closure_drift
+from app.rollups import rollup_drift
+from app.schema import current_revision, head_revision, upgrade
+from app.search import search
+from app.stats import reconcile_feedback_stats
+
+# The schema as create_all left it, including the comma-joined tags column
+LEGACY_SCHEMA = [
+    """CREATE TABLE users (
+        id INTEGER NOT NULL PRIMARY KEY,
+        name VARCHAR(100) NOT NULL,
+        email VARCHAR(100) NOT NULL,
+        password_hash VARCHAR(100) NOT NULL,
+        role VARCHAR(8) NOT NULL,
+        manager_id INTEGER REFERENCES users (id),
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )""",
+    "CREATE UNIQUE INDEX ix_users_email ON users (email)",
+    "CREATE INDEX ix_users_id ON users (id)",
+    """CREATE TABLE feedback (
+        id INTEGER NOT NULL PRIMARY KEY,
+        employee_id INTEGER NOT NULL REFERENCES users (id),
+        manager_id INTEGER NOT NULL REFERENCES users (id),
+        strengths TEXT NOT NULL,
+        areas_to_improve TEXT NOT NULL,
+        sentiment VARCHAR(8) NOT NULL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        updated_at DATETIME,
+        acknowledged BOOLEAN,
+        acknowledged_at DATETIME,
+        tags VARCHAR(200),
+        is_anonymous BOOLEAN,
+        employee_comment TEXT
+    )""",
+    "CREATE INDEX ix_feedback_id ON feedback (id)",
+]
+
+USERS = [
+    (1, "Ceo", "MANAGER", None),
+    (2, "Lead", "MANAGER", 1),
+    (3, "Ada", "EMPLOYEE", 2),
+    (4, "Bo", "EMPLOYEE", 2),
+    (5, "Idle", "EMPLOYEE", None),
+]
+
+# id, employee, manager, sentiment (lowercase as some old rows were), created_at, acknowledged, tags, comment
+FEEDBACK = [
+    (1, 3, 2, "positive", "2025-07-20 11:15:54", None, "teamwork, mentoring,teamwork", None),
+    (2, 3, 2, "NEUTRAL", "2025-07-21 09:00:00", 1, "", "Thanks for the notes"),
+    (3, 4, 2, "negative", "2025-07-23 17:30:00", 0, " deadlines ,, ", None),
+    (4, 2, 1, "POSITIVE", "2025-07-27 23:59:59", 1, None, None),
+]
+
+@pytest.fixture
+def legacy_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as connection:
+        for statement in LEGACY_SCHEMA:
+            connection.execute(text(statement))
+        connection.execute(
+            text("INSERT INTO users (id, name, email, password_hash, role, manager_id) "
+                 "VALUES (:id, :name, :email, 'x', :role, :manager_id)"),
+            [{"id": id_, "name": name, "email": f"{name.lower()}@example.com", "role": role, "manager_id": manager_id}
+             for id_, name, role, manager_id in USERS],
+        )
+        connection.execute(
+            text("INSERT INTO feedback (id, employee_id, manager_id, strengths, areas_to_improve, sentiment, "
+                 "created_at, acknowledged, tags, employee_comment) "
+                 "VALUES (:id, :employee_id, :manager_id, 'Clear writing', 'Estimates', :sentiment, "
+                 ":created_at, :acknowledged, :tags, :comment)"),
+            [dict(zip(("id", "employee_id", "manager_id", "sentiment", "created_at", "acknowledged", "tags", "comment"), row))
+             for row in FEEDBACK],
+        )
+    yield engine
+    engine.dispose()
+
+def test_baseline_backfills_match_the_app(legacy_engine):
+    upgrade(legacy_engine)
+
+    assert current_revision(legacy_engine) == head_revision()
+    with Session(bind=legacy_engine) as db:
+        assert closure_drift(db) == {"missing": 0, "unexpected": 0}
+        assert reconcile_feedback_stats(db) == []
+        assert rollup_drift(db) == []
+
+        tags = {
+            feedback.id: sorted(tag.name for tag in feedback.tags)
+            for feedback in db.scalars(select(models.Feedback))
+        }
+        assert tags == {1: ["mentoring", "teamwork"], 2: [], 3: ["deadlines"], 4: []}
+        assert db.execute(text("SELECT count(*) FROM feedback WHERE tags != ''")).scalar() == 0
+
+        assert [feedback_id for feedback_id, _, _ in search(db, "mentoring")] == [1]
+        assert [feedback_id for feedback_id, _, _ in search(db, "notes", employee_id=3)] == [2]
+
+def test_baseline_backfills_nothing_when_rerun(legacy_engine):
+    upgrade(legacy_engine, "0001")
+    with legacy_engine.begin() as connection:
+        connection.execute(text("DELETE FROM alembic_version"))
+        before = {
+            table: connection.execute(text(f"SELECT count(*) FROM {table}")).scalar()
+            for table in ("tags", "feedback_tags", "user_closure", "feedback_stats", "feedback_rollups", "feedback_fts")
+        }
+
+    upgrade(legacy_engine, "0001")
+
+    with legacy_engine.connect() as connection:
+        assert {table: connection.execute(text(f"SELECT count(*) FROM {table}")).scalar() for table in before} == before
+
+MAINTENANCE_COMMANDS = [(org, "verify"), (rollups, "verify"), (stats, "verify"), (tags, "migrate")]
+
+@pytest.mark.parametrize("module, command", MAINTENANCE_COMMANDS, ids=lambda value: getattr(value, "__name__", value))
+def test_maintenance_commands_refuse_an_unmigrated_database(legacy_engine, monkeypatch, capsys, module, command):
+    monkeypatch.setattr(module, "default_engine" if hasattr(module, "default_engine") else "engine", legacy_engine)
+    tables = set(inspect(legacy_engine).get_table_names())
+
+    with pytest.raises(SystemExit) as exit_info:
+        module.main([command])
+
+    assert exit_info.value.code == 2
+    assert "alembic upgrade head" in capsys.readouterr().err
+    assert set(inspect(legacy_engine).get_table_names()) == tables
+
+@pytest.mark.parametrize("module, command", MAINTENANCE_COMMANDS, ids=lambda value: getattr(value, "__name__", value))
+def test_maintenance_commands_run_on_a_migrated_database(module, command):
+    assert module.main([command]) == 0
@@ -0,0 +1,208 @@
+"""Org hierarchy: the closure table, subtree queries and skip-level access."""
+import json
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from app import crud, org
+
+@pytest.fixture
+def people(client, register, auth):
+    """Two orgs. ceo > vp > director > employee and ceo > vp2 > employee2; outsider > stranger"""
+    ceo = register("Ceo", role="manager")
+    vp = register("Vp", role="manager", manager_id=ceo["id"])
+    vp2 = register("Vp2", role="manager", manager_id=ceo["id"])
+    director = register("Director", role="manager", manager_id=vp["id"])
+    employee = register("Employee", manager_id=director["id"])
+    employee2 = register("Employee2", manager_id=vp2["id"])
+    outsider = register("Outsider", role="manager")
+    stranger = register("Stranger", manager_id=outsider["id"])
+    people = {
+        "ceo": ceo, "vp": vp, "vp2": vp2, "director": director,
+        "employee": employee, "employee2": employee2, "outsider": outsider, "stranger": stranger,
+    }
+    response = client.post("/feedback/", headers=auth(director), json={
+        "employee_id": employee["id"], "strengths": "Clear writing",
+        "areas_to_improve": "Estimate earlier", "sentiment": "positive",
+    })
+    assert response.status_code == 200, response.text
+    people["feedback_id"] = response.json()["id"]
+    return people
+
+def test_is_ancestor(db, people):
+    ids = {name: person["id"] for name, person in people.items() if name != "feedback_id"}
+    assert org.is_ancestor(db, ids["ceo"], ids["employee"])
+    assert org.is_ancestor(db, ids["vp"], ids["employee"])
+    assert not org.is_ancestor(db, ids["employee"], ids["ceo"])
+    assert not org.is_ancestor(db, ids["ceo"], ids["ceo"])
+    assert not org.is_ancestor(db, ids["vp2"], ids["employee"])
+    assert not org.is_ancestor(db, ids["outsider"], ids["employee"])
+    # The employee is three levels below the ceo
+    assert not org.is_ancestor(db, ids["ceo"], ids["employee"], max_depth=2)
+    assert org.is_ancestor(db, ids["ceo"], ids["employee"], max_depth=3)
+
+@pytest.mark.parametrize("depth, expected", [
+    (1, {"Vp": 1, "Vp2": 1}),
+    (2, {"Vp": 1, "Vp2": 1, "Director": 2, "Employee2": 2}),
+    (None, {"Vp": 1, "Vp2": 1, "Director": 2, "Employee2": 2, "Employee": 3}),
+])
+def test_org_members_respect_depth(client, auth, people, depth, expected):
+    params = {"limit": 2} if depth is None else {"limit": 2, "depth": depth}
+    members, cursor = [], None
+    while True:
+        response = client.get("/users/org", headers=auth(people["ceo"]), params={**params, "cursor": cursor or ""})
+        assert response.status_code == 200, response.text
+        page = response.json()
+        members += [(item["user"]["name"], item["depth"]) for item in page["items"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert dict(members) == expected
+    # Nearest levels first, across pages
+    assert [depth for _, depth in members] == sorted(depth for _, depth in members)
+
+def test_org_stats_respect_depth(client, auth, people):
+    headers = auth(people["ceo"])
+    everyone = client.get("/dashboard/org", headers=headers).json()
+    direct = client.get("/dashboard/org", headers=headers, params={"depth": 1}).json()
+    assert (everyone["org_size"], everyone["depth"], everyone["total_feedback"]) == (5, 3, 1)
+    assert (direct["org_size"], direct["depth"], direct["total_feedback"]) == (2, 1, 0)
+
+def export_ids(client, headers, **params) -> set:
+    response = client.get("/feedback/export", headers=headers, params={"format": "ndjson", **params})
+    assert response.status_code == 200, response.text
+    return {json.loads(line)["id"] for line in response.text.splitlines()}
+
+def test_export_covers_the_org(client, auth, people):
+    response = client.post("/feedback/", headers=auth(people["vp2"]), json={
+        "employee_id": people["employee2"]["id"], "strengths": "Ownership",
+        "areas_to_improve": "Delegation", "sentiment": "neutral",
+    })
+    assert response.status_code == 200, response.text
+    director_feedback, vp2_feedback = people["feedback_id"], response.json()["id"]
+    ceo = auth(people["ceo"])
+
+    assert export_ids(client, ceo) == {director_feedback, vp2_feedback}
+    # The employee is three levels below the ceo, employee2 two
+    assert export_ids(client, ceo, depth=2) == {vp2_feedback}
+    assert export_ids(client, ceo, scope="given") == set()
+    assert export_ids(client, ceo, employee_id=people["employee"]["id"]) == {director_feedback}
+    assert export_ids(client, auth(people["vp"])) == {director_feedback}
+    assert export_ids(client, auth(people["vp2"]), scope="given") == {vp2_feedback}
+    assert export_ids(client, auth(people["outsider"])) == set()
+
+@pytest.mark.parametrize("viewer, found", [
+    ("ceo", True), ("vp", True), ("director", True), ("employee", True),
+    ("vp2", False), ("outsider", False), ("employee2", False),
+])
+def test_search_follows_org_access(client, auth, people, viewer, found):
+    response = client.get("/feedback/search", headers=auth(people[viewer]), params={"q": "clear writing"})
+    assert response.status_code == 200, response.text
+    hits = [item["feedback"]["id"] for item in response.json()["items"]]
+    assert hits == ([people["feedback_id"]] if found else [])
+
+def test_move_subtree_keeps_closure_in_sync(db, client, auth, people):
+    response = client.put(
+        f"/users/{people['director']['id']}/manager", headers=auth(people["ceo"]),
+        json={"manager_id": people["vp2"]["id"]},
+    )
+    assert response.status_code == 200, response.text
+    assert org.is_ancestor(db, people["vp2"]["id"], people["employee"]["id"], max_depth=2)
+    assert not org.is_ancestor(db, people["vp"]["id"], people["employee"]["id"])
+    assert org.closure_drift(db) == {"missing": 0, "unexpected": 0}
+
+def test_move_under_own_report_is_rejected(db, client, auth, people):
+    response = client.put(
+        f"/users/{people['vp']['id']}/manager", headers=auth(people["ceo"]),
+        json={"manager_id": people["director"]["id"]},
+    )
+    assert response.status_code == 400
+    with pytest.raises(ValueError):
+        crud.set_manager(db, people["vp"]["id"], people["director"]["id"])
+    db.rollback()
+    assert org.closure_drift(db) == {"missing": 0, "unexpected": 0}
+
+# (viewer, request, expected status); {employee} and {feedback} are filled in
+ACCESS = [
+    ("ceo", "GET /users/{employee}", 200),
+    ("vp", "GET /users/{employee}", 200),
+    ("director", "GET /users/{employee}", 200),
+    ("vp2", "GET /users/{employee}", 403),
+    ("outsider", "GET /users/{employee}", 403),
+    ("employee", "GET /users/{employee}", 200),
+    ("employee2", "GET /users/{employee}", 403),
+    ("ceo", "GET /feedback/employee/{employee}", 200),
+    ("vp", "GET /feedback/employee/{employee}", 200),
+    ("vp2", "GET /feedback/employee/{employee}", 403),
+    ("outsider", "GET /feedback/employee/{employee}", 403),
+    ("ceo", "GET /feedback/{feedback}", 200),
+    ("vp", "GET /feedback/{feedback}", 200),
+    ("vp2", "GET /feedback/{feedback}", 403),
+    ("outsider", "GET /feedback/{feedback}", 403),
+    ("employee", "GET /feedback/{feedback}", 200),
+    ("employee2", "GET /feedback/{feedback}", 403),
+    ("ceo", "GET /feedback/export?employee_id={employee}", 200),
+    ("vp2", "GET /feedback/export?employee_id={employee}", 403),
+    ("ceo", "GET /dashboard/trends?employee_id={employee}", 200),
+    ("outsider", "GET /dashboard/trends?employee_id={employee}", 403),
+    ("vp", "PUT /users/{employee}/manager to vp", 200),
+    ("vp2", "PUT /users/{employee}/manager to vp2", 403),
+    ("ceo", "PUT /users/{employee}/manager to outsider", 403),
+    ("employee", "PUT /users/{employee}/manager to vp", 403),
+]
+
+@pytest.mark.parametrize("viewer, request_line, expected", ACCESS)
+def test_access_matrix(client, auth, people, viewer, request_line, expected):
+    method, path, *target = request_line.split()
+    path = path.format(employee=people["employee"]["id"], feedback=people["feedback_id"])
+    body = {"manager_id": people[target[-1]]["id"]} if target else None
+    response = client.request(method, path, headers=auth(people[viewer]), json=body)
+    assert response.status_code == expected, response.text
+
+@pytest.mark.slow
+def test_synthetic_org(tmp_path):
+    """50k people over 8 levels: closure against recursive CTEs, then a large move"""
+    from bench.org import ANCESTOR_CTE, SUBTREE_CTE, seed
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'org.db'}")
+    by_level = seed(engine, 50_000, 8)
+    db = Session(bind=engine)
+    try:
+        assert org.rebuild_closure(db) == 7
+        db.commit()
+        assert org.closure_drift(db) == {"missing": 0, "unexpected": 0}
+
+        top = by_level[0][0]
+        for depth in range(1, 8):
+            within = db.execute(
+                select(func.count()).where(
+                    org.closure.c.ancestor_id == top, org.closure.c.depth >= 1, org.closure.c.depth <= depth,
+                )
+            ).scalar()
+            assert within == sum(len(ids) for ids in by_level[1:depth + 1])
+        for ids in by_level[:-1]:
+            members, _ = crud.get_org_members(db, ids[0], max_depth=1, limit=1000)
+            assert all(member_depth == 1 for _, member_depth in members)
+            assert db.execute(SUBTREE_CTE, {"root": ids[0]}).scalar() == db.execute(
+                select(func.count()).where(org.closure.c.ancestor_id == ids[0], org.closure.c.depth >= 1)
+            ).scalar()
+
+        leaves, managers = by_level[-1], by_level[3]
+        answers = set()
+        for ancestor, descendant in zip(managers[:100], leaves[::len(leaves) // 100]):
+            expected = db.execute(ANCESTOR_CTE, {"ancestor": ancestor, "descendant": descendant}).first() is not None
+            assert org.is_ancestor(db, ancestor, descendant) == expected
+            answers.add(expected)
+        assert answers == {True, False}
+
+        mover = by_level[2][0]
+        old_manager = crud.get_user(db, mover).manager_id
+        new_manager = next(user_id for user_id in by_level[1] if user_id != old_manager)
+        crud.set_manager(db, mover, new_manager)
+        assert org.is_ancestor(db, new_manager, mover, max_depth=1)
+        assert not org.is_ancestor(db, old_manager, mover)
+        assert org.closure_drift(db) == {"missing": 0, "unexpected": 0}
+    finally:
+        db.close()
+        engine.dispose()
@@ -0,0 +1,43 @@
+"""Statement counts of the list endpoints don't grow with the number of rows."""
+import pytest
+
+from tests.utils import assert_max_queries
+
+def add_reports(client, register, manager: dict, headers: dict, start: int, count: int) -> None:
+    """Give ``manager`` ``count`` more reports, each with one tagged feedback item"""
+    for i in range(start, start + count):
+        employee = register(f"Employee{i}", manager_id=manager["id"])
+        response = client.post("/feedback/", headers=headers, json={
+            "employee_id": employee["id"],
+            "strengths": "Clear writing",
+            "areas_to_improve": "Estimate earlier",
+            "sentiment": ("positive", "neutral", "negative")[i % 3],
+            "tags": ["writing", f"tag{i}"],
+        })
+        assert response.status_code == 200, response.text
+
+# (path, statement limit, key of the list in the response; None for a bare list)
+ENDPOINTS = [
+    ("/feedback/", 3, "items"),
+    ("/dashboard/manager", 5, "team_members"),
+    ("/users/team", 2, None),
+    ("/users/team?with_stats=true", 2, None),
+]
+
+@pytest.mark.parametrize("path, limit, key", ENDPOINTS)
+def test_statement_count_is_independent_of_rows(client, register, auth, path, limit, key):
+    manager = register("Manager", role="manager")
+    headers = auth(manager)
+    # Warm the principal cache so the counts below are the endpoint's own
+    assert client.get("/users/me", headers=headers).status_code == 200
+
+    counts = []
+    for start, count in ((0, 1), (1, 24)):
+        add_reports(client, register, manager, headers, start, count)
+        with assert_max_queries(limit) as statements:
+            response = client.get(path, headers=headers)
+        assert response.status_code == 200
+        counts.append(len(statements))
+        rows = response.json() if key is None else response.json()[key]
+        assert len(rows) == start + count
+    assert counts[0] == counts[1], counts
@@ -0,0 +1,104 @@
+"""Refresh token rotation, reuse detection and access token revocation."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import models
+from app.principals import principal_cache
+from app.tokens import hash_token, load_revocations, revoked_tokens
+from tests.conftest import PASSWORD
+
+@pytest.fixture
+def login(client, register):
+    """Log a new user in; returns the token pair"""
+    user = register("Employee")
+
+    def login() -> dict:
+        response = client.post("/auth/login", json={"email": user["email"], "password": PASSWORD})
+        assert response.status_code == 200, response.text
+        return response.json()
+    return login
+
+def refresh(client, tokens: dict):
+    return client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+
+def me(client, tokens: dict) -> int:
+    return client.get("/users/me", headers={"Authorization": f"Bearer {tokens['access_token']}"}).status_code
+
+def stored(db, tokens: dict) -> models.RefreshToken:
+    db.expire_all()
+    return db.query(models.RefreshToken).filter_by(token_hash=hash_token(tokens["refresh_token"])).one()
+
+def test_rotation_issues_a_new_pair_and_uses_up_the_old_token(client, db, login):
+    first = login()
+    response = refresh(client, first)
+    assert response.status_code == 200, response.text
+    second = response.json()
+
+    assert second["access_token"] != first["access_token"]
+    assert second["refresh_token"] != first["refresh_token"]
+    old, new = stored(db, first), stored(db, second)
+    assert old.used_at is not None and old.revoked_at is None
+    assert (new.family_id, new.used_at) == (old.family_id, None)
+    assert me(client, second) == 200
+
+def test_replaying_a_used_token_revokes_the_family(client, db, login):
+    first = login()
+    second = refresh(client, first).json()
+    assert me(client, first) == 200 and me(client, second) == 200
+
+    assert refresh(client, first).status_code == 401
+
+    assert stored(db, first).revoked_at is not None
+    assert stored(db, second).revoked_at is not None
+    assert refresh(client, second).status_code == 401
+    assert me(client, first) == 401
+    assert me(client, second) == 401
+
+def test_replay_leaves_other_families_alone(client, login):
+    stolen, other = login(), login()
+    refresh(client, stolen)
+    assert refresh(client, stolen).status_code == 401
+    assert me(client, other) == 200
+    assert refresh(client, other).status_code == 200
+
+def test_expired_refresh_token_is_rejected_without_revoking(client, db, login):
+    tokens = login()
+    token = stored(db, tokens)
+    token.expires_at = datetime.utcnow() - timedelta(seconds=1)
+    db.commit()
+
+    assert refresh(client, tokens).status_code == 401
+    token = stored(db, tokens)
+    assert (token.used_at, token.revoked_at) == (None, None)
+    assert me(client, tokens) == 200
+
+def test_logout_revokes_the_tokens(client, db, login):
+    tokens = login()
+    assert me(client, tokens) == 200
+
+    response = client.post("/auth/logout", json={"refresh_token": tokens["refresh_token"]})
+
+    assert response.status_code == 204
+    assert stored(db, tokens).revoked_at is not None
+    assert refresh(client, tokens).status_code == 401
+    assert me(client, tokens) == 401
+
+def test_logout_with_an_unknown_token_is_a_no_op(client, login):
+    tokens = login()
+    assert client.post("/auth/logout", json={"refresh_token": "not-a-token"}).status_code == 204
+    assert me(client, tokens) == 200
+
+def test_revocations_survive_a_restart(client, login):
+    started = datetime.utcnow() - timedelta(minutes=1)
+    revoked, kept = login(), login()
+    client.post("/auth/logout", json={"refresh_token": revoked["refresh_token"]})
+
+    # A fresh worker starts with empty in-memory state
+    revoked_tokens.clear()
+    principal_cache.clear()
+    assert me(client, revoked) == 200
+
+    assert load_revocations(started) == 1
+    assert me(client, revoked) == 401
+    assert me(client, kept) == 200
@@ -0,0 +1,34 @@
+"""Helpers for tests."""
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from app.database import DATABASE_ASYNC, async_engine, engine
+
+@contextmanager
+def assert_max_queries(limit: int, bind=None):
+    """Fail if more than ``limit`` SQL statements run inside the block
+
+    Wrap a request to pin its statement count, so N+1 relationship loading
+    shows up regardless of how many rows come back. Yields the list of
+    captured statements.
+    """
+    if bind is None:
+        bind = async_engine if DATABASE_ASYNC else engine
+    # Engine events are registered on the sync engine behind an AsyncEngine
+    bind = getattr(bind, "sync_engine", bind)
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(bind, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(bind, "before_cursor_execute", record)
+    if len(statements) > limit:
+        raise AssertionError(
+            f"Expected at most {limit} SQL statements, got {len(statements)}:\n"
+            + "\n".join(statements)
+        )
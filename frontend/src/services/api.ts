@@ -1,18 +1,33 @@
 import axios, { AxiosInstance, AxiosResponse } from 'axios';
 import type {
   User,
+  TeamMember,
+  Bootstrap,
+  BootstrapSection,
   Feedback,
+  FeedbackPage,
+  FeedbackListParams,
+  TagCount,
   FeedbackCreate,
+  FeedbackBulkResponse,
+  FeedbackAcknowledgeResult,
   FeedbackUpdate,
   LoginCredentials,
   RegisterData,
   AuthResponse,
   ManagerDashboard,
   EmployeeDashboard,
+  OrgPage,
+  OrgDashboard,
+  FeedbackTrends,
+  FeedbackTrendParams,
+  ServerEvent,
 } from '@/types';
 
 class ApiService {
   private api: AxiosInstance;
+  // The refresh in flight, shared by every request that got a 401 meanwhile
+  private refreshing: Promise<string | null> | null = null;
 
   constructor() {
     this.api = axios.create({
@@ -31,12 +46,23 @@ class ApiService {
       return config;
     });
 
-    // Handle auth errors
+    // Handle auth errors: refresh an expired access token and retry once,
+    // otherwise send the user back to the login page
     this.api.interceptors.response.use(
       (response) => response,
-      (error) => {
+      async (error) => {
+        const config = error.config;
+        if (error.response?.status === 401 && config && !config._retried && !config.url?.startsWith('/auth/')) {
+          config._retried = true;
+          const token = await this.refreshAccessToken();
+          if (token) {
+            config.headers.Authorization = `Bearer ${token}`;
+            return this.api.request(config);
+          }
+        }
         if (error.response?.status === 401) {
           localStorage.removeItem('auth_token');
+          localStorage.removeItem('refresh_token');
           window.location.href = '/login';
         }
         return Promise.reject(error);
@@ -44,12 +70,51 @@ class ApiService {
     );
   }
 
+  // Swap the stored refresh token for a new pair; resolves to the new access
+  // token, or null (and forgets both tokens) if the refresh token was rejected.
+  // Concurrent callers share one request, since each refresh token works once.
+  refreshAccessToken(): Promise<string | null> {
+    if (!this.refreshing) {
+      this.refreshing = (async () => {
+        const refreshToken = localStorage.getItem('refresh_token');
+        if (!refreshToken) {
+          return null;
+        }
+        try {
+          // Bypasses the interceptors, so a rejected refresh doesn't trigger another
+          const response: AxiosResponse<AuthResponse> = await axios.post(
+            `${this.api.defaults.baseURL}/auth/refresh`,
+            { refresh_token: refreshToken },
+          );
+          localStorage.setItem('auth_token', response.data.access_token);
+          localStorage.setItem('refresh_token', response.data.refresh_token);
+          return response.data.access_token;
+        } catch {
+          localStorage.removeItem('auth_token');
+          localStorage.removeItem('refresh_token');
+          return null;
+        }
+      })().finally(() => {
+        this.refreshing = null;
+      });
+    }
+    return this.refreshing;
+  }
+
   // Auth endpoints
   async login(credentials: LoginCredentials): Promise<AuthResponse> {
     const response: AxiosResponse<AuthResponse> = await this.api.post('/auth/login', credentials);
     return response.data;
   }
 
+  // Revokes the stored refresh token and the access tokens issued from it
+  async logout(): Promise<void> {
+    const refreshToken = localStorage.getItem('refresh_token');
+    if (refreshToken) {
+      await this.api.post('/auth/logout', { refresh_token: refreshToken });
+    }
+  }
+
   async register(userData: RegisterData): Promise<User> {
     const response: AxiosResponse<User> = await this.api.post('/auth/register', userData);
     return response.data;
@@ -61,6 +126,14 @@ class ApiService {
     return response.data;
   }
 
+  // Profile, dashboard, team and first feedback page in one request; all sections by default
+  async getBootstrap(include?: BootstrapSection[], feedbackLimit?: number): Promise<Bootstrap> {
+    const response: AxiosResponse<Bootstrap> = await this.api.get('/bootstrap', {
+      params: { include: include?.join(','), feedback_limit: feedbackLimit },
+    });
+    return response.data;
+  }
+
   async getUser(userId: number): Promise<User> {
     const response: AxiosResponse<User> = await this.api.get(`/users/${userId}`);
     return response.data;
@@ -72,6 +145,24 @@ class ApiService {
     return response.data;
   }
 
+  // Team members with counts of the feedback each has received, in one request
+  async getTeamMembersWithStats(): Promise<TeamMember[]> {
+    const response: AxiosResponse<TeamMember[]> = await this.api.get('/users/team', { params: { with_stats: true } });
+    return response.data;
+  }
+
+  // Get one page of everyone under the current manager, nearest levels first
+  async getOrgMembers(params: { depth?: number; limit?: number; cursor?: string } = {}): Promise<OrgPage> {
+    const response: AxiosResponse<OrgPage> = await this.api.get('/users/org', { params });
+    return response.data;
+  }
+
+  // Move someone in the manager's org, with their reports, to another manager
+  async setManager(userId: number, managerId: number): Promise<User> {
+    const response: AxiosResponse<User> = await this.api.put(`/users/${userId}/manager`, { manager_id: managerId });
+    return response.data;
+  }
+
   // Get all managers (for registration)
   async getManagers(): Promise<User[]> {
     const response = await this.api.get('/users/managers');
@@ -89,18 +180,47 @@ class ApiService {
     return response.data;
   }
 
-  async getMyFeedback(): Promise<Feedback[]> {
-    const response: AxiosResponse<Feedback[]> = await this.api.get('/feedback/my-feedback');
+  // Create feedback for many team members in one request; failures are reported per item
+  async createFeedbackBulk(items: FeedbackCreate[]): Promise<FeedbackBulkResponse> {
+    const payload = {
+      items: items.map(item => ({ ...item, sentiment: item.sentiment.toUpperCase() }))
+    };
+    const response: AxiosResponse<FeedbackBulkResponse> = await this.api.post('/feedback/bulk', payload);
     return response.data;
   }
 
-  async getEmployeeFeedback(employeeId: number): Promise<Feedback[]> {
-    const response: AxiosResponse<Feedback[]> = await this.api.get(`/feedback/employee/${employeeId}`);
+  // Fetch a single page from one of the cursor-paginated feedback list endpoints
+  async getFeedbackPage(path: string, params: FeedbackListParams = {}): Promise<FeedbackPage> {
+    const response: AxiosResponse<FeedbackPage> = await this.api.get(path, { params });
     return response.data;
   }
 
-  async getAllFeedback(): Promise<Feedback[]> {
-    const response: AxiosResponse<Feedback[]> = await this.api.get('/feedback/');
+  // Follow next_cursor until the list is exhausted
+  private async getAllFeedbackPages(path: string, params: FeedbackListParams = {}): Promise<Feedback[]> {
+    const items: Feedback[] = [];
+    let cursor: string | undefined;
+    do {
+      const page = await this.getFeedbackPage(path, { limit: 200, ...params, cursor });
+      items.push(...page.items);
+      cursor = page.next_cursor ?? undefined;
+    } while (cursor);
+    return items;
+  }
+
+  async getMyFeedback(params: FeedbackListParams = {}): Promise<Feedback[]> {
+    return this.getAllFeedbackPages('/feedback/my-feedback', params);
+  }
+
+  async getEmployeeFeedback(employeeId: number, params: FeedbackListParams = {}): Promise<Feedback[]> {
+    return this.getAllFeedbackPages(`/feedback/employee/${employeeId}`, params);
+  }
+
+  async getAllFeedback(params: FeedbackListParams = {}): Promise<Feedback[]> {
+    return this.getAllFeedbackPages('/feedback/', params);
+  }
+
+  async getTagCounts(): Promise<TagCount[]> {
+    const response: AxiosResponse<TagCount[]> = await this.api.get('/feedback/tags');
     return response.data;
   }
 
@@ -114,6 +234,12 @@ class ApiService {
     return response.data;
   }
 
+  // Acknowledge several items, or everything created before a timestamp, in one request
+  async acknowledgeFeedbackBulk(target: { ids: number[] } | { before: string }): Promise<FeedbackAcknowledgeResult> {
+    const response: AxiosResponse<FeedbackAcknowledgeResult> = await this.api.post('/feedback/acknowledge', target);
+    return response.data;
+  }
+
   async acknowledgeFeedback(feedbackId: number): Promise<Feedback> {
     const response: AxiosResponse<Feedback> = await this.api.post(`/feedback/${feedbackId}/acknowledge`, {
       acknowledged: true,
@@ -138,6 +264,94 @@ class ApiService {
     const response: AxiosResponse<EmployeeDashboard> = await this.api.get('/dashboard/employee');
     return response.data;
   }
+
+  async getOrgDashboard(depth?: number): Promise<OrgDashboard> {
+    const response: AxiosResponse<OrgDashboard> = await this.api.get('/dashboard/org', { params: { depth } });
+    return response.data;
+  }
+
+  // Feedback counts by sentiment per day or week; dates are YYYY-MM-DD
+  async getFeedbackTrends(params: FeedbackTrendParams = {}): Promise<FeedbackTrends> {
+    const response: AxiosResponse<FeedbackTrends> = await this.api.get('/dashboard/trends', { params });
+    return response.data;
+  }
+
+  // Live feedback events from GET /events/stream. EventSource can't send the
+  // bearer token, so the stream is read with fetch and reconnected with
+  // Last-Event-ID after drops. Returns a function that closes it.
+  subscribeToEvents(onEvent: (event: ServerEvent) => void): () => void {
+    const controller = new AbortController();
+    let lastEventId = '';
+    let retryMs = 3000;
+
+    // Reads one connection until it ends; false means don't reconnect
+    const readStream = async (): Promise<boolean> => {
+      const headers: Record<string, string> = { Accept: 'text/event-stream' };
+      const token = localStorage.getItem('auth_token');
+      if (token) {
+        headers.Authorization = `Bearer ${token}`;
+      }
+      if (lastEventId) {
+        headers['Last-Event-ID'] = lastEventId;
+      }
+      const response = await fetch(`${this.api.defaults.baseURL}/events/stream`, {
+        headers,
+        signal: controller.signal,
+      });
+      if (response.status === 401) {
+        // Reconnect with a fresh access token if the refresh token still works
+        return (await this.refreshAccessToken()) !== null;
+      }
+      if (response.status === 403) {
+        return false;
+      }
+      if (!response.ok || !response.body) {
+        return true;
+      }
+      const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+      let buffer = '';
+      for (;;) {
+        const { value, done } = await reader.read();
+        if (done) {
+          return true;
+        }
+        buffer += value;
+        let end: number;
+        while ((end = buffer.indexOf('\n\n')) >= 0) {
+          const fields: Record<string, string> = {};
+          for (const line of buffer.slice(0, end).split('\n')) {
+            // Lines starting with ':' are heartbeats
+            if (!line || line.startsWith(':')) continue;
+            const colon = line.indexOf(':');
+            const name = colon < 0 ? line : line.slice(0, colon);
+            fields[name] = colon < 0 ? '' : line.slice(colon + 1).replace(/^ /, '');
+          }
+          buffer = buffer.slice(end + 2);
+          if ('retry' in fields) {
+            retryMs = Number(fields.retry) || retryMs;
+          }
+          if ('id' in fields) {
+            lastEventId = fields.id;
+          }
+          if (fields.event) {
+            onEvent({ id: lastEventId, type: fields.event, data: JSON.parse(fields.data || '{}') } as ServerEvent);
+          }
+        }
+      }
+    };
+
+    (async () => {
+      while (!controller.signal.aborted) {
+        try {
+          if (!(await readStream())) return;
+        } catch (error) {
+          if (controller.signal.aborted) return;
+        }
+        await new Promise((resolve) => setTimeout(resolve, retryMs));
+      }
+    })();
+    return () => controller.abort();
+  }
 }
 
 export const apiService = new ApiService();
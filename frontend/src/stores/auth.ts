@@ -1,6 +1,6 @@
 import { defineStore } from 'pinia'
 import { ref, computed } from 'vue'
-import type { User, LoginCredentials, RegisterData } from '@/types'
+import type { User, LoginCredentials, RegisterData, Bootstrap, AuthResponse } from '@/types'
 import apiService from '@/services/api'
 
 export const useAuthStore = defineStore('auth', () => {
@@ -8,19 +8,24 @@ export const useAuthStore = defineStore('auth', () => {
   const token = ref<string | null>(localStorage.getItem('auth_token'))
   const loading = ref(false)
   const error = ref<string | null>(null)
+  // What the first screen needs, fetched along with the profile
+  const bootstrap = ref<Bootstrap | null>(null)
 
   const isAuthenticated = computed(() => !!token.value && !!user.value)
   const isManager = computed(() => user.value?.role === 'manager')
   const isEmployee = computed(() => user.value?.role === 'employee')
 
-  const setToken = (newToken: string) => {
-    token.value = newToken
-    localStorage.setItem('auth_token', newToken)
+  // The access token is refreshed by the API service when it expires
+  const setToken = (tokens: AuthResponse) => {
+    token.value = tokens.access_token
+    localStorage.setItem('auth_token', tokens.access_token)
+    localStorage.setItem('refresh_token', tokens.refresh_token)
   }
 
   const clearToken = () => {
     token.value = null
     localStorage.removeItem('auth_token')
+    localStorage.removeItem('refresh_token')
   }
 
   const login = async (credentials: LoginCredentials) => {
@@ -29,11 +34,12 @@ export const useAuthStore = defineStore('auth', () => {
       error.value = null
       
       const authResponse = await apiService.login(credentials)
-      setToken(authResponse.access_token)
+      setToken(authResponse)
       
-      // Get user data after successful login
-      const userData = await apiService.getUserProfile()
-      user.value = userData
+      // Get user data, and the first screen's data with it, after successful login
+      const data = await apiService.getBootstrap()
+      user.value = data.profile
+      bootstrap.value = data
       
       return true
     } catch (err: any) {
@@ -69,18 +75,29 @@ export const useAuthStore = defineStore('auth', () => {
   }
 
   const logout = () => {
+    // Revoke the session server-side; the local tokens go either way
+    apiService.logout().catch(() => {})
     clearToken()
     user.value = null
+    bootstrap.value = null
     error.value = null
   }
 
+  // Hand the bootstrapped data to the first view that renders it; later loads fetch fresh data
+  const takeBootstrap = () => {
+    const data = bootstrap.value
+    bootstrap.value = null
+    return data
+  }
+
   const fetchCurrentUser = async () => {
     if (!token.value) return false
     
     try {
       loading.value = true
-      const userData = await apiService.getUserProfile()
-      user.value = userData
+      const data = await apiService.getBootstrap()
+      user.value = data.profile
+      bootstrap.value = data
       return true
     } catch (err) {
       clearToken()
@@ -107,6 +124,7 @@ export const useAuthStore = defineStore('auth', () => {
     register,
     logout,
     fetchCurrentUser,
+    takeBootstrap,
     clearError,
   }
 })
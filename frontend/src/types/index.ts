@@ -26,6 +26,21 @@ export interface Feedback {
   manager?: User
 }
 
+export interface FeedbackPage {
+  items: Feedback[]
+  next_cursor?: string | null
+}
+
+export interface FeedbackListParams {
+  limit?: number
+  cursor?: string
+  sentiment?: 'positive' | 'neutral' | 'negative'
+  acknowledged?: boolean
+  tag?: string
+  created_from?: string
+  created_to?: string
+}
+
 export interface FeedbackCreate {
   employee_id: number;
   strengths: string;
@@ -35,11 +50,34 @@ export interface FeedbackCreate {
   is_anonymous?: boolean;
 }
 
+export interface FeedbackBulkResult {
+  index: number
+  success: boolean
+  feedback?: Feedback | null
+  error?: string | null
+}
+
+export interface FeedbackBulkResponse {
+  created: number
+  failed: number
+  results: FeedbackBulkResult[]
+}
+
+export interface FeedbackAcknowledgeResult {
+  acknowledged_ids: number[]
+  count: number
+}
+
 export interface FeedbackUpdate {
   strengths?: string
   areas_to_improve?: string
   sentiment?: 'positive' | 'neutral' | 'negative'
-  tags?: string
+  tags?: string[]
+}
+
+export interface TagCount {
+  name: string
+  count: number
 }
 
 export interface LoginCredentials {
@@ -58,6 +96,9 @@ export interface RegisterData {
 export interface AuthResponse {
   access_token: string
   token_type: string
+  refresh_token: string
+  // Seconds until access_token expires
+  expires_in: number
 }
 
 export interface DashboardStats {
@@ -77,6 +118,95 @@ export interface EmployeeDashboard extends DashboardStats {
   unacknowledged_feedback: number
 }
 
+export interface TeamMemberStats {
+  total_feedback: number
+  positive_feedback: number
+  neutral_feedback: number
+  negative_feedback: number
+  unacknowledged_feedback: number
+  last_feedback_at: string | null
+}
+
+export interface TeamMember extends User {
+  stats: TeamMemberStats | null
+}
+
+export type BootstrapSection = 'profile' | 'dashboard' | 'team' | 'feedback'
+
+// Sections not requested are null, as is team for employees
+export interface Bootstrap {
+  profile: User | null
+  dashboard: ManagerDashboard | EmployeeDashboard | null
+  team: TeamMember[] | null
+  feedback: FeedbackPage | null
+}
+
+export interface OrgMember {
+  user: User
+  depth: number
+}
+
+export interface OrgPage {
+  items: OrgMember[]
+  next_cursor: string | null
+}
+
+export interface OrgStats {
+  org_size: number
+  total_feedback: number
+  positive_feedback: number
+  neutral_feedback: number
+  negative_feedback: number
+  unacknowledged_feedback: number
+}
+
+export interface OrgReportStats extends OrgStats {
+  user: User
+}
+
+export interface OrgDashboard extends OrgStats {
+  depth: number
+  direct_reports: OrgReportStats[]
+}
+
 export interface ApiError {
   detail: string
 }
+
+export interface TrendBucket {
+  bucket: string
+  total_feedback: number
+  positive_feedback: number
+  neutral_feedback: number
+  negative_feedback: number
+}
+
+export interface FeedbackTrends {
+  granularity: 'day' | 'week'
+  buckets: TrendBucket[]
+}
+
+export interface FeedbackTrendParams {
+  granularity?: 'day' | 'week'
+  from?: string
+  to?: string
+  scope?: 'org' | 'given'
+  employee_id?: number
+}
+
+export type FeedbackEventType =
+  | 'feedback.created'
+  | 'feedback.updated'
+  | 'feedback.acknowledged'
+  | 'feedback.commented'
+
+export interface FeedbackEventData {
+  feedback_id: number
+  employee_id: number
+  manager_id: number
+}
+
+// 'reset' means events were missed and anything shown should be refetched
+export type ServerEvent =
+  | { id: string; type: FeedbackEventType; data: FeedbackEventData }
+  | { id: string; type: 'reset'; data: Record<string, never> }